@@ -4,6 +4,16 @@ from tkinter import ttk, messagebox
 import customtkinter as ctk
 from datetime import datetime, timedelta
 import random
+import os
+import sys
+
+# Route all queries through the shared pool in the class_record_system package
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "semprojj", "class_record_system"))
+from connection import DB_PATH
+from database import needs_sample_data, simple_hash_password
+from migrations import migrate
+from repository import DataStore
+from seeding import seed_database
 
 ctk.set_appearance_mode("Light")
 ctk.set_default_color_theme("green")
@@ -25,8 +35,10 @@ class Student:
         self.attendance = {}
 
 class ClassRecordSystem:
-    def __init__(self, root):
+    def __init__(self, root, db_path=DB_PATH):
         self.root = root
+        self.db_path = db_path
+        self.db = DataStore(db_path)
         self.root.title("Class Record Management System")
         self.root.geometry("1400x900")
         self.root.resizable(True, True)
@@ -49,154 +61,11 @@ class ClassRecordSystem:
         self.root.geometry(f"{width}x{height}+{x}+{y}")
 
     def db_setup(self):
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS teachers (
-                teacher_id TEXT PRIMARY KEY,
-                name TEXT,
-                email TEXT,
-                subjects TEXT
-            )
-        """)
-        
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS students (
-                student_id TEXT PRIMARY KEY,
-                name TEXT,
-                grade_level INTEGER,
-                section TEXT,
-                subjects TEXT,
-                attendance TEXT
-            )
-        """)
-        
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS grades (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                student_id TEXT,
-                subject TEXT,
-                written_works REAL,
-                quizzes REAL,
-                activities REAL,
-                performance_tasks REAL,
-                final_grade REAL,
-                status TEXT,
-                timestamp TEXT
-            )
-        """)
-        
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS attendance (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                student_id TEXT,
-                subject TEXT,
-                date TEXT,
-                status TEXT
-            )
-        """)
-
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS subjects (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                subject_name TEXT UNIQUE,
-                teacher_id TEXT
-            )
-        """)
-        conn.commit()
-        conn.close()
+        migrate(self.db_path)
 
     def generate_sample_data(self):
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        
-        cur.execute("SELECT COUNT(*) FROM teachers")
-        if cur.fetchone()[0] == 0:
-            teachers = [
-                ("T001", "Dr. Sarah Johnson", "s.johnson@school.edu", "Math,Physics"),
-                ("T002", "Prof. Michael Chen", "m.chen@school.edu", "Science,Biology"),
-                ("T003", "Ms. Emily Davis", "e.davis@school.edu", "English,Literature"),
-                ("T004", "Mr. Robert Wilson", "r.wilson@school.edu", "History,Geography")
-            ]
-            for teacher in teachers:
-                cur.execute("INSERT INTO teachers VALUES (?, ?, ?, ?)", teacher)
-            
-            all_subjects = ["Math", "Science", "English", "History", "Physics", "Biology", "Literature", "Geography"]
-            for subject in all_subjects:
-                try:
-                    cur.execute("INSERT INTO subjects (subject_name) VALUES (?)", (subject,))
-                except sqlite3.IntegrityError:
-                    pass
-            
-            first_names = ["James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "William", "Elizabeth"]
-            last_names = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez"]
-            
-            sections = ["Diamond", "Ruby", "Emerald", "Sapphire", "Pearl"]
-            grade_levels = [9, 10, 11, 12]
-            
-            student_count = 0
-            for grade_level in grade_levels:
-                for section in sections:
-                    for i in range(5):
-                        student_count += 1
-                        student_id = f"S{student_count:03d}"
-                        first_name = random.choice(first_names)
-                        last_name = random.choice(last_names)
-                        name = f"{first_name} {last_name}"
-                        section_name = f"Grade {grade_level} {section}"
-                        
-                        student_subjects = {}
-                        num_subjects = random.randint(3, 6)
-                        selected_subjects = random.sample(all_subjects, num_subjects)
-                        
-                        for subject in selected_subjects:
-                            written_works = round(random.uniform(80.0, 95.0), 1)
-                            quizzes = round(random.uniform(75.0, 92.0), 1)
-                            activities = round(random.uniform(85.0, 98.0), 1)
-                            performance_tasks = round(random.uniform(82.0, 96.0), 1)
-                            
-                            final_grade = (written_works * 0.25 + quizzes * 0.25 + 
-                                         activities * 0.25 + performance_tasks * 0.25)
-                            
-                            student_subjects[subject] = {
-                                'written_works': written_works,
-                                'quizzes': quizzes,
-                                'activities': activities,
-                                'performance_tasks': performance_tasks,
-                                'final_grade': round(final_grade, 1)
-                            }
-                    
-                        attendance_data = {}
-                        for day in range(1, 16):
-                            date_str = f"2024-01-{day:02d}"
-                            attendance_data[date_str] = "P" if random.random() < 0.85 else "A"
-                        
-                        cur.execute(
-                            "INSERT INTO students VALUES (?, ?, ?, ?, ?, ?)",
-                            (student_id, name, grade_level, section_name, str(student_subjects), str(attendance_data))
-                        )
-                        
-                        for subject, grades in student_subjects.items():
-                            status = "Passing" if grades['final_grade'] >= 75.0 else "Failing"
-                            cur.execute(
-                                """INSERT INTO grades 
-                                (student_id, subject, written_works, quizzes, activities, performance_tasks, final_grade, status, timestamp) 
-                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                                (student_id, subject, grades['written_works'], grades['quizzes'], 
-                                 grades['activities'], grades['performance_tasks'], grades['final_grade'], 
-                                 status, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-                            )
-                        
-                        for subject in selected_subjects:
-                            for date_str, status in attendance_data.items():
-                                cur.execute(
-                                    "INSERT INTO attendance (student_id, subject, date, status) VALUES (?, ?, ?, ?)",
-                                    (student_id, subject, date_str, status)
-                                )
-        
-        conn.commit()
-        conn.close()
+        if needs_sample_data(self.db_path):
+            seed_database(self.db_path, absence_rate=0.15, dropped_rate=0.0, verbose=False)
 
     def login_screen(self):
         self.clear_window()
@@ -263,16 +132,17 @@ class ClassRecordSystem:
         self.teacher_id_entry.pack(pady=5)
         self.teacher_id_entry.insert(0, "T001")
 
-        ctk.CTkLabel(form_frame, text="Name", font=("Arial", 14)).pack(anchor="w", pady=(20, 5))
-        self.teacher_name_entry = ctk.CTkEntry(
+        ctk.CTkLabel(form_frame, text="Password", font=("Arial", 14)).pack(anchor="w", pady=(20, 5))
+        self.teacher_password_entry = ctk.CTkEntry(
             form_frame,
-            placeholder_text="Enter your full name",
+            placeholder_text="Enter your password",
+            show="•",
             width=300,
             height=45,
             font=("Arial", 14)
         )
-        self.teacher_name_entry.pack(pady=5)
-        self.teacher_name_entry.insert(0, "Dr. Sarah Johnson")
+        self.teacher_password_entry.pack(pady=5)
+        self.teacher_password_entry.insert(0, "password123")
 
         login_btn = ctk.CTkButton(
             form_frame,
@@ -291,19 +161,19 @@ class ClassRecordSystem:
 
     def check_login(self):
         teacher_id = self.teacher_id_entry.get()
-        name = self.teacher_name_entry.get()
+        password = self.teacher_password_entry.get()
+
+        if not teacher_id or not password:
+            messagebox.showerror("Login Error", "Please enter both teacher ID and password!")
+            return
 
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM teachers WHERE teacher_id = ? AND name = ?", (teacher_id, name))
-        teacher = cur.fetchone()
-        conn.close()
+        teacher = self.db.teachers.authenticate(teacher_id, simple_hash_password(password))
 
         if teacher:
             self.current_user = teacher
             self.main_screen()
         else:
-            messagebox.showerror("Login Error", "Invalid teacher ID or name.")
+            messagebox.showerror("Login Error", "Invalid teacher ID or password.")
 
     def main_screen(self):
         self.clear_window()
@@ -323,7 +193,7 @@ class ClassRecordSystem:
 
         ctk.CTkLabel(
             self.sidebar_frame,
-            text=f"Welcome, {self.current_user[1]}",
+            text=f"Welcome, {self.current_user.name}",
             font=("Arial", 12),
             text_color=("gray50", "gray70")
         ).pack(pady=(0, 30))
@@ -338,7 +208,7 @@ class ClassRecordSystem:
             text_color=("gray50", "gray70")
         ).pack(anchor="w", pady=(10, 5))
 
-        subjects = self.current_user[3].split(",")
+        subjects = self.db.teachers.list_subjects_for(self.current_user.teacher_id)
         for subject in subjects:
             subject_btn = ctk.CTkButton(
                 nav_frame,
@@ -411,25 +281,15 @@ class ClassRecordSystem:
         stats_frame = ctk.CTkFrame(self.main_content, fg_color="transparent")
         stats_frame.pack(fill="x", pady=(0, 20))
 
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        
-        cur.execute("SELECT COUNT(DISTINCT student_id) FROM students")
-        total_students = cur.fetchone()[0]
-        
-        cur.execute("SELECT COUNT(*) FROM grades WHERE status = 'Failing'")
-        failing_students = cur.fetchone()[0]
-        
-        cur.execute("SELECT COUNT(*) FROM attendance WHERE status = 'A'")
-        total_absences = cur.fetchone()[0]
-        
-        conn.close()
+        current_date = datetime.now().strftime("%Y-%m-%d")
+        total_students, failing_students = self.db.stats.system_stats(current_date)[:2]
+        total_absences = self.db.attendance.total_absences()
 
         stats_data = [
             ("Students", total_students, "#2E8B57"),
             ("Failing", failing_students, "#DC143C"),
             ("Absences", total_absences, "#FF8C00"),
-            ("Subjects", len(self.current_user[3].split(",")), "#4169E1")
+            ("Subjects", len(self.db.teachers.list_subjects_for(self.current_user.teacher_id)), "#4169E1")
         ]
 
         for i, (title, value, color) in enumerate(stats_data):
@@ -493,29 +353,9 @@ class ClassRecordSystem:
         for widget in stats_frame.winfo_children():
             widget.destroy()
 
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        
-        cur.execute("""
-            SELECT COUNT(*), AVG(final_grade), 
-                   SUM(CASE WHEN status = 'Failing' THEN 1 ELSE 0 END)
-            FROM grades WHERE subject = ?
-        """, (self.selected_subject,))
-        result = cur.fetchone()
-        total = result[0] if result else 0
-        avg_grade = result[1] if result and result[1] else 0
-        failing = result[2] if result else 0
-        
-        # COUNT ABSENCES - FIXED QUERY
-        cur.execute("""
-            SELECT COUNT(*) 
-            FROM attendance 
-            WHERE subject = ? AND status = 'A'
-        """, (self.selected_subject,))
-        result = cur.fetchone()
-        absences = result[0] if result else 0
-        
-        conn.close()
+        current_date = datetime.now().strftime("%Y-%m-%d")
+        total, avg_grade, failing = self.db.stats.subject_stats(self.selected_subject, current_date)[:3]
+        absences = self.db.attendance.total_absences(self.selected_subject)
 
         stats_data = [
             ("Students", total, "#2E8B57"),
@@ -667,59 +507,22 @@ class ClassRecordSystem:
         messagebox.showinfo("Filter Applied", f"Now showing students from: {self.section_filter.get()}")
 
     def load_section_filter(self):
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute("SELECT DISTINCT section FROM students ORDER BY section")
-        sections = cur.fetchall()
-        conn.close()
+        sections = self.db.roster.list_student_sections()
         
-        section_values = ["All Sections"] + [section[0] for section in sections]
+        section_values = ["All Sections"] + sections
         self.section_filter.configure(values=section_values)
 
     def load_grades_data_with_filters(self):
         for item in self.grades_tree.get_children():
             self.grades_tree.delete(item)
             
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        
-        # Build the query with filters
-        query = """
-            SELECT s.student_id, s.name, s.grade_level, s.section, 
-                   g.written_works, g.quizzes, g.activities, g.performance_tasks, 
-                   g.final_grade, g.status 
-            FROM students s
-            JOIN grades g ON s.student_id = g.student_id
-            WHERE g.subject = ?
-        """
-        
-        params = [self.selected_subject]
-        
-        # Add section filter if not "All Sections"
         section_filter = self.section_filter.get()
-        if section_filter != "All Sections":
-            query += " AND s.section = ?"
-            params.append(section_filter)
-        
-        # Add status filter if not "All"
+        section = None if section_filter == "All Sections" else section_filter
         status_filter = self.grade_filter.get()
-        if status_filter != "All":
-            if status_filter == "Passing":
-                query += " AND g.status = 'Passing'"
-            elif status_filter == "Failing":
-                query += " AND g.status = 'Failing'"
-        
-        # Add search filter if there's a search term
+        status = None if status_filter == "All" else status_filter
         search_term = self.grade_search_entry.get().strip()
-        if search_term:
-            query += " AND (s.name LIKE ? OR s.student_id LIKE ?)"
-            params.extend([f"%{search_term}%", f"%{search_term}%"])
-        
-        query += " ORDER BY s.section, s.name"
         
-        cur.execute(query, params)
-        rows = cur.fetchall()
-        conn.close()
+        rows = self.db.grades.list_for_subject(self.selected_subject, section, status, search_term)
 
         for row in rows:
             status_icon = "✅" if row[9] == "Passing" else "❌"
@@ -834,54 +637,31 @@ class ClassRecordSystem:
         self.load_attendance_data()
 
     def load_attendance_section_filter(self):
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute("SELECT DISTINCT section FROM students ORDER BY section")
-        sections = cur.fetchall()
-        conn.close()
+        sections = self.db.roster.list_student_sections()
         
-        section_values = ["All Sections"] + [section[0] for section in sections]
+        section_values = ["All Sections"] + sections
         self.attendance_section_filter.configure(values=section_values)
 
+    def checked_attendance_date(self):
+        date_str = self.attendance_date.get().strip()
+        try:
+            datetime.strptime(date_str, "%Y-%m-%d")
+        except ValueError:
+            messagebox.showerror("Invalid Date", f"'{date_str}' is not a valid date. Use YYYY-MM-DD, e.g. 2024-01-05.")
+            return None
+        return date_str
+
     def load_attendance_data(self):
         for item in self.attendance_tree.get_children():
             self.attendance_tree.delete(item)
             
-        date_str = self.attendance_date.get()
+        date_str = self.checked_attendance_date()
+        if not date_str:
+            return
         section_filter = self.attendance_section_filter.get()
+        section = None if section_filter == "All Sections" else section_filter
         
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        
-        if section_filter == "All Sections":
-            cur.execute("""
-                SELECT s.student_id, s.name, s.grade_level, s.section,
-                       COALESCE(a.status, 'Not Marked') as status
-                FROM students s
-                LEFT JOIN attendance a ON s.student_id = a.student_id 
-                    AND a.subject = ? AND a.date = ?
-                WHERE EXISTS (
-                    SELECT 1 FROM grades g 
-                    WHERE g.student_id = s.student_id AND g.subject = ?
-                )
-                ORDER BY s.section, s.name
-            """, (self.selected_subject, date_str, self.selected_subject))
-        else:
-            cur.execute("""
-                SELECT s.student_id, s.name, s.grade_level, s.section,
-                       COALESCE(a.status, 'Not Marked') as status
-                FROM students s
-                LEFT JOIN attendance a ON s.student_id = a.student_id 
-                    AND a.subject = ? AND a.date = ?
-                WHERE EXISTS (
-                    SELECT 1 FROM grades g 
-                    WHERE g.student_id = s.student_id AND g.subject = ?
-                ) AND s.section = ?
-                ORDER BY s.name
-            """, (self.selected_subject, date_str, self.selected_subject, section_filter))
-            
-        rows = cur.fetchall()
-        conn.close()
+        rows = self.db.attendance.list_for_day(self.selected_subject, date_str, section)
 
         for row in rows:
             status = row[4]
@@ -903,39 +683,14 @@ class ClassRecordSystem:
             messagebox.showerror("Error", "Please select students to mark!")
             return
 
-        date_str = self.attendance_date.get()
-        
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        
-        for item in selected:
-            student_id = self.attendance_tree.item(item)["values"][0]
-            
-            # Check if attendance record already exists
-            cur.execute("""
-                SELECT id FROM attendance 
-                WHERE student_id = ? AND subject = ? AND date = ?
-            """, (student_id, self.selected_subject, date_str))
-            
-            existing_record = cur.fetchone()
-            
-            if existing_record:
-                # Update existing record
-                cur.execute("""
-                    UPDATE attendance SET status = ?
-                    WHERE student_id = ? AND subject = ? AND date = ?
-                """, (status, student_id, self.selected_subject, date_str))
-            else:
-                # Insert new record
-                cur.execute("""
-                    INSERT INTO attendance (student_id, subject, date, status)
-                    VALUES (?, ?, ?, ?)
-                """, (student_id, self.selected_subject, date_str, status))
+        date_str = self.checked_attendance_date()
+        if not date_str:
+            return
         
-        conn.commit()
-        conn.close()
+        student_ids = [str(self.attendance_tree.item(item)["values"][0]) for item in selected]
+        marked = self.db.attendance.mark(self.selected_subject, date_str, student_ids, status)
         
-        messagebox.showinfo("Success", f"Marked {len(selected)} students as {'Present' if status == 'P' else 'Absent'}")
+        messagebox.showinfo("Success", f"Marked {marked} students as {'Present' if status == 'P' else 'Absent'}")
         
         # Refresh the attendance display
         self.load_attendance_data()
@@ -1112,17 +867,7 @@ class ClassRecordSystem:
         if not self.selected_subject:
             return
             
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT DISTINCT s.student_id, s.name, s.section
-            FROM students s
-            JOIN grades g ON s.student_id = g.student_id
-            WHERE g.subject = ?
-            ORDER BY s.section, s.name
-        """, (self.selected_subject,))
-        students = cur.fetchall()
-        conn.close()
+        students = self.db.roster.list_enrolled(self.selected_subject)
         
         student_list = [f"{student[0]} - {student[1]} ({student[2]})" for student in students]
         self.student_combobox.configure(values=student_list)
@@ -1139,15 +884,7 @@ class ClassRecordSystem:
             
         student_id = selected.split(" - ")[0]
         
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT written_works, quizzes, activities, performance_tasks, final_grade, status 
-            FROM grades 
-            WHERE student_id = ? AND subject = ?
-        """, (student_id, self.selected_subject))
-        result = cur.fetchone()
-        conn.close()
+        result = self.db.grades.get_grades(student_id, self.selected_subject)
         
         if result:
             grades_data = {
@@ -1202,12 +939,7 @@ class ClassRecordSystem:
             final_grade = sum(grades.values()) / 4
         else:
             # Get current grades for components not being updated
-            conn = sqlite3.connect("class_records.db")
-            cur = conn.cursor()
-            cur.execute("SELECT written_works, quizzes, activities, performance_tasks FROM grades WHERE student_id = ? AND subject = ?", 
-                       (student_id, self.selected_subject))
-            current_grades = cur.fetchone()
-            conn.close()
+            current_grades = self.db.grades.get_grades(student_id, self.selected_subject)
             
             if current_grades:
                 current_grade_dict = {
@@ -1235,38 +967,7 @@ class ClassRecordSystem:
         status = "Passing" if final_grade >= 75.0 else "Failing"
         
         try:
-            conn = sqlite3.connect("class_records.db")
-            cur = conn.cursor()
-            
-            # Build the update query
-            update_fields = []
-            update_values = []
-            
-            for component, grade in grades.items():
-                update_fields.append(f"{component} = ?")
-                update_values.append(grade)
-            
-            # Always update final_grade and status
-            update_fields.append("final_grade = ?")
-            update_values.append(round(final_grade, 1))
-            
-            update_fields.append("status = ?")
-            update_values.append(status)
-            
-            update_fields.append("timestamp = ?")
-            update_values.append(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-            
-            update_values.extend([student_id, self.selected_subject])
-            
-            query = f"""
-                UPDATE grades 
-                SET {', '.join(update_fields)}
-                WHERE student_id = ? AND subject = ?
-            """
-            
-            cur.execute(query, update_values)
-            conn.commit()
-            conn.close()
+            self.db.grades.update_grades(student_id, self.selected_subject, grades, final_grade, status)
             
             messagebox.showinfo("Success", f"Grades updated successfully!\nFinal Grade: {final_grade:.1f}% - Status: {status}")
             
@@ -1475,35 +1176,21 @@ class ClassRecordSystem:
         for item in self.subjects_tree.get_children():
             self.subjects_tree.delete(item)
             
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute("SELECT id, subject_name FROM subjects ORDER BY subject_name")
-        subjects = cur.fetchall()
-        conn.close()
+        subjects = self.db.subjects.list_subjects()
 
         for subject in subjects:
             self.subjects_tree.insert("", "end", values=subject)
 
     def load_subject_combo(self):
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute("SELECT subject_name FROM subjects ORDER BY subject_name")
-        subjects = cur.fetchall()
-        conn.close()
-        
-        subject_list = [subject[0] for subject in subjects]
+        subject_list = self.db.subjects.list_subject_names()
         self.student_subject_combo.configure(values=subject_list)
         if subject_list:
             self.student_subject_combo.set(subject_list[0])
 
     def load_all_students_combo(self):
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute("SELECT student_id, name, section FROM students ORDER BY name")
-        students = cur.fetchall()
-        conn.close()
+        students = self.db.roster.search_students()
         
-        student_list = [f"{student[0]} - {student[1]} ({student[2]})" for student in students]
+        student_list = [f"{student.student_id} - {student.name} ({student.section})" for student in students]
         self.all_students_combo.configure(values=student_list)
         if student_list:
             self.all_students_combo.set(student_list[0])
@@ -1516,11 +1203,7 @@ class ClassRecordSystem:
             return
             
         try:
-            conn = sqlite3.connect("class_records.db")
-            cur = conn.cursor()
-            cur.execute("INSERT INTO subjects (subject_name) VALUES (?)", (subject_name,))
-            conn.commit()
-            conn.close()
+            self.db.subjects.add_subject(subject_name)
             
             messagebox.showinfo("Success", f"Subject '{subject_name}' added successfully!")
             self.new_subject_entry.delete(0, "end")
@@ -1550,20 +1233,8 @@ class ClassRecordSystem:
             return
             
         try:
-            conn = sqlite3.connect("class_records.db")
-            cur = conn.cursor()
-            
-            # Delete from subjects table
-            cur.execute("DELETE FROM subjects WHERE id = ?", (subject_id,))
-            
-            # Delete related grades
-            cur.execute("DELETE FROM grades WHERE subject = ?", (subject_name,))
-            
-            # Delete related attendance records
-            cur.execute("DELETE FROM attendance WHERE subject = ?", (subject_name,))
-            
-            conn.commit()
-            conn.close()
+            # Grades, attendance and teacher assignments cascade
+            self.db.subjects.delete_subject(subject_id)
             
             messagebox.showinfo("Success", f"Subject '{subject_name}' deleted successfully!")
             self.load_subjects()
@@ -1587,32 +1258,12 @@ class ClassRecordSystem:
             messagebox.showerror("Error", "Grade level must be a number!")
             return
             
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        
-        try:
-            # Get the highest existing student ID to auto-generate the next one
-            cur.execute("SELECT student_id FROM students WHERE student_id LIKE 'S%' ORDER BY CAST(SUBSTR(student_id, 2) AS INTEGER) DESC LIMIT 1")
-            result = cur.fetchone()
-            
-            if result:
-                # Extract the number part and increment
-                last_id = result[0]
-                last_number = int(last_id[1:])  # Remove 'S' and convert to int
-                new_number = last_number + 1
-                student_id = f"S{new_number:03d}"
-            else:
-                # If no students exist yet, start with S001
-                student_id = "S001"
-            
-            # Insert new student with empty subjects and attendance
-            cur.execute(
-                "INSERT INTO students (student_id, name, grade_level, section, subjects, attendance) VALUES (?, ?, ?, ?, ?, ?)",
-                (student_id, name, grade_level, section, "{}", "{}")
-            )
+        if not self.db.sections.exists(section):
+            messagebox.showerror("Error", f"Section '{section}' does not exist!")
+            return
             
-            conn.commit()
-            conn.close()
+        try:
+            student_id = self.db.roster.add_student(name, grade_level, section)
             
             messagebox.showinfo("Success", f"Student '{name}' added successfully with ID: {student_id}!")
             
@@ -1625,7 +1276,6 @@ class ClassRecordSystem:
             
         except sqlite3.Error as e:
             messagebox.showerror("Database Error", f"Failed to add student: {str(e)}")
-            conn.close()
 
     def add_student_to_subject(self):
         subject_name = self.student_subject_combo.get()
@@ -1637,12 +1287,8 @@ class ClassRecordSystem:
             
         student_id = student_selection.split(" - ")[0]
         
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute("SELECT 1 FROM grades WHERE student_id = ? AND subject = ?", (student_id, subject_name))
-        if cur.fetchone():
+        if self.db.grades.is_enrolled(student_id, subject_name):
             messagebox.showerror("Error", "This student is already enrolled in this subject!")
-            conn.close()
             return
         
         try:
@@ -1653,21 +1299,18 @@ class ClassRecordSystem:
             final_grade = (written_works * 0.25 + quizzes * 0.25 + activities * 0.25 + performance_tasks * 0.25)
             status = "Passing" if final_grade >= 75.0 else "Failing"
             
-            cur.execute("""
-                INSERT INTO grades 
-                (student_id, subject, written_works, quizzes, activities, performance_tasks, final_grade, status, timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (student_id, subject_name, written_works, quizzes, activities, performance_tasks, 
-                  round(final_grade, 1), status, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-            
-            conn.commit()
-            conn.close()
+            self.db.grades.enroll(student_id, subject_name, {
+                "written_works": written_works,
+                "quizzes": quizzes,
+                "activities": activities,
+                "performance_tasks": performance_tasks,
+                "final_grade": round(final_grade, 1)
+            }, status)
             
             messagebox.showinfo("Success", f"Student added to '{subject_name}' successfully!")
             
         except sqlite3.Error as e:
             messagebox.showerror("Database Error", f"Failed to add student to subject: {str(e)}")
-            conn.close()
 
     def change_appearance_mode(self, new_appearance_mode):
         ctk.set_appearance_mode(new_appearance_mode)
@@ -1,16 +1,24 @@
 import customtkinter as ctk
-import sqlite3  # Added import
+import sqlite3
+from tkinter import messagebox
 from datetime import datetime  # Added import
 
-from database import db_setup, generate_sample_data
+from connection import DB_PATH
+from database import needs_sample_data, reset_database
+from migrations import migrate
+from repository import DataStore
+from scheduler import QueryScheduler
+from seeding import generate_sample_data
 from ui.login_screen import LoginScreenMixin
 from ui.main_screen import MainScreenMixin
 
 
 class ClassRecordSystem(LoginScreenMixin, MainScreenMixin):
-    def __init__(self, root):
+    def __init__(self, root, seed=False, db_path=DB_PATH, archives=None, trash_retention_days=0):
         """Initialize Class Record System application"""
         self.root = root
+        self.seed = seed
+        self.db_path = db_path
         self.root.title("Class Record Management System")
         self.root.geometry("1400x900")
         self.root.resizable(True, True)
@@ -22,63 +30,56 @@ class ClassRecordSystem(LoginScreenMixin, MainScreenMixin):
         self.current_attendance_section = "All Sections"
         self.current_stats_frame = None
 
+        # Headless data access shared by every screen
+        self.db = DataStore(db_path)
+        self.scheduler = QueryScheduler(self.root)
+
         # Setup database and start login screen
         self.initialize_database()
+        self.attach_archives(archives or {})
+        self.purge_old_trash(trash_retention_days)
         self.login_screen()
 
     def initialize_database(self):
-        """Create and update database tables with sample data"""
-        db_setup()
-        
-        # Check and update database schema if needed
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        
-        try:
-            # Check if password_hash column exists
-            cur.execute("PRAGMA table_info(teachers)")
-            columns = [column[1] for column in cur.fetchall()]
-            
-            if 'password_hash' not in columns:
-                # Add password_hash column
-                cur.execute("ALTER TABLE teachers ADD COLUMN password_hash TEXT")
-                
-                # Update existing teachers with default password
-                from database import simple_hash_password
-                default_password = simple_hash_password("password123")
-                cur.execute("UPDATE teachers SET password_hash = ?", (default_password,))
-                
-                conn.commit()
-                print("Database updated: Added password_hash column to teachers table")
-                
-            # Check if student_trash table exists
-            cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='student_trash'")
-            if not cur.fetchone():
-                # Create student_trash table
-                cur.execute("""
-                    CREATE TABLE student_trash (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        original_id TEXT,
-                        student_id TEXT,
-                        name TEXT,
-                        grade_level INTEGER,
-                        section TEXT,
-                        subjects TEXT,
-                        attendance TEXT,
-                        deleted_at TEXT,
-                        deleted_by TEXT
-                    )
-                """)
-                conn.commit()
-                print("Database updated: Created student_trash table")
-                
-        except Exception as e:
-            print(f"Database initialization error: {e}")
-        finally:
-            conn.close()
-        
-        # Generate sample data for testing
-        generate_sample_data()
+        """Bring the schema up to date and load sample data when needed"""
+        if self.seed:
+            # Explicit --seed rebuilds the demo database from scratch
+            reset_database(self.db_path)
+
+        migrate(self.db_path)
+
+        # Fresh databases get sample data so there is a teacher to log in as
+        if self.seed or needs_sample_data(self.db_path):
+            generate_sample_data(self.db_path)
+
+    def attach_archives(self, archives):
+        """Open past school years read-only; a missing archive is skipped, not fatal"""
+        for label, path in archives.items():
+            try:
+                self.db.archives.attach(label, path)
+            except sqlite3.OperationalError as e:
+                print(f"School year {label} not available ({path}): {e}")
+
+    def purge_old_trash(self, days):
+        """Purge expired trash bin entries in the background; 0 days keeps everything"""
+        if days <= 0:
+            return
+
+        def on_purged(removed):
+            if removed:
+                print(f"Trash bin: purged {removed} entries older than {days} days")
+                messagebox.showinfo(
+                    "Trash Bin",
+                    f"Permanently deleted {removed} trash bin entries older than {days} days "
+                    f"(trash retention is set to {days} days)."
+                )
+
+        self.scheduler.submit(
+            "trash_retention",
+            lambda: self.db.trash.purge_older_than(days),
+            on_purged,
+            lambda error: print(f"Trash bin retention failed: {error}")
+        )
 
     def center_window(self, width, height):
         """Center application window on screen"""
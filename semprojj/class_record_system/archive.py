@@ -0,0 +1,85 @@
+import argparse
+import os
+import sqlite3
+
+from attendance_codec import TERM_DAYS, term_slot, absences_sql
+from connection import get_connection, DB_PATH
+from migrations import migrate
+
+
+def _keep_marks(cur, year, day, before):
+    """Clear marks on one side of a cutoff day and drop rows left empty"""
+    if before:
+        # Marks up to the day before the cutoff survive
+        cur.execute("DELETE FROM attendance_terms WHERE year > ?", (year,))
+        cur.execute(
+            "UPDATE attendance_terms SET marks = CAST(substr(marks, 1, ?) || zeroblob(?) AS BLOB) WHERE year = ?",
+            (day - 1, TERM_DAYS - day + 1, year)
+        )
+    else:
+        cur.execute("DELETE FROM attendance_terms WHERE year < ?", (year,))
+        cur.execute(
+            "UPDATE attendance_terms SET marks = CAST(zeroblob(?) || substr(marks, ?) AS BLOB) WHERE year = ?",
+            (day - 1, day, year)
+        )
+    cur.execute(f"UPDATE attendance_terms SET absences = {absences_sql('marks')} WHERE year = ?", (year,))
+    cur.execute("DELETE FROM attendance_terms WHERE marks = zeroblob(?)", (TERM_DAYS,))
+
+
+def archive_school_year(archive_path, cutoff, db_path=DB_PATH, verbose=True):
+    """Move attendance from before cutoff into a read-only archive of the database
+
+    The archive starts as a snapshot of the whole database, so it also keeps
+    the roster and final grades as they stood; run this at the start of a
+    school year, before the new grades are entered. Only attendance is taken
+    out of the live database. Returns the number of attendance rows moved.
+    """
+    if os.path.exists(archive_path):
+        raise ValueError(f"{archive_path} already exists")
+    year, day = term_slot(cutoff)
+
+    migrate(db_path)
+    conn = get_connection(db_path)
+    cur = conn.cursor()
+    cur.execute("VACUUM INTO ?", (archive_path,))
+
+    archive = sqlite3.connect(archive_path)
+    try:
+        # Opened read-only later, which a WAL file cannot always manage
+        archive.execute("PRAGMA journal_mode = DELETE")
+        _keep_marks(archive, year, day, before=True)
+        archive.commit()
+        moved = archive.execute("SELECT COUNT(*) FROM attendance_terms").fetchone()[0]
+        archive.execute("VACUUM")
+    finally:
+        archive.close()
+
+    try:
+        _keep_marks(cur, year, day, before=False)
+        conn.commit()
+        # Give the freed pages back to the file system
+        cur.execute("VACUUM")
+    finally:
+        conn.close()
+
+    if verbose:
+        print(f"Archived {moved} attendance rows from before {cutoff} to {archive_path}")
+    return moved
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move a finished school year's attendance into an archive database")
+    parser.add_argument("--db", default=DB_PATH, help="live database file")
+    parser.add_argument("--archive", required=True, help="archive file to create, e.g. class_records_2023-2024.db")
+    parser.add_argument("--cutoff", required=True, help="first day of the current school year, YYYY-MM-DD")
+    parser.add_argument("--label", help="school year label for the [archives] config section")
+    args = parser.parse_args()
+
+    archive_school_year(args.archive, args.cutoff, db_path=args.db)
+    label = args.label or os.path.splitext(os.path.basename(args.archive))[0]
+    print("Add it to class_records.ini to open it from the application:")
+    print(f"  [archives]\n  {label} = {os.path.abspath(args.archive)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+from datetime import date, timedelta
+
+
+# Packed attendance, as stored in attendance_terms.marks
+#
+# Each attendance_terms row holds one student's marks in one subject for one
+# calendar year, so a school year running from June to March spans two rows.
+# marks is a BLOB of TERM_DAYS bytes where byte N - 1 is day N of the year,
+# numbered as strftime('%j') does: January 1st is byte 0 and December 31st
+# is byte 364, or 365 in a leap year. A zero byte means the day is not
+# marked; any other byte is the ASCII status letter, b"P" or b"A". Rows are
+# always full length, so marking a day replaces one byte in place and SQL can
+# read a day with substr(marks, N, 1).
+#
+# attendance_terms.absences holds the number of b"A" bytes in marks, so
+# absence totals sum a column rather than read every BLOB. Whatever writes
+# marks sets it too: count_absences() in Python, absences_sql() in SQL.
+TERM_DAYS = 366
+UNMARKED = 0
+ABSENT = b"A"
+
+
+def term_slot(date_str):
+    """(year, day of year) for a YYYY-MM-DD date; January 1st is day 1"""
+    day = date.fromisoformat(date_str)
+    return day.year, day.timetuple().tm_yday
+
+
+def slot_date(year, day):
+    """YYYY-MM-DD date of a day of the year"""
+    return (date(year, 1, 1) + timedelta(days=day - 1)).isoformat()
+
+
+def pack_marks(marks):
+    """marks BLOB for a {day of year: status letter} dict"""
+    packed = bytearray(TERM_DAYS)
+    for day, status in marks.items():
+        packed[day - 1] = ord(status)
+    return bytes(packed)
+
+
+def unpack_marks(year, packed):
+    """(date, status letter) for every marked day of a marks BLOB, in date order"""
+    return [
+        (slot_date(year, index + 1), chr(code))
+        for index, code in enumerate(packed)
+        if code != UNMARKED
+    ]
+
+
+def count_absences(packed):
+    """Absent marks in a marks BLOB"""
+    return packed.count(ABSENT)
+
+
+def absences_sql(marks):
+    """SQL expression counting the absent marks of a marks column or expression
+
+    hex() spells each byte as two digits and only b"A" comes out as 41, so
+    every 41 in it is one absence.
+    """
+    return f"((length(hex({marks})) - length(replace(hex({marks}), '41', ''))) / 2)"
+
+
+def pack_by_term(dated_marks):
+    """{year: marks BLOB} for a {YYYY-MM-DD date: status letter} dict"""
+    terms = {}
+    for date_str, status in dated_marks.items():
+        year, day = term_slot(date_str)
+        terms.setdefault(year, {})[day] = status
+    return {year: pack_marks(marks) for year, marks in terms.items()}
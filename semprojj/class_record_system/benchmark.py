@@ -0,0 +1,412 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+from connection import get_connection, configure_pool, close_all_pools, DEFAULT_PRAGMAS
+from migrations import migrate
+from repository import DataStore
+from roster_import import import_roster, SUBJECT_SEPARATOR
+from seeding import seed_database, build_sections, FIRST_NAMES, LAST_NAMES, ALL_SUBJECTS
+
+
+DEFAULT_SCALES = [1000, 10000, 100000]
+DEFAULT_DATA_DIR = "benchmark_data"
+DEFAULT_RESULTS_DIR = "benchmark_results"
+
+BENCH_SUBJECT = "Math"
+BENCH_SECTION = "Grade 9 Diamond"
+BENCH_DATE = "2024-01-05"
+BENCH_SEARCH = "Smith"
+
+
+# Query paths, through the same repository calls the UI makes
+
+def grades_all(store):
+    """Grades tab with no filters"""
+    return store.grades.list_for_subject(BENCH_SUBJECT)
+
+
+def grades_search(store):
+    """Grades tab with a section filter and a search term"""
+    return store.grades.list_for_subject(BENCH_SUBJECT, section=BENCH_SECTION, search=BENCH_SEARCH)
+
+
+def attendance_all(store):
+    """Attendance tab for all sections"""
+    return store.attendance.list_for_day(BENCH_SUBJECT, BENCH_DATE)
+
+
+def attendance_section(store):
+    """Attendance tab for one section"""
+    return store.attendance.list_for_day(BENCH_SUBJECT, BENCH_DATE, section=BENCH_SECTION)
+
+
+def subject_stats(store):
+    """Subject dashboard stat cards"""
+    return store.stats.subject_stats(BENCH_SUBJECT, BENCH_DATE)
+
+
+def welcome_stats(store):
+    """Welcome screen statistics"""
+    return store.stats.system_stats(BENCH_DATE)
+
+
+def sections_data(store):
+    """Sections tab"""
+    return store.sections.list_sections()
+
+
+QUERY_PATHS = {
+    "grades_all": grades_all,
+    "grades_search": grades_search,
+    "attendance_all": attendance_all,
+    "attendance_section": attendance_section,
+    "subject_stats": subject_stats,
+    "welcome_stats": welcome_stats,
+    "sections_data": sections_data,
+}
+
+
+# Journal settings compared by --concurrency: SQLite's defaults, and the
+# pool's profile with the file switched to WAL
+CONCURRENCY_PROFILES = {
+    "rollback": {
+        "busy_timeout": 5000,
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+    },
+    "wal": {**DEFAULT_PRAGMAS, "journal_mode": "WAL", "synchronous": "NORMAL"},
+}
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def prepare_database(data_dir, students, days, sections):
+    """Seed (or reuse) the benchmark database for one scale"""
+    os.makedirs(data_dir, exist_ok=True)
+    db_path = os.path.join(data_dir, f"bench_{students}_{days}d.db")
+
+    if os.path.exists(db_path):
+        try:
+            conn = get_connection(db_path)
+            cur = conn.cursor()
+            cur.execute("SELECT COUNT(*) FROM students")
+            existing = cur.fetchone()[0]
+            conn.close()
+            if existing >= students:
+                migrate(db_path)
+                return db_path
+        except sqlite3.Error:
+            pass
+
+    print(f"Seeding {students} students x {days} days into {db_path}...")
+    seed_database(
+        db_path=db_path,
+        num_sections=sections,
+        students_per_section=-(-students // sections),
+        days=days,
+        absence_rate=0.1,
+        random_seed=students,
+        reset=True,
+        verbose=False
+    )
+    return db_path
+
+
+def attendance_footprint(db_path):
+    """Bytes of attendance tables and their indexes, or None without the dbstat table"""
+    conn = get_connection(db_path)
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT SUM(pgsize) FROM dbstat
+            WHERE name IN (SELECT name FROM sqlite_master WHERE tbl_name LIKE 'attendance%')
+        """)
+        return cur.fetchone()[0]
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        conn.close()
+
+
+def run_path(db_path, query_path, runs, warmup):
+    """Time one query path; returns latency summary in milliseconds"""
+    store = DataStore(db_path)
+    samples = []
+    for i in range(warmup + runs):
+        started = time.perf_counter()
+        query_path(store)
+        elapsed = (time.perf_counter() - started) * 1000.0
+        if i >= warmup:
+            samples.append(elapsed)
+
+    return {
+        "runs": runs,
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "mean_ms": round(statistics.mean(samples), 3),
+        "min_ms": round(min(samples), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+def _concurrency_worker(role, db_path, profile, seconds, results):
+    """One simulated workstation: re-mark whole subjects, or reload the attendance tab"""
+    configure_pool(pragmas=CONCURRENCY_PROFILES[profile])
+    store = DataStore(db_path)
+    subjects = store.subjects.list_subject_names()
+    samples = []
+    errors = 0
+    writes = 0
+    status = "A"
+    deadline = time.perf_counter() + seconds
+
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            if role == "writer":
+                for subject in subjects:
+                    store.attendance.mark_all(subject, BENCH_DATE, status)
+                    writes += 1
+                status = "P" if status == "A" else "A"
+            else:
+                attendance_all(store)
+                samples.append((time.perf_counter() - started) * 1000.0)
+        except sqlite3.OperationalError:
+            errors += 1
+
+    close_all_pools()
+    results.put((role, samples, errors, writes))
+
+
+def copy_database(source_path, target_path):
+    """Consistent copy of a database file, including pages still in its WAL"""
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+def run_concurrency(db_path, profile, readers, seconds):
+    """Reader latency on the attendance tab while a writer keeps re-marking whole subjects
+
+    The writer and each reader are separate processes with their own
+    connections, like separate teacher workstations sharing the file. They
+    share a scratch copy of db_path, so neither the writer's marks nor the
+    profile's journal mode reach the benchmark database.
+    """
+    close_all_pools()
+    scratch_dir = tempfile.mkdtemp(prefix="concurrency_", dir=os.path.dirname(os.path.abspath(db_path)))
+    scratch_path = os.path.join(scratch_dir, os.path.basename(db_path))
+    try:
+        copy_database(db_path, scratch_path)
+
+        # The journal mode belongs to the file, so switch it before anyone else opens it
+        configure_pool(pragmas=CONCURRENCY_PROFILES[profile])
+        get_connection(scratch_path).close()
+        close_all_pools()
+
+        results = multiprocessing.Queue()
+        roles = ["writer"] + ["reader"] * readers
+        workers = [
+            multiprocessing.Process(target=_concurrency_worker, args=(role, scratch_path, profile, seconds, results))
+            for role in roles
+        ]
+        for worker in workers:
+            worker.start()
+        outcomes = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+    finally:
+        # Later pools go back to the class_records.ini profile
+        configure_pool(pragmas=None)
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    samples = [sample for role, worker_samples, _, _ in outcomes for sample in worker_samples]
+    return {
+        "reads": len(samples),
+        "reads_per_s": round(len(samples) / seconds, 1),
+        "read_p50_ms": round(percentile(samples, 50), 3) if samples else None,
+        "read_p99_ms": round(percentile(samples, 99), 3) if samples else None,
+        "read_errors": sum(errors for role, _, errors, _ in outcomes if role == "reader"),
+        "writes_per_s": round(sum(writes for _, _, _, writes in outcomes) / seconds, 1),
+    }
+
+
+def write_roster(path, rows, sections, error_rate=0.01, random_seed=0):
+    """Synthetic roster CSV; about error_rate of the rows name a section that does not exist"""
+    rng = random.Random(random_seed)
+    section_list = build_sections(sections)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "grade_level", "section", "subjects"])
+        for _ in range(rows):
+            section_name, grade_level = rng.choice(section_list)
+            if rng.random() < error_rate:
+                section_name = "Unknown Section"
+            writer.writerow([
+                f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                grade_level,
+                section_name,
+                SUBJECT_SEPARATOR.join(rng.sample(ALL_SUBJECTS, rng.randint(3, 6))),
+            ])
+
+
+def run_import(data_dir, rows, sections):
+    """Import a synthetic roster of rows students into a database with no students yet"""
+    os.makedirs(data_dir, exist_ok=True)
+    roster_path = os.path.join(data_dir, f"roster_{rows}.csv")
+    db_path = os.path.join(data_dir, f"import_{rows}.db")
+    write_roster(roster_path, rows, sections)
+    seed_database(db_path=db_path, num_sections=sections, students_per_section=0, reset=True, verbose=False)
+
+    summary = import_roster(roster_path, db_path=db_path, verbose=False)
+    summary["rows_per_s"] = round(summary["rows"] / summary["seconds"], 1) if summary["seconds"] else None
+    return summary
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+            text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(previous, current):
+    """Print p50/p99 change per scale and query path against an earlier run"""
+    print(f"\nCompared with {previous['meta'].get('revision')} ({previous['meta'].get('timestamp')}):")
+    for scale, paths in current["results"].items():
+        old_paths = previous["results"].get(scale, {})
+        for name, summary in paths.items():
+            old = old_paths.get(name)
+            if not old:
+                continue
+            p50_change = (summary["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100 if old["p50_ms"] else 0.0
+            p99_change = (summary["p99_ms"] - old["p99_ms"]) / old["p99_ms"] * 100 if old["p99_ms"] else 0.0
+            print(f"  {scale:>7} {name:<20} p50 {p50_change:+7.1f}%   p99 {p99_change:+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the data access paths against synthetic databases")
+    parser.add_argument(
+        "--scales", type=int, nargs="+", default=DEFAULT_SCALES,
+        help="student counts to benchmark (default: 1000 10000 100000)"
+    )
+    parser.add_argument("--days", type=int, default=15, help="attendance days per enrollment")
+    parser.add_argument("--sections", type=int, default=40, help="sections per database")
+    parser.add_argument("--runs", type=int, default=50, help="timed runs per query path")
+    parser.add_argument("--warmup", type=int, default=3, help="untimed runs per query path")
+    parser.add_argument(
+        "--paths", nargs="+", choices=sorted(QUERY_PATHS), default=list(QUERY_PATHS),
+        help="query paths to run (default: all)"
+    )
+    parser.add_argument(
+        "--concurrency", type=float, metavar="SECONDS",
+        help="also time readers against a concurrent writer under each journal profile"
+    )
+    parser.add_argument("--readers", type=int, default=4, help="reader threads for --concurrency")
+    parser.add_argument(
+        "--import-rows", type=int, nargs="+", metavar="ROWS",
+        help="also time importing synthetic CSV rosters of these sizes, e.g. 100000"
+    )
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="where seeded databases are kept")
+    parser.add_argument("--output", help="JSON results file (default: benchmark_results/<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier JSON results file to compare against")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "days": args.days,
+            "sections": args.sections,
+            "runs": args.runs,
+        },
+        "results": {},
+        "attendance_bytes": {},
+        "concurrency": {},
+        "import": {},
+    }
+
+    for students in args.scales:
+        db_path = prepare_database(args.data_dir, students, args.days, args.sections)
+        scale_results = {}
+        footprint = attendance_footprint(db_path)
+        results["attendance_bytes"][str(students)] = footprint
+        print(f"\n{students} students ({db_path})")
+        if footprint is not None:
+            print(f"  attendance storage: {footprint / 1024:.0f} KiB")
+        print(f"  {'path':<20} {'p50 ms':>10} {'p99 ms':>10}")
+        for name in args.paths:
+            summary = run_path(db_path, QUERY_PATHS[name], args.runs, args.warmup)
+            scale_results[name] = summary
+            print(f"  {name:<20} {summary['p50_ms']:>10.3f} {summary['p99_ms']:>10.3f}")
+        results["results"][str(students)] = scale_results
+
+        if args.concurrency:
+            print(f"\n  {args.readers} readers + 1 writer for {args.concurrency:g}s")
+            print(f"  {'profile':<10} {'reads/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'errors':>8} {'writes/s':>10}")
+            concurrency = {}
+            for profile in CONCURRENCY_PROFILES:
+                summary = run_concurrency(db_path, profile, args.readers, args.concurrency)
+                concurrency[profile] = summary
+                print(
+                    f"  {profile:<10} {summary['reads_per_s']:>10.1f} {summary['read_p50_ms'] or 0:>10.3f} "
+                    f"{summary['read_p99_ms'] or 0:>10.3f} {summary['read_errors']:>8} {summary['writes_per_s']:>10.1f}"
+                )
+            results["concurrency"][str(students)] = concurrency
+
+    if args.import_rows:
+        print(f"\n  {'roster rows':<12} {'seconds':>10} {'rows/s':>10} {'students':>10} {'enrolled':>10} {'errors':>8}")
+        for rows in args.import_rows:
+            summary = run_import(args.data_dir, rows, args.sections)
+            results["import"][str(rows)] = summary
+            print(
+                f"  {rows:<12} {summary['seconds']:>10.2f} {summary['rows_per_s'] or 0:>10.1f} "
+                f"{summary['students']:>10} {summary['enrollments']:>10} {summary['errors']:>8}"
+            )
+
+    output = args.output
+    if not output:
+        os.makedirs(DEFAULT_RESULTS_DIR, exist_ok=True)
+        output = os.path.join(DEFAULT_RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare_results(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main()
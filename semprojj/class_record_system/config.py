@@ -0,0 +1,95 @@
+import configparser
+import os
+
+
+DEFAULT_DB_PATH = "class_records.db"
+DEFAULT_CONFIG_FILE = "class_records.ini"
+# Trash bin entries older than this are purged at startup; 0 keeps them
+# forever, so nothing is purged unless retention is turned on
+DEFAULT_TRASH_RETENTION_DAYS = 0
+
+# Environment overrides, checked after command line flags
+DB_PATH_ENV = "CLASS_RECORDS_DB"
+CONFIG_FILE_ENV = "CLASS_RECORDS_CONFIG"
+
+# class_records.ini layout; relative paths are resolved against the file's
+# own directory, so a shared config can sit next to the database:
+#
+#   [database]
+#   path = //fileserver/records/class_records.db
+#   journal_mode = delete
+#
+#   [archives]
+#   2023-2024 = archives/class_records_2023-2024.db
+#   2022-2023 = archives/class_records_2022-2023.db
+#
+#   [trash]
+#   retention_days = 90
+
+
+def config_file_path():
+    """Config file named by $CLASS_RECORDS_CONFIG, else class_records.ini in the working directory"""
+    return os.environ.get(CONFIG_FILE_ENV) or DEFAULT_CONFIG_FILE
+
+
+def load_config(path=None):
+    """Parsed config file; empty when the file does not exist"""
+    path = path or config_file_path()
+    config = configparser.ConfigParser()
+    # Keep archive labels as written instead of lowercasing them
+    config.optionxform = str
+    config.read(path)
+    return config
+
+
+def _config_relative(path, config_path):
+    return os.path.join(os.path.dirname(os.path.abspath(config_path)), os.path.expanduser(path))
+
+
+def database_path(cli_path=None, config_path=None):
+    """Live database file: --db, then $CLASS_RECORDS_DB, then the config file, then the default"""
+    if cli_path:
+        return cli_path
+    if os.environ.get(DB_PATH_ENV):
+        return os.environ[DB_PATH_ENV]
+
+    config_path = config_path or config_file_path()
+    path = load_config(config_path).get("database", "path", fallback=None)
+    if path:
+        return _config_relative(path, config_path)
+    return DEFAULT_DB_PATH
+
+
+# SQLite journal modes class_records.ini may ask for. wal lets readers keep
+# going while someone writes, but needs every connection on the same host;
+# a database on a network share must use delete. When unset, the database
+# file keeps whatever mode it already has.
+JOURNAL_MODES = ("wal", "delete")
+
+
+def journal_mode(config_path=None):
+    """Journal mode from the config file's [database] section, or None to leave the file as it is"""
+    mode = load_config(config_path).get("database", "journal_mode", fallback="").strip().lower()
+    if not mode:
+        return None
+    if mode not in JOURNAL_MODES:
+        raise ValueError(f"journal_mode must be one of {', '.join(JOURNAL_MODES)}, got {mode!r}")
+    return mode.upper()
+
+
+def archive_paths(config_path=None):
+    """{school year label: database file} for the archives listed in the config file"""
+    config_path = config_path or config_file_path()
+    config = load_config(config_path)
+    if not config.has_section("archives"):
+        return {}
+    return {
+        label: _config_relative(path, config_path)
+        for label, path in config.items("archives")
+    }
+
+
+def trash_retention_days(config_path=None):
+    """Days trash bin entries are kept, from the config file; 0 means forever"""
+    config = load_config(config_path)
+    return config.getint("trash", "retention_days", fallback=DEFAULT_TRASH_RETENTION_DAYS)
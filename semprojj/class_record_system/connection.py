@@ -0,0 +1,421 @@
+import pathlib
+import sqlite3
+import threading
+import time
+
+from config import database_path, journal_mode
+
+
+# Resolved once from $CLASS_RECORDS_DB or the config file; main.py --db
+# passes its path explicitly instead
+DB_PATH = database_path()
+DEFAULT_POOL_SIZE = 8
+DEFAULT_HEALTH_CHECK_INTERVAL = 30.0
+DEFAULT_ACQUIRE_TIMEOUT = 10.0
+
+# Applied in order to every connection as it is opened. busy_timeout comes
+# first so a journal mode switch waits out other connections. The journal
+# mode is a property of the database file that persists, so it is only set
+# when asked for: journal_mode in class_records.ini (see config.py), or
+# explicitly through configure_pool. synchronous follows the mode the file
+# ends up in unless it is given: NORMAL is only crash-safe in WAL mode.
+DEFAULT_PRAGMAS = {
+    "busy_timeout": 5000,
+    "cache_size": -16000,
+    "mmap_size": 268435456,
+    "temp_store": "MEMORY",
+}
+
+
+def configured_pragmas(config_path=None):
+    """DEFAULT_PRAGMAS plus the journal mode class_records.ini asks for, if any"""
+    pragmas = dict(DEFAULT_PRAGMAS)
+    mode = journal_mode(config_path)
+    if mode:
+        pragmas["journal_mode"] = mode
+    return pragmas
+
+
+class PoolExhaustedError(sqlite3.OperationalError):
+    """Raised when no pooled connection becomes free before the timeout"""
+
+
+class PooledConnection:
+    """Connection handle whose close() hands the connection back to the pool
+
+    A nested checkout works inside a SAVEPOINT, so committing it cannot
+    commit the outer checkout's unfinished work: commit() releases the
+    savepoint, handing its changes to the outer transaction, and rollback()
+    or close() without a commit undo only what it did.
+    """
+
+    def __init__(self, pool, raw_conn, savepoint=None):
+        self._pool = pool
+        self._conn = raw_conn
+        self._nested = savepoint is not None
+        self._savepoint = savepoint
+        self._closed = False
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Commit on success, roll back on error, then release the handle"""
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        self.close()
+        return False
+
+    @property
+    def raw(self):
+        """Underlying sqlite3 connection"""
+        return self._conn
+
+    def commit(self):
+        if not self._nested:
+            self._conn.commit()
+        elif self._savepoint is not None:
+            self._conn.execute(f"RELEASE {self._savepoint}")
+            self._savepoint = None
+
+    def rollback(self):
+        if not self._nested:
+            self._conn.rollback()
+        elif self._savepoint is not None:
+            self._conn.execute(f"ROLLBACK TO {self._savepoint}")
+
+    def close(self):
+        """Release this handle; safe to call more than once"""
+        if not self._closed:
+            self._pool._release(self._conn, self._savepoint)
+            self._closed = True
+
+
+class ConnectionPool:
+    """Thread-aware SQLite connection pool
+
+    Each thread holds at most one connection at a time. Nested checkouts on the
+    same thread reuse that connection, so a helper called while the caller still
+    has a connection open shares its transaction instead of opening a second
+    one; see PooledConnection for how their commits nest. When a thread
+    releases its last handle the connection goes back to the idle list for
+    any thread to reuse. New connections get the pragmas profile,
+    DEFAULT_PRAGMAS unless one is given, and every attached archive.
+    """
+
+    def __init__(
+        self,
+        db_path=DB_PATH,
+        max_size=DEFAULT_POOL_SIZE,
+        health_check_interval=DEFAULT_HEALTH_CHECK_INTERVAL,
+        acquire_timeout=DEFAULT_ACQUIRE_TIMEOUT,
+        pragmas=None
+    ):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+
+        self._local = threading.local()
+        self._idle = []  # (connection, last_checked) pairs
+        self._attachments = {}  # schema name -> database file, attached read-only
+        self._attachment_version = 0
+        self._versions = {}  # connection -> attachment version it was opened with
+        self._total = 0
+        self._condition = threading.Condition()
+        self._closed = False
+
+        self._stats = {
+            "created": 0,
+            "reused": 0,
+            "nested": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "health_checks": 0,
+            "health_failures": 0,
+            "discarded": 0,
+        }
+
+    def open_unpooled(self):
+        """A connection with this pool's settings that the pool does not track
+
+        For long-lived single-purpose connections, such as one that only
+        watches PRAGMA data_version. Archives are not attached. The caller
+        closes it.
+        """
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, uri=True)
+        try:
+            for name, value in self.pragmas.items():
+                if name == "journal_mode":
+                    self._set_journal_mode(conn, value)
+                else:
+                    conn.execute(f"PRAGMA {name} = {value}").fetchall()
+            if "synchronous" not in self.pragmas:
+                mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+                conn.execute(f"PRAGMA synchronous = {'NORMAL' if mode.lower() == 'wal' else 'FULL'}")
+            # Off by default in SQLite; the schema relies on its ON DELETE rules
+            conn.execute("PRAGMA foreign_keys = ON")
+        except sqlite3.Error:
+            conn.close()
+            raise
+        return conn
+
+    def _connect(self):
+        conn = self.open_unpooled()
+        with self._condition:
+            attachments = dict(self._attachments)
+            self._versions[conn] = self._attachment_version
+            self._stats["created"] += 1
+        for schema, path in attachments.items():
+            try:
+                _attach_read_only(conn, schema, path)
+            except sqlite3.Error as e:
+                print(f"Archive {path} not attached: {e}")
+        return conn
+
+    def attach(self, schema, path):
+        """Attach a database file read-only as schema on every connection from now on
+
+        Raises sqlite3.OperationalError if the file cannot be opened.
+        Connections opened before the call are closed once released, so a
+        thread sees the archive on its next checkout.
+        """
+        probe = sqlite3.connect(":memory:", uri=True)
+        try:
+            _attach_read_only(probe, schema, path)
+        finally:
+            probe.close()
+        self._set_attachment(schema, path)
+
+    def detach(self, schema):
+        """Stop attaching schema to connections"""
+        self._set_attachment(schema, None)
+
+    def attachments(self):
+        """{schema name: database file} attached to connections"""
+        with self._condition:
+            return dict(self._attachments)
+
+    def _set_attachment(self, schema, path):
+        with self._condition:
+            if path is None:
+                self._attachments.pop(schema, None)
+            else:
+                self._attachments[schema] = path
+            self._attachment_version += 1
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._discard(conn)
+                self._total -= 1
+            self._condition.notify_all()
+
+    def _set_journal_mode(self, conn, mode):
+        """Switch the file's journal mode, which persists, unless it is already set"""
+        current = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        if current.lower() == str(mode).lower():
+            return
+        try:
+            conn.execute(f"PRAGMA journal_mode = {mode}").fetchall()
+        except sqlite3.OperationalError as e:
+            # Leaving WAL needs the file to itself; while other connections
+            # have it open it keeps its current mode
+            print(f"Journal mode stays {current} for now, {mode} not applied: {e}")
+
+    def _is_healthy(self, conn):
+        self._stats["health_checks"] += 1
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            self._stats["health_failures"] += 1
+            return False
+
+    def _discard(self, conn):
+        self._versions.pop(conn, None)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        self._stats["discarded"] += 1
+
+    def _acquire_raw(self):
+        """Take an idle connection, open a new one, or wait for a release"""
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Connection pool is closed")
+
+                while self._idle:
+                    conn, last_checked = self._idle.pop()
+                    if time.monotonic() - last_checked < self.health_check_interval:
+                        self._stats["reused"] += 1
+                        return conn
+                    if self._is_healthy(conn):
+                        self._stats["reused"] += 1
+                        return conn
+                    self._discard(conn)
+                    self._total -= 1
+
+                if self._total < self.max_size:
+                    self._total += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolExhaustedError(
+                        f"No free connection to {self.db_path} after {self.acquire_timeout}s"
+                    )
+                self._stats["waits"] += 1
+                self._condition.wait(remaining)
+
+        try:
+            return self._connect()
+        except sqlite3.Error:
+            with self._condition:
+                self._total -= 1
+                self._condition.notify()
+            raise
+
+    def get_connection(self):
+        """Check out this thread's connection, wrapped so close() releases it"""
+        conn = getattr(self._local, "conn", None)
+        with self._condition:
+            self._stats["checkouts"] += 1
+            if conn is not None:
+                self._stats["nested"] += 1
+        if conn is not None:
+            savepoint = f"pool_checkout_{self._local.depth + 1}"
+            conn.execute(f"SAVEPOINT {savepoint}")
+            self._local.depth += 1
+            return PooledConnection(self, conn, savepoint)
+
+        conn = self._acquire_raw()
+        self._local.conn = conn
+        self._local.depth = 1
+        return PooledConnection(self, conn)
+
+    def _release(self, conn, savepoint=None):
+        if getattr(self._local, "conn", None) is not conn:
+            raise sqlite3.ProgrammingError("Pooled connection released by a thread that did not check it out")
+
+        # Match sqlite3.Connection.close() for a nested checkout too: its
+        # uncommitted work is discarded, the outer checkout's is kept
+        if savepoint is not None and conn.in_transaction:
+            try:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+            except sqlite3.OperationalError:
+                # The outer checkout already ended the transaction it was in
+                pass
+
+        self._local.depth -= 1
+        if self._local.depth > 0:
+            return
+
+        self._local.conn = None
+
+        # Match sqlite3.Connection.close(): uncommitted work is discarded
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            with self._condition:
+                self._discard(conn)
+                self._total -= 1
+                self._condition.notify()
+            return
+
+        with self._condition:
+            if self._closed or self._versions.get(conn) != self._attachment_version:
+                self._discard(conn)
+                self._total -= 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._condition.notify()
+
+    def stats(self):
+        """Snapshot of pool counters plus current occupancy"""
+        with self._condition:
+            snapshot = dict(self._stats)
+            snapshot["idle"] = len(self._idle)
+            snapshot["open"] = self._total
+            snapshot["in_use"] = self._total - len(self._idle)
+            snapshot["max_size"] = self.max_size
+        return snapshot
+
+    def close_all(self):
+        """Close idle connections and stop handing out new ones"""
+        with self._condition:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._discard(conn)
+                self._total -= 1
+            self._condition.notify_all()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+_default_settings = {
+    "max_size": DEFAULT_POOL_SIZE,
+    "health_check_interval": DEFAULT_HEALTH_CHECK_INTERVAL,
+    "acquire_timeout": DEFAULT_ACQUIRE_TIMEOUT,
+    # None until the first pool is created, so a bad class_records.ini
+    # surfaces there rather than on import
+    "pragmas": None,
+}
+
+
+def configure_pool(**settings):
+    """Change the settings used for pools created after this call
+
+    pragmas replaces the whole profile, e.g. to switch the file to WAL mode:
+    configure_pool(pragmas={**DEFAULT_PRAGMAS, "journal_mode": "WAL"}).
+    pragmas=None goes back to configured_pragmas().
+    """
+    unknown = set(settings) - set(_default_settings)
+    if unknown:
+        raise TypeError(f"Unknown pool settings: {', '.join(sorted(unknown))}")
+    _default_settings.update(settings)
+
+
+def _attach_read_only(conn, schema, path):
+    uri = pathlib.Path(path).resolve().as_uri() + "?mode=ro"
+    conn.execute("ATTACH DATABASE ? AS ?", (uri, schema))
+
+
+def get_pool(db_path=DB_PATH):
+    """Return the shared pool for a database file, creating it on first use"""
+    with _pools_lock:
+        pool = _pools.get(db_path)
+        if pool is None:
+            if _default_settings["pragmas"] is None:
+                _default_settings["pragmas"] = configured_pragmas()
+            pool = ConnectionPool(db_path, **_default_settings)
+            _pools[db_path] = pool
+        return pool
+
+
+def get_connection(db_path=DB_PATH):
+    """Check out a pooled connection; call close() when finished"""
+    return get_pool(db_path).get_connection()
+
+
+def pool_stats(db_path=DB_PATH):
+    """Statistics for the pool serving a database file"""
+    return get_pool(db_path).stats()
+
+
+def close_all_pools():
+    """Close every pool, e.g. before deleting or replacing the database file"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close_all()
+        _pools.clear()
@@ -1,28 +1,20 @@
-import sqlite3
-from datetime import datetime
-import random
+from connection import get_connection, DB_PATH
 
 
-def db_setup():
-    """Create all database tables with proper schema"""
-    conn = sqlite3.connect("class_records.db")
-    cur = conn.cursor()
-
-    # Drop and recreate tables for clean setup
-    cur.execute("DROP TABLE IF EXISTS teachers")
-    cur.execute("""
-        CREATE TABLE teachers (
+# Table definitions in creation order. Schema changes after the baseline
+# belong in migrations.py, never here.
+TABLES = [
+    ("teachers", """
+        CREATE TABLE IF NOT EXISTS teachers (
             teacher_id TEXT PRIMARY KEY,
             name TEXT,
             email TEXT,
             subjects TEXT,
             password_hash TEXT
         )
-    """)
-
-    cur.execute("DROP TABLE IF EXISTS students")
-    cur.execute("""
-        CREATE TABLE students (
+    """),
+    ("students", """
+        CREATE TABLE IF NOT EXISTS students (
             student_id TEXT PRIMARY KEY,
             name TEXT,
             grade_level INTEGER,
@@ -30,11 +22,9 @@ def db_setup():
             subjects TEXT,
             attendance TEXT
         )
-    """)
-
-    cur.execute("DROP TABLE IF EXISTS grades")
-    cur.execute("""
-        CREATE TABLE grades (
+    """),
+    ("grades", """
+        CREATE TABLE IF NOT EXISTS grades (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             student_id TEXT,
             subject TEXT,
@@ -46,41 +36,33 @@ def db_setup():
             status TEXT,
             timestamp TEXT
         )
-    """)
-
-    cur.execute("DROP TABLE IF EXISTS attendance")
-    cur.execute("""
-        CREATE TABLE attendance (
+    """),
+    ("attendance", """
+        CREATE TABLE IF NOT EXISTS attendance (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             student_id TEXT,
             subject TEXT,
             date TEXT,
             status TEXT
         )
-    """)
-
-    cur.execute("DROP TABLE IF EXISTS subjects")
-    cur.execute("""
-        CREATE TABLE subjects (
+    """),
+    ("subjects", """
+        CREATE TABLE IF NOT EXISTS subjects (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             subject_name TEXT UNIQUE,
             teacher_id TEXT
         )
-    """)
-
-    cur.execute("DROP TABLE IF EXISTS sections")
-    cur.execute("""
-        CREATE TABLE sections (
+    """),
+    ("sections", """
+        CREATE TABLE IF NOT EXISTS sections (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             section_name TEXT UNIQUE,
             grade_level INTEGER
         )
-    """)
-
-    # Create trash bin table for deleted students
-    cur.execute("DROP TABLE IF EXISTS student_trash")
-    cur.execute("""
-        CREATE TABLE student_trash (
+    """),
+    # Trash bin table for deleted students
+    ("student_trash", """
+        CREATE TABLE IF NOT EXISTS student_trash (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             original_id TEXT,
             student_id TEXT,
@@ -96,10 +78,423 @@ def db_setup():
             deleted_by TEXT
         )
     """)
+]
+
+# Secondary indexes for the hot lookup paths, created by the index migration
+INDEX_SET = [
+    # Per-student lookups: grade updates, enrollment checks, move to trash
+    """CREATE INDEX IF NOT EXISTS idx_grades_student_subject
+       ON grades (student_id, subject, status)""",
+    # Covers the subject grade table filters and the subject stat cards
+    """CREATE INDEX IF NOT EXISTS idx_grades_subject_status
+       ON grades (subject, status, final_grade, student_id)""",
+    # Welcome screen Failing/Dropped counts
+    """CREATE INDEX IF NOT EXISTS idx_grades_status
+       ON grades (status)""",
+    # One attendance mark per student, subject and day
+    """CREATE UNIQUE INDEX IF NOT EXISTS idx_attendance_student_subject_date
+       ON attendance (student_id, subject, date)""",
+    # Per-subject daily absence counts
+    """CREATE INDEX IF NOT EXISTS idx_attendance_subject_date_status
+       ON attendance (subject, date, status)""",
+    # Welcome screen absences for today
+    """CREATE INDEX IF NOT EXISTS idx_attendance_date_status
+       ON attendance (date, status)""",
+    # Section filters, section student counts and name ordering
+    """CREATE INDEX IF NOT EXISTS idx_students_section_name
+       ON students (section, name)""",
+    """CREATE INDEX IF NOT EXISTS idx_student_trash_deleted_at
+       ON student_trash (deleted_at)"""
+]
+
+# Trigram full-text index over student IDs and names for the search boxes.
+# It only stores the index (content='students'); the triggers keep it in step
+# with the students table.
+STUDENT_SEARCH_SCHEMA = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS students_fts USING fts5(
+           student_id, name,
+           content='students', content_rowid='rowid', tokenize='trigram'
+       )""",
+    """CREATE TRIGGER IF NOT EXISTS students_fts_insert AFTER INSERT ON students BEGIN
+           INSERT INTO students_fts (rowid, student_id, name)
+           VALUES (new.rowid, new.student_id, new.name);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS students_fts_delete AFTER DELETE ON students BEGIN
+           INSERT INTO students_fts (students_fts, rowid, student_id, name)
+           VALUES ('delete', old.rowid, old.student_id, old.name);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS students_fts_update AFTER UPDATE OF student_id, name ON students BEGIN
+           INSERT INTO students_fts (students_fts, rowid, student_id, name)
+           VALUES ('delete', old.rowid, old.student_id, old.name);
+           INSERT INTO students_fts (rowid, student_id, name)
+           VALUES (new.rowid, new.student_id, new.name);
+       END"""
+]
+
+
+# Per-subject summary rows behind the subject stat cards, kept current by
+# triggers on grades and attendance so the cards read one row instead of
+# aggregating both tables. Every trigger takes the old row out of the totals
+# and adds the new one, which keeps the counts right under any write path.
+SUBJECT_STATS_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS subject_stats (
+           subject TEXT PRIMARY KEY,
+           enrolled INTEGER NOT NULL DEFAULT 0,
+           graded INTEGER NOT NULL DEFAULT 0,
+           grade_sum REAL NOT NULL DEFAULT 0,
+           failing INTEGER NOT NULL DEFAULT 0,
+           dropped INTEGER NOT NULL DEFAULT 0
+       )""",
+    """CREATE TABLE IF NOT EXISTS subject_absences (
+           subject TEXT,
+           date TEXT,
+           absences INTEGER NOT NULL DEFAULT 0,
+           PRIMARY KEY (subject, date)
+       ) WITHOUT ROWID""",
+    """CREATE TRIGGER IF NOT EXISTS grades_stats_insert AFTER INSERT ON grades BEGIN
+           INSERT INTO subject_stats (subject, enrolled, graded, grade_sum, failing, dropped)
+           VALUES (new.subject, 1, new.final_grade IS NOT NULL, COALESCE(new.final_grade, 0),
+                   new.status IS 'Failing', new.status IS 'Dropped')
+           ON CONFLICT (subject) DO UPDATE SET
+               enrolled = enrolled + 1,
+               graded = graded + excluded.graded,
+               grade_sum = grade_sum + excluded.grade_sum,
+               failing = failing + excluded.failing,
+               dropped = dropped + excluded.dropped;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS grades_stats_delete AFTER DELETE ON grades BEGIN
+           UPDATE subject_stats SET
+               enrolled = enrolled - 1,
+               graded = graded - (old.final_grade IS NOT NULL),
+               grade_sum = grade_sum - COALESCE(old.final_grade, 0),
+               failing = failing - (old.status IS 'Failing'),
+               dropped = dropped - (old.status IS 'Dropped')
+           WHERE subject = old.subject;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS grades_stats_update
+       AFTER UPDATE OF subject, final_grade, status ON grades BEGIN
+           UPDATE subject_stats SET
+               enrolled = enrolled - 1,
+               graded = graded - (old.final_grade IS NOT NULL),
+               grade_sum = grade_sum - COALESCE(old.final_grade, 0),
+               failing = failing - (old.status IS 'Failing'),
+               dropped = dropped - (old.status IS 'Dropped')
+           WHERE subject = old.subject;
+           INSERT INTO subject_stats (subject, enrolled, graded, grade_sum, failing, dropped)
+           VALUES (new.subject, 1, new.final_grade IS NOT NULL, COALESCE(new.final_grade, 0),
+                   new.status IS 'Failing', new.status IS 'Dropped')
+           ON CONFLICT (subject) DO UPDATE SET
+               enrolled = enrolled + 1,
+               graded = graded + excluded.graded,
+               grade_sum = grade_sum + excluded.grade_sum,
+               failing = failing + excluded.failing,
+               dropped = dropped + excluded.dropped;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS attendance_stats_insert AFTER INSERT ON attendance
+       WHEN new.status = 'A' BEGIN
+           INSERT INTO subject_absences (subject, date, absences)
+           VALUES (new.subject, new.date, 1)
+           ON CONFLICT (subject, date) DO UPDATE SET absences = absences + 1;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS attendance_stats_delete AFTER DELETE ON attendance
+       WHEN old.status = 'A' BEGIN
+           UPDATE subject_absences SET absences = absences - 1
+           WHERE subject = old.subject AND date = old.date;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS attendance_stats_update
+       AFTER UPDATE OF subject, date, status ON attendance
+       WHEN old.status IS 'A' OR new.status IS 'A' BEGIN
+           UPDATE subject_absences SET absences = absences - 1
+           WHERE subject = old.subject AND date = old.date AND old.status IS 'A';
+           INSERT INTO subject_absences (subject, date, absences)
+           SELECT new.subject, new.date, 1 WHERE new.status IS 'A'
+           ON CONFLICT (subject, date) DO UPDATE SET absences = absences + 1;
+       END"""
+]
+
+# Which teacher teaches which subject, one row per assignment. Rows are
+# listed in rowid order, which is the order the subjects were assigned in.
+TEACHER_SUBJECTS_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS teacher_subjects (
+           teacher_id TEXT NOT NULL,
+           subject TEXT NOT NULL,
+           PRIMARY KEY (teacher_id, subject)
+       )""",
+    """CREATE INDEX IF NOT EXISTS idx_teacher_subjects_subject
+       ON teacher_subjects (subject, teacher_id)"""
+]
+
+# Tables rebuilt by migration 9 with integer keys into subjects and sections.
+# Deleting a subject cascades to its grades, attendance and teacher
+# assignments; deleting a section leaves its students without one. Rows of
+# teacher_subjects are listed in rowid order, the order they were assigned in.
+# Migration 10 then replaces attendance with ATTENDANCE_TERMS_SCHEMA.
+KEYED_TABLES = [
+    ("students", """
+        CREATE TABLE students (
+            student_id TEXT PRIMARY KEY,
+            name TEXT,
+            grade_level INTEGER,
+            section_id INTEGER REFERENCES sections (id) ON DELETE SET NULL
+        )
+    """),
+    ("grades", """
+        CREATE TABLE grades (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id TEXT,
+            subject_id INTEGER NOT NULL REFERENCES subjects (id) ON DELETE CASCADE,
+            written_works REAL,
+            quizzes REAL,
+            activities REAL,
+            performance_tasks REAL,
+            final_grade REAL,
+            status TEXT,
+            timestamp TEXT
+        )
+    """),
+    ("attendance", """
+        CREATE TABLE attendance (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id TEXT,
+            subject_id INTEGER NOT NULL REFERENCES subjects (id) ON DELETE CASCADE,
+            date TEXT,
+            status TEXT
+        )
+    """),
+    ("teacher_subjects", """
+        CREATE TABLE teacher_subjects (
+            teacher_id TEXT NOT NULL REFERENCES teachers (teacher_id) ON DELETE CASCADE,
+            subject_id INTEGER NOT NULL REFERENCES subjects (id) ON DELETE CASCADE,
+            PRIMARY KEY (teacher_id, subject_id)
+        )
+    """)
+]
+
+# Secondary indexes over the keyed tables, replacing INDEX_SET in migration 9.
+# The subject_id-leading indexes also serve the ON DELETE CASCADE lookups
+# when a subject is deleted.
+KEYED_INDEX_SET = [
+    # Per-student lookups: grade updates, enrollment checks, move to trash
+    """CREATE INDEX IF NOT EXISTS idx_grades_student_subject
+       ON grades (student_id, subject_id, status)""",
+    # Covers the subject grade table filters and subject deletes
+    """CREATE INDEX IF NOT EXISTS idx_grades_subject_status
+       ON grades (subject_id, status, final_grade, student_id)""",
+    # Section filters, section student counts and section deletes
+    """CREATE INDEX IF NOT EXISTS idx_students_section_name
+       ON students (section_id, name)""",
+    # Which teachers teach a subject, and subject deletes
+    """CREATE INDEX IF NOT EXISTS idx_teacher_subjects_subject
+       ON teacher_subjects (subject_id, teacher_id)""",
+    """CREATE INDEX IF NOT EXISTS idx_student_trash_deleted_at
+       ON student_trash (deleted_at)"""
+]
+
+# subject_stats keyed by subject_id, replacing SUBJECT_STATS_SCHEMA in
+# migration 9. The triggers on grades work as before; absences are counted
+# from attendance_terms instead of a summary table.
+KEYED_SUBJECT_STATS_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS subject_stats (
+           subject_id INTEGER PRIMARY KEY REFERENCES subjects (id) ON DELETE CASCADE,
+           enrolled INTEGER NOT NULL DEFAULT 0,
+           graded INTEGER NOT NULL DEFAULT 0,
+           grade_sum REAL NOT NULL DEFAULT 0,
+           failing INTEGER NOT NULL DEFAULT 0,
+           dropped INTEGER NOT NULL DEFAULT 0
+       )""",
+    """CREATE TRIGGER IF NOT EXISTS grades_stats_insert AFTER INSERT ON grades BEGIN
+           INSERT INTO subject_stats (subject_id, enrolled, graded, grade_sum, failing, dropped)
+           VALUES (new.subject_id, 1, new.final_grade IS NOT NULL, COALESCE(new.final_grade, 0),
+                   new.status IS 'Failing', new.status IS 'Dropped')
+           ON CONFLICT (subject_id) DO UPDATE SET
+               enrolled = enrolled + 1,
+               graded = graded + excluded.graded,
+               grade_sum = grade_sum + excluded.grade_sum,
+               failing = failing + excluded.failing,
+               dropped = dropped + excluded.dropped;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS grades_stats_delete AFTER DELETE ON grades BEGIN
+           UPDATE subject_stats SET
+               enrolled = enrolled - 1,
+               graded = graded - (old.final_grade IS NOT NULL),
+               grade_sum = grade_sum - COALESCE(old.final_grade, 0),
+               failing = failing - (old.status IS 'Failing'),
+               dropped = dropped - (old.status IS 'Dropped')
+           WHERE subject_id = old.subject_id;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS grades_stats_update
+       AFTER UPDATE OF subject_id, final_grade, status ON grades BEGIN
+           UPDATE subject_stats SET
+               enrolled = enrolled - 1,
+               graded = graded - (old.final_grade IS NOT NULL),
+               grade_sum = grade_sum - COALESCE(old.final_grade, 0),
+               failing = failing - (old.status IS 'Failing'),
+               dropped = dropped - (old.status IS 'Dropped')
+           WHERE subject_id = old.subject_id;
+           INSERT INTO subject_stats (subject_id, enrolled, graded, grade_sum, failing, dropped)
+           VALUES (new.subject_id, 1, new.final_grade IS NOT NULL, COALESCE(new.final_grade, 0),
+                   new.status IS 'Failing', new.status IS 'Dropped')
+           ON CONFLICT (subject_id) DO UPDATE SET
+               enrolled = enrolled + 1,
+               graded = graded + excluded.graded,
+               grade_sum = grade_sum + excluded.grade_sum,
+               failing = failing + excluded.failing,
+               dropped = dropped + excluded.dropped;
+       END"""
+]
+
+# Attendance packed one row per student, subject and calendar year, in the
+# encoding described in attendance_codec.py. The key leads with subject_id so
+# a subject's marks for a day are one range scan, which is also how absences
+# are counted: reading a byte from each row is cheaper than keeping a
+# per-day summary current.
+ATTENDANCE_TERMS_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS attendance_terms (
+           subject_id INTEGER NOT NULL REFERENCES subjects (id) ON DELETE CASCADE,
+           student_id TEXT NOT NULL,
+           year INTEGER NOT NULL,
+           marks BLOB NOT NULL,
+           PRIMARY KEY (subject_id, student_id, year)
+       ) WITHOUT ROWID"""
+]
+
+
+# What a trash entry backs up, one child row per grade and per year of
+# marks, so moving a student to trash and restoring them are INSERT ...
+# SELECT copies. Subjects are kept by name: a backup outlives its subject
+# and restoring skips rows whose subject no longer exists.
+TRASH_RECORDS_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS trash_grades (
+           trash_id INTEGER NOT NULL REFERENCES student_trash (id) ON DELETE CASCADE,
+           subject TEXT,
+           written_works REAL,
+           quizzes REAL,
+           activities REAL,
+           performance_tasks REAL,
+           final_grade REAL,
+           status TEXT
+       )""",
+    """CREATE INDEX IF NOT EXISTS idx_trash_grades_trash
+       ON trash_grades (trash_id)""",
+    """CREATE TABLE IF NOT EXISTS trash_attendance (
+           trash_id INTEGER NOT NULL REFERENCES student_trash (id) ON DELETE CASCADE,
+           subject TEXT NOT NULL,
+           year INTEGER NOT NULL,
+           marks BLOB NOT NULL,
+           PRIMARY KEY (trash_id, subject, year)
+       ) WITHOUT ROWID"""
+]
+
+
+# Counters handing out IDs, so allocating one is a single-row UPDATE ...
+# RETURNING instead of a scan for the highest ID in use. The trigger moves
+# the student counter past any S### ID inserted by other means (restored
+# originals, imported rosters), so allocated IDs never collide with them.
+STUDENT_ID_SEQUENCE = "student"
+
+ID_SEQUENCES_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS id_sequences (
+           name TEXT PRIMARY KEY,
+           next_value INTEGER NOT NULL
+       ) WITHOUT ROWID""",
+    f"""CREATE TRIGGER IF NOT EXISTS students_id_sequence AFTER INSERT ON students
+       WHEN new.student_id GLOB 'S[0-9]*' BEGIN
+           UPDATE id_sequences SET next_value = CAST(substr(new.student_id, 2) AS INTEGER) + 1
+           WHERE name = '{STUDENT_ID_SEQUENCE}'
+             AND next_value <= CAST(substr(new.student_id, 2) AS INTEGER);
+       END"""
+]
+
+
+def create_tables(cur):
+    """Create any missing tables; existing tables and their rows are kept"""
+    for _, statement in TABLES:
+        cur.execute(statement)
+
+
+def rebuild_student_search(cur):
+    """Re-index students_fts from the students table after a bulk load"""
+    cur.execute("INSERT INTO students_fts (students_fts) VALUES ('rebuild')")
+
+
+def rebuild_subject_stats(cur):
+    """Recompute subject_stats and subject_absences from grades and attendance"""
+    cur.execute("DELETE FROM subject_stats")
+    cur.execute("""
+        INSERT INTO subject_stats (subject, enrolled, graded, grade_sum, failing, dropped)
+        SELECT subject, COUNT(*), COUNT(final_grade), COALESCE(SUM(final_grade), 0),
+               SUM(status IS 'Failing'), SUM(status IS 'Dropped')
+        FROM grades
+        GROUP BY subject
+    """)
+    cur.execute("DELETE FROM subject_absences")
+    cur.execute("""
+        INSERT INTO subject_absences (subject, date, absences)
+        SELECT subject, date, COUNT(*)
+        FROM attendance
+        WHERE status = 'A'
+        GROUP BY subject, date
+    """)
+
+
+def rebuild_keyed_subject_stats(cur):
+    """Recompute the subject_id-keyed subject_stats from grades"""
+    cur.execute("DELETE FROM subject_stats")
+    cur.execute("""
+        INSERT INTO subject_stats (subject_id, enrolled, graded, grade_sum, failing, dropped)
+        SELECT subject_id, COUNT(*), COUNT(final_grade), COALESCE(SUM(final_grade), 0),
+               SUM(status IS 'Failing'), SUM(status IS 'Dropped')
+        FROM grades
+        GROUP BY subject_id
+    """)
+
+
+def sync_student_sequence(cur):
+    """Point the student ID counter past the highest S### ID, e.g. after a bulk load"""
+    cur.execute(f"""
+        INSERT INTO id_sequences (name, next_value)
+        SELECT '{STUDENT_ID_SEQUENCE}', COALESCE(MAX(CAST(substr(student_id, 2) AS INTEGER)), 0) + 1
+        FROM students
+        WHERE student_id GLOB 'S[0-9]*'
+        ON CONFLICT (name) DO UPDATE SET next_value = MAX(next_value, excluded.next_value)
+    """)
+
+
+def db_setup(db_path=DB_PATH):
+    """Create all database tables with proper schema"""
+    conn = get_connection(db_path)
+    cur = conn.cursor()
+    create_tables(cur)
+    conn.commit()
+    conn.close()
+
+
+def reset_database(db_path=DB_PATH):
+    """Drop every table, including migration history, for a clean rebuild"""
+    conn = get_connection(db_path)
+    cur = conn.cursor()
+
+    # Without this, dropping subjects or sections first would cascade
+    # through every grade and attendance row before those tables go too
+    cur.execute("PRAGMA foreign_keys = OFF")
+    cur.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")
+    for (table_name,) in cur.fetchall():
+        cur.execute(f'DROP TABLE IF EXISTS "{table_name}"')
 
     conn.commit()
+    cur.execute("PRAGMA foreign_keys = ON")
+    conn.close()
+    print("Database reset: All tables dropped")
+
+
+def needs_sample_data(db_path=DB_PATH):
+    """True when there are no teacher accounts, e.g. on a brand new database"""
+    conn = get_connection(db_path)
+    cur = conn.cursor()
+    cur.execute("SELECT 1 FROM teachers LIMIT 1")
+    has_teachers = cur.fetchone() is not None
     conn.close()
-    print("Database tables created successfully!")
+    return not has_teachers
 
 
 def simple_hash_password(password):
@@ -120,193 +515,3 @@ def simple_hash_password(password):
 def simple_verify_password(password, stored_hash):
     """Verify password against stored hash"""
     return simple_hash_password(password) == stored_hash
-
-
-def generate_sample_data():
-    """Generate sample data for testing and demonstration"""
-    conn = sqlite3.connect("class_records.db")
-    cur = conn.cursor()
-
-    # Default sections
-    default_sections = [
-        ("Grade 9 Diamond", 9),
-        ("Grade 9 Ruby", 9),
-        ("Grade 9 Emerald", 9),
-        ("Grade 9 Sapphire", 9),
-        ("Grade 9 Pearl", 9),
-        ("Grade 10 Diamond", 10),
-        ("Grade 10 Ruby", 10),
-        ("Grade 10 Emerald", 10),
-        ("Grade 10 Sapphire", 10),
-        ("Grade 10 Pearl", 10),
-        ("Grade 11 STEM", 11),
-        ("Grade 11 ABM", 11),
-        ("Grade 11 HUMSS", 11),
-        ("Grade 11 GAS", 11),
-        ("Grade 11 TVL", 11),
-        ("Grade 12 STEM", 12),
-        ("Grade 12 ABM", 12),
-        ("Grade 12 HUMSS", 12),
-        ("Grade 12 GAS", 12),
-        ("Grade 12 TVL", 12)
-    ]
-
-    for section_name, grade_level in default_sections:
-        try:
-            cur.execute(
-                "INSERT INTO sections (section_name, grade_level) VALUES (?, ?)",
-                (section_name, grade_level)
-            )
-        except sqlite3.IntegrityError:
-            pass  # Skip if section already exists
-
-    # Clear existing teachers first
-    cur.execute("DELETE FROM teachers")
-    
-    # Teachers with hashed passwords
-    teachers = [
-        ("T001", "Dr. Sarah Johnson", "s.johnson@school.edu", "Math,Physics", simple_hash_password("password123")),
-        ("T002", "Prof. Michael Chen", "m.chen@school.edu", "Science,Biology", simple_hash_password("password123")),
-        ("T003", "Ms. Emily Davis", "e.davis@school.edu", "English,Literature", simple_hash_password("password123")),
-        ("T004", "Mr. Robert Wilson", "r.wilson@school.edu", "History,Geography", simple_hash_password("password123"))
-    ]
-    for teacher in teachers:
-        cur.execute("INSERT INTO teachers VALUES (?, ?, ?, ?, ?)", teacher)
-
-    # Available subjects
-    all_subjects = [
-        "Math", "Science", "English", "History",
-        "Physics", "Biology", "Literature", "Geography"
-    ]
-    for subject in all_subjects:
-        try:
-            cur.execute(
-                "INSERT INTO subjects (subject_name) VALUES (?)",
-                (subject,)
-            )
-        except sqlite3.IntegrityError:
-            pass  # Skip if subject already exists
-
-    # Generate sample students
-    first_names = [
-        "James", "Mary", "John", "Patricia", "Robert",
-        "Jennifer", "Michael", "Linda", "William", "Elizabeth"
-    ]
-    last_names = [
-        "Smith", "Johnson", "Williams", "Brown", "Jones",
-        "Garcia", "Miller", "Davis", "Rodriguez", "Martinez"
-    ]
-
-    sections = ["Diamond", "Ruby", "Emerald", "Sapphire", "Pearl"]
-    grade_levels = [9, 10, 11, 12]
-
-    student_count = 0
-    for grade_level in grade_levels:
-        for section in sections:
-            for _ in range(5):
-                student_count += 1
-                student_id = f"S{student_count:03d}"
-                first_name = random.choice(first_names)
-                last_name = random.choice(last_names)
-                name = f"{first_name} {last_name}"
-                section_name = f"Grade {grade_level} {section}"
-
-                # Select random subjects for student
-                student_subjects = {}
-                num_subjects = random.randint(3, 6)
-                selected_subjects = random.sample(all_subjects, num_subjects)
-
-                for subj in selected_subjects:
-                    # Generate random grades
-                    written_works = round(random.uniform(80.0, 95.0), 1)
-                    quizzes = round(random.uniform(75.0, 92.0), 1)
-                    activities = round(random.uniform(85.0, 98.0), 1)
-                    performance_tasks = round(random.uniform(82.0, 96.0), 1)
-
-                    # Calculate final grade
-                    final_grade = (
-                        written_works * 0.25 +
-                        quizzes * 0.25 +
-                        activities * 0.25 +
-                        performance_tasks * 0.25
-                    )
-
-                    # Determine status
-                    if final_grade >= 75.0:
-                        status = "Passing"
-                    else:
-                        status = "Failing"
-                    
-                    # Small chance of being Dropped
-                    if random.random() < 0.05:  # 5% chance
-                        status = "Dropped"
-                        written_works = round(random.uniform(0.0, 50.0), 1)
-                        quizzes = round(random.uniform(0.0, 50.0), 1)
-                        activities = round(random.uniform(0.0, 50.0), 1)
-                        performance_tasks = round(random.uniform(0.0, 50.0), 1)
-                        final_grade = round(random.uniform(0.0, 50.0), 1)
-
-                    student_subjects[subj] = {
-                        "written_works": written_works,
-                        "quizzes": quizzes,
-                        "activities": activities,
-                        "performance_tasks": performance_tasks,
-                        "final_grade": round(final_grade, 1),
-                        "status": status
-                    }
-
-                # Generate attendance data (15 days)
-                attendance_data = {}
-                for day in range(1, 16):
-                    date_str = f"2024-01-{day:02d}"
-                    attendance_data[date_str] = "P"  # All present initially
-
-                # Insert student record
-                cur.execute(
-                    "INSERT INTO students VALUES (?, ?, ?, ?, ?, ?)",
-                    (
-                        student_id,
-                        name,
-                        grade_level,
-                        section_name,
-                        str(student_subjects),
-                        str(attendance_data),
-                    )
-                )
-
-                # Insert grades for each subject
-                for subj, grades in student_subjects.items():
-                    cur.execute(
-                        """
-                        INSERT INTO grades
-                        (student_id, subject, written_works, quizzes, activities,
-                         performance_tasks, final_grade, status, timestamp)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """,
-                        (
-                            student_id,
-                            subj,
-                            grades["written_works"],
-                            grades["quizzes"],
-                            grades["activities"],
-                            grades["performance_tasks"],
-                            grades["final_grade"],
-                            grades["status"],
-                            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        )
-                    )
-
-                # Insert attendance records
-                for subj in selected_subjects:
-                    for date_str, st in attendance_data.items():
-                        cur.execute(
-                            """
-                            INSERT INTO attendance (student_id, subject, date, status)
-                            VALUES (?, ?, ?, ?)
-                            """,
-                            (student_id, subj, date_str, st)
-                        )
-
-    conn.commit()
-    conn.close()
-    print("Sample data generated successfully!")
\ No newline at end of file
@@ -1,12 +1,70 @@
+import argparse
+
 import customtkinter as ctk
 from app import ClassRecordSystem
+from config import database_path, archive_paths, trash_retention_days
+from connection import configure_pool, configured_pragmas, DEFAULT_PRAGMAS
 
 # Set application appearance
 ctk.set_appearance_mode("Light")
 ctk.set_default_color_theme("green")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Class Record Management System")
+    parser.add_argument(
+        "--seed",
+        action="store_true",
+        help="wipe the database and regenerate sample data"
+    )
+    parser.add_argument(
+        "--db",
+        help="database file (default: $CLASS_RECORDS_DB, then class_records.ini, then class_records.db)"
+    )
+    parser.add_argument(
+        "--archive",
+        action="append",
+        default=[],
+        metavar="LABEL=PATH",
+        help="open an archived school year read-only, in addition to those in class_records.ini"
+    )
+    parser.add_argument(
+        "--journal-mode",
+        choices=["wal", "delete"],
+        help="switch the database file to this SQLite journal mode (default: class_records.ini "
+             "[database] journal_mode, else keep the file's current mode); use delete on a network share"
+    )
+    parser.add_argument(
+        "--trash-retention-days",
+        type=int,
+        metavar="DAYS",
+        help="purge trash bin entries older than this at startup, 0 to keep them "
+             "(default: class_records.ini [trash] retention_days, else keep them)"
+    )
+    args = parser.parse_args()
+
+    if args.journal_mode:
+        pragmas = {**DEFAULT_PRAGMAS, "journal_mode": args.journal_mode.upper()}
+    else:
+        try:
+            pragmas = configured_pragmas()
+        except ValueError as e:
+            parser.error(f"class_records.ini: {e}")
+    configure_pool(pragmas=pragmas)
+
+    archives = archive_paths()
+    for archive in args.archive:
+        label, separator, path = archive.partition("=")
+        if not separator:
+            parser.error(f"--archive expects LABEL=PATH, got {archive!r}")
+        archives[label] = path
+
     # Create main window and start application
     root = ctk.CTk()
-    app = ClassRecordSystem(root)
+    retention = args.trash_retention_days
+    if retention is None:
+        retention = trash_retention_days()
+    app = ClassRecordSystem(
+        root, seed=args.seed, db_path=database_path(args.db), archives=archives,
+        trash_retention_days=retention
+    )
     root.mainloop()
\ No newline at end of file
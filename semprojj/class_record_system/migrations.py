@@ -0,0 +1,383 @@
+import sqlite3
+from datetime import datetime
+from itertools import groupby
+
+from attendance_codec import term_slot, pack_marks, pack_by_term, absences_sql
+from connection import get_connection, DB_PATH
+from database import (
+    create_tables, simple_hash_password, rebuild_student_search, rebuild_subject_stats,
+    INDEX_SET, STUDENT_SEARCH_SCHEMA, SUBJECT_STATS_SCHEMA, TEACHER_SUBJECTS_SCHEMA,
+    KEYED_TABLES, KEYED_INDEX_SET, KEYED_SUBJECT_STATS_SCHEMA, rebuild_keyed_subject_stats,
+    ATTENDANCE_TERMS_SCHEMA, TRASH_RECORDS_SCHEMA, ID_SEQUENCES_SCHEMA, sync_student_sequence
+)
+
+
+def _column_names(cur, table_name):
+    cur.execute(f"PRAGMA table_info({table_name})")
+    return [column[1] for column in cur.fetchall()]
+
+
+def _drop_columns(cur, table_name, columns):
+    """Drop columns that exist; SQLite before 3.35 cannot, so clear them instead"""
+    existing = _column_names(cur, table_name)
+    for column in columns:
+        if column not in existing:
+            continue
+        if sqlite3.sqlite_version_info >= (3, 35, 0):
+            cur.execute(f"ALTER TABLE {table_name} DROP COLUMN {column}")
+        else:
+            cur.execute(f"UPDATE {table_name} SET {column} = NULL")
+
+
+def _create_base_tables(cur):
+    """Baseline schema; a no-op on databases created before versioning"""
+    create_tables(cur)
+
+
+def _add_teacher_password_hash(cur):
+    """Databases from before login support have no password_hash column"""
+    if "password_hash" not in _column_names(cur, "teachers"):
+        cur.execute("ALTER TABLE teachers ADD COLUMN password_hash TEXT")
+
+    # Teachers without a password get the default one
+    cur.execute(
+        "UPDATE teachers SET password_hash = ? WHERE password_hash IS NULL",
+        (simple_hash_password("password123"),)
+    )
+
+
+def _add_trash_backup_columns(cur):
+    """Early trash bin tables were created without the backup columns"""
+    existing = _column_names(cur, "student_trash")
+    for column in ("grades_backup", "attendance_backup", "deleted_from_subject"):
+        if column not in existing:
+            cur.execute(f"ALTER TABLE student_trash ADD COLUMN {column} TEXT")
+
+
+def _create_index_set(cur):
+    """Secondary indexes, after collapsing duplicate attendance marks"""
+    # Keep only the latest mark per student/subject/day so the UNIQUE
+    # index can be built over data written before it existed
+    cur.execute("""
+        DELETE FROM attendance
+        WHERE id NOT IN (
+            SELECT MAX(id) FROM attendance
+            GROUP BY student_id, subject, date
+        )
+    """)
+    if cur.rowcount > 0:
+        print(f"Database updated: Removed {cur.rowcount} duplicate attendance rows")
+
+    for statement in INDEX_SET:
+        cur.execute(statement)
+
+    cur.execute("ANALYZE")
+
+
+def _create_student_search(cur):
+    """Full-text index for student name and ID search"""
+    for statement in STUDENT_SEARCH_SCHEMA:
+        cur.execute(statement)
+    rebuild_student_search(cur)
+
+
+def _create_subject_stats(cur):
+    """Trigger-maintained per-subject summary for the stat cards"""
+    for statement in SUBJECT_STATS_SCHEMA:
+        cur.execute(statement)
+    rebuild_subject_stats(cur)
+
+
+def _drop_student_blobs(cur):
+    """Drop the subjects/attendance copies kept on students and trash entries
+
+    Enrollments and marks live in grades and attendance, and trash entries
+    carry their own backups, so the blobs only duplicate them.
+    """
+    for table_name in ("students", "student_trash"):
+        _drop_columns(cur, table_name, ("subjects", "attendance"))
+
+
+def _create_teacher_subjects(cur):
+    """Move the comma-separated teachers.subjects lists into teacher_subjects"""
+    for statement in TEACHER_SUBJECTS_SCHEMA:
+        cur.execute(statement)
+
+    if "subjects" in _column_names(cur, "teachers"):
+        cur.execute("SELECT teacher_id, subjects FROM teachers WHERE subjects IS NOT NULL")
+        assignments = [
+            (teacher_id, subject.strip())
+            for teacher_id, subjects in cur.fetchall()
+            for subject in subjects.split(",")
+            if subject.strip()
+        ]
+        cur.executemany(
+            "INSERT OR IGNORE INTO teacher_subjects (teacher_id, subject) VALUES (?, ?)",
+            assignments
+        )
+    _drop_columns(cur, "teachers", ("subjects",))
+
+
+# Copies each text-keyed table, renamed to <table>_old, into its keyed
+# replacement. Rowids and IDs are kept so the search index and the
+# AUTOINCREMENT counters stay valid.
+KEYED_TABLE_COPIES = {
+    "students": """
+        INSERT INTO students (rowid, student_id, name, grade_level, section_id)
+        SELECT s.rowid, s.student_id, s.name, s.grade_level, sec.id
+        FROM students_old s
+        LEFT JOIN sections sec ON sec.section_name = s.section
+    """,
+    "grades": """
+        INSERT INTO grades
+        (id, student_id, subject_id, written_works, quizzes, activities,
+         performance_tasks, final_grade, status, timestamp)
+        SELECT g.id, g.student_id, sub.id, g.written_works, g.quizzes, g.activities,
+               g.performance_tasks, g.final_grade, g.status, g.timestamp
+        FROM grades_old g
+        JOIN subjects sub ON sub.subject_name = g.subject
+    """,
+    "attendance": """
+        INSERT INTO attendance (id, student_id, subject_id, date, status)
+        SELECT a.id, a.student_id, sub.id, a.date, a.status
+        FROM attendance_old a
+        JOIN subjects sub ON sub.subject_name = a.subject
+    """,
+    "teacher_subjects": """
+        INSERT INTO teacher_subjects (teacher_id, subject_id)
+        SELECT ts.teacher_id, sub.id
+        FROM teacher_subjects_old ts
+        JOIN subjects sub ON sub.subject_name = ts.subject
+        JOIN teachers t ON t.teacher_id = ts.teacher_id
+        ORDER BY ts.rowid
+    """,
+}
+
+
+def _add_integer_keys(cur):
+    """Key grades, attendance, students and teacher_subjects by subject and section ID"""
+    # Every subject and section name in use gets a row to point at
+    cur.execute("""
+        INSERT OR IGNORE INTO subjects (subject_name)
+        SELECT subject FROM grades WHERE subject IS NOT NULL
+        UNION SELECT subject FROM attendance WHERE subject IS NOT NULL
+        UNION SELECT subject FROM teacher_subjects
+    """)
+    cur.execute("""
+        INSERT OR IGNORE INTO sections (section_name, grade_level)
+        SELECT section, MIN(grade_level) FROM students
+        WHERE section IS NOT NULL
+        GROUP BY section
+    """)
+
+    # Dropping the old tables also drops their indexes and triggers
+    for table_name, create_statement in KEYED_TABLES:
+        cur.execute(f"ALTER TABLE {table_name} RENAME TO {table_name}_old")
+        cur.execute(create_statement)
+        cur.execute(KEYED_TABLE_COPIES[table_name])
+        cur.execute(f"DROP TABLE {table_name}_old")
+
+    cur.execute("PRAGMA foreign_key_check")
+    violations = cur.fetchall()
+    if violations:
+        raise sqlite3.IntegrityError(f"{len(violations)} rows reference missing subjects or sections")
+
+    for statement in KEYED_INDEX_SET + STUDENT_SEARCH_SCHEMA:
+        cur.execute(statement)
+    rebuild_student_search(cur)
+
+    cur.execute("DROP TABLE subject_stats")
+    cur.execute("DROP TABLE subject_absences")
+    for statement in KEYED_SUBJECT_STATS_SCHEMA:
+        cur.execute(statement)
+    rebuild_keyed_subject_stats(cur)
+
+    cur.execute("ANALYZE")
+
+
+def _pack_attendance(cur):
+    """Pack the one-row-per-day attendance table into attendance_terms"""
+    for statement in ATTENDANCE_TERMS_SCHEMA:
+        cur.execute(statement)
+
+    # Rows come out sorted, so each term's marks are consecutive and only
+    # one term is held in memory at a time
+    insert_cur = cur.connection.cursor()
+    cur.execute("""
+        SELECT subject_id, student_id, date, status
+        FROM attendance
+        WHERE status IS NOT NULL AND status != ''
+        ORDER BY subject_id, student_id, date
+    """)
+    skipped = 0
+    terms = []
+    for (subject_id, student_id), rows in groupby(cur, key=lambda row: row[:2]):
+        marks_by_year = {}
+        for _, _, date_str, status in rows:
+            try:
+                year, day = term_slot(date_str)
+            except (TypeError, ValueError):
+                skipped += 1
+                continue
+            marks_by_year.setdefault(year, {})[day] = status[0]
+        terms.extend(
+            (subject_id, student_id, year, pack_marks(marks))
+            for year, marks in marks_by_year.items()
+        )
+        if len(terms) >= 10000:
+            insert_cur.executemany("INSERT INTO attendance_terms VALUES (?, ?, ?, ?)", terms)
+            terms.clear()
+    insert_cur.executemany("INSERT INTO attendance_terms VALUES (?, ?, ?, ?)", terms)
+    if skipped:
+        print(f"Database updated: Skipped {skipped} attendance rows without a valid date")
+
+    # Dropping attendance also drops the triggers that fed subject_absences
+    cur.execute("DROP TABLE attendance")
+    cur.execute("DROP TABLE IF EXISTS subject_absences")
+    cur.execute("ANALYZE")
+
+
+def _backup_lines(backup, placeholder, fields):
+    """Split a pipe-delimited trash backup into lines of at least fields parts"""
+    if not backup or backup == placeholder:
+        return []
+    return [
+        line.split("|")
+        for line in backup.split("||")
+        if line and len(line.split("|")) >= fields
+    ]
+
+
+def _backup_float(value):
+    try:
+        return float(value) if value and value != "None" else None
+    except ValueError:
+        return None
+
+
+def _structure_trash_backups(cur):
+    """Move the pipe-delimited trash backups into trash_grades and trash_attendance"""
+    for statement in TRASH_RECORDS_SCHEMA:
+        cur.execute(statement)
+
+    cur.execute("SELECT id, grades_backup, attendance_backup FROM student_trash")
+    grades = []
+    attendance = []
+    for trash_id, grades_backup, attendance_backup in cur.fetchall():
+        for parts in _backup_lines(grades_backup, "No grades backup", 7):
+            grades.append((trash_id, parts[0], *(_backup_float(value) for value in parts[1:6]), parts[6] or None))
+
+        marks_by_subject = {}
+        for date_str, subject, status in _backup_lines(attendance_backup, "No attendance backup", 3):
+            try:
+                term_slot(date_str)
+            except ValueError:
+                continue
+            if status:
+                marks_by_subject.setdefault(subject, {})[date_str] = status[0]
+        attendance.extend(
+            (trash_id, subject, year, marks)
+            for subject, dated_marks in marks_by_subject.items()
+            for year, marks in pack_by_term(dated_marks).items()
+        )
+
+    cur.executemany("INSERT INTO trash_grades VALUES (?, ?, ?, ?, ?, ?, ?, ?)", grades)
+    cur.executemany("INSERT INTO trash_attendance VALUES (?, ?, ?, ?)", attendance)
+    _drop_columns(cur, "student_trash", ("grades_backup", "attendance_backup"))
+
+
+def _create_id_sequences(cur):
+    """Start the student ID counter after the highest ID in use"""
+    for statement in ID_SEQUENCES_SCHEMA:
+        cur.execute(statement)
+    sync_student_sequence(cur)
+
+
+def _add_attendance_absences(cur):
+    """Count each attendance_terms row's absent marks into an absences column"""
+    if "absences" not in _column_names(cur, "attendance_terms"):
+        cur.execute("ALTER TABLE attendance_terms ADD COLUMN absences INTEGER NOT NULL DEFAULT 0")
+    cur.execute(f"UPDATE attendance_terms SET absences = {absences_sql('marks')}")
+
+
+# Ordered forward migrations: (version, description, function). Append new
+# entries with the next version number; never edit or reorder applied ones.
+MIGRATIONS = [
+    (1, "Create base tables", _create_base_tables),
+    (2, "Add teachers.password_hash", _add_teacher_password_hash),
+    (3, "Add student_trash backup columns", _add_trash_backup_columns),
+    (4, "Create secondary index set", _create_index_set),
+    (5, "Create student search index", _create_student_search),
+    (6, "Create subject statistics summary", _create_subject_stats),
+    (7, "Drop students subjects/attendance blobs", _drop_student_blobs),
+    (8, "Create teacher_subjects assignment table", _create_teacher_subjects),
+    (9, "Key subjects and sections by integer ID", _add_integer_keys),
+    (10, "Pack attendance into per-term marks", _pack_attendance),
+    (11, "Move trash backups into child tables", _structure_trash_backups),
+    (12, "Create student ID sequence", _create_id_sequences),
+    (13, "Add attendance_terms.absences", _add_attendance_absences),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def _ensure_version_table(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TEXT
+        )
+    """)
+
+
+def current_version(cur):
+    """Highest applied migration version, 0 for an unversioned database"""
+    cur.execute("SELECT MAX(version) FROM schema_version")
+    result = cur.fetchone()
+    return result[0] if result and result[0] is not None else 0
+
+
+def migrate(db_path=DB_PATH):
+    """Apply pending migrations in order and return the schema version
+
+    An up-to-date database costs a single indexed lookup. Each migration runs
+    in its own IMMEDIATE transaction and the version is re-read inside it, so
+    two workstations starting at once never apply the same step twice.
+    """
+    conn = get_connection(db_path)
+    cur = conn.cursor()
+
+    try:
+        _ensure_version_table(cur)
+        conn.commit()
+
+        version = current_version(cur)
+        if version >= LATEST_VERSION:
+            return version
+
+        for migration_version, description, apply_migration in MIGRATIONS:
+            if migration_version <= version:
+                continue
+
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                if current_version(cur) >= migration_version:
+                    conn.rollback()
+                    continue
+
+                apply_migration(cur)
+                cur.execute(
+                    "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                    (migration_version, description, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                )
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+
+            print(f"Database updated: Migration {migration_version} - {description}")
+
+        return current_version(cur)
+    finally:
+        conn.close()
@@ -1,3 +1,6 @@
+from typing import NamedTuple, Optional
+
+
 class Teacher:
     """Teacher model representing user accounts"""
     def __init__(self, teacher_id, name, email, subjects):
@@ -15,4 +18,135 @@ class Student:
         self.grade_level = grade_level
         self.section = section
         self.subjects = subjects
-        self.attendance = {}  # Store attendance records
\ No newline at end of file
+        self.attendance = {}  # Store attendance records
+
+
+# Typed rows returned by the repository layer. They are NamedTuples so the
+# screens can keep indexing them like the plain tuples sqlite3 returns.
+
+class TeacherRecord(NamedTuple):
+    """Row from the teachers table"""
+    teacher_id: str
+    name: str
+    email: str
+    password_hash: Optional[str] = None
+
+
+class StudentSummary(NamedTuple):
+    """Student as listed in selection dropdowns"""
+    student_id: str
+    name: str
+    section: str
+
+
+class StudentRecord(NamedTuple):
+    """Student as listed in the section roster window"""
+    student_id: str
+    name: str
+    grade_level: int
+    section: str
+
+
+class GradeRow(NamedTuple):
+    """Student grades for one subject, as shown in the grades table"""
+    student_id: str
+    name: str
+    grade_level: int
+    section: str
+    written_works: Optional[float]
+    quizzes: Optional[float]
+    activities: Optional[float]
+    performance_tasks: Optional[float]
+    final_grade: Optional[float]
+    status: Optional[str]
+
+
+class StudentGrades(NamedTuple):
+    """Grade components of one student in one subject"""
+    written_works: Optional[float]
+    quizzes: Optional[float]
+    activities: Optional[float]
+    performance_tasks: Optional[float]
+    final_grade: Optional[float]
+    status: Optional[str]
+
+
+class AttendanceRow(NamedTuple):
+    """Attendance mark of an enrolled student for one day"""
+    student_id: str
+    name: str
+    grade_level: int
+    section: str
+    status: str  # "P", "A" or "Not Marked"
+    academic_status: Optional[str]
+
+
+class SubjectStats(NamedTuple):
+    """Numbers behind the subject dashboard stat cards"""
+    total: int
+    avg_grade: float
+    failing: int
+    dropped: int
+    absences: int
+
+
+class SystemStats(NamedTuple):
+    """Numbers behind the welcome screen stat cards"""
+    total_students: int
+    failing: int
+    dropped: int
+    absences: int
+
+
+class SectionSummary(NamedTuple):
+    """Section with the number of students in it"""
+    section_id: int
+    section_name: str
+    grade_level: int
+    student_count: int
+
+
+class SubjectRecord(NamedTuple):
+    """Row from the subjects table"""
+    subject_id: int
+    subject_name: str
+
+
+class TrashEntry(NamedTuple):
+    """Student removed from a subject, as listed in the trash bin"""
+    trash_id: int
+    original_id: str
+    student_id: str
+    name: str
+    grade_level: int
+    section: str
+    deleted_from_subject: str
+    deleted_at: str
+    deleted_by: str
+
+
+class TrashGrade(NamedTuple):
+    """Grades kept with a trashed student"""
+    subject: str
+    written_works: Optional[float]
+    quizzes: Optional[float]
+    activities: Optional[float]
+    performance_tasks: Optional[float]
+    final_grade: Optional[float]
+    status: Optional[str]
+
+
+class TrashAttendance(NamedTuple):
+    """Attendance mark kept with a trashed student"""
+    date: str
+    subject: str
+    status: str
+
+
+class ArchivedGrade(NamedTuple):
+    """Final result of a student in one subject in an archived school year"""
+    school_year: str
+    subject: str
+    final_grade: Optional[float]
+    status: Optional[str]
+    absences: int
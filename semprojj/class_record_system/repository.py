@@ -0,0 +1,1070 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from itertools import groupby
+
+from attendance_codec import ABSENT, term_slot, pack_marks, unpack_marks, count_absences, absences_sql
+from connection import get_connection, get_pool, DB_PATH
+from database import STUDENT_ID_SEQUENCE
+from models import (
+    TeacherRecord, StudentSummary, StudentRecord, GradeRow, StudentGrades,
+    AttendanceRow, SubjectStats, SystemStats, SectionSummary, SubjectRecord,
+    TrashEntry, TrashGrade, TrashAttendance, ArchivedGrade
+)
+
+
+# The trigram tokenizer cannot match words shorter than this
+FTS_MIN_WORD_LENGTH = 3
+
+# Look up the row ID for a subject or section name inside a query; callers
+# keep working with names while the tables are keyed by ID
+SUBJECT_ID = "(SELECT id FROM subjects WHERE subject_name = ?)"
+SECTION_ID = "(SELECT id FROM sections WHERE section_name = ?)"
+
+# UPDATE ... RETURNING needs SQLite 3.35
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Students trashed per batch when a section is deleted; progress is reported
+# between batches
+SECTION_TRASH_BATCH = 500
+
+
+def search_words(search):
+    return (search or "").lower().split()
+
+
+def student_search_clause(search, alias="s"):
+    """SQL condition and params for students whose ID or name contains every word
+
+    Words long enough for the trigram index are answered by students_fts;
+    shorter ones fall back to LIKE on the already narrowed rows.
+    """
+    clauses = []
+    params = []
+
+    indexed = [word for word in search_words(search) if len(word) >= FTS_MIN_WORD_LENGTH]
+    if indexed:
+        clauses.append(f"{alias}.rowid IN (SELECT rowid FROM students_fts WHERE students_fts MATCH ?)")
+        params.append(" AND ".join('"' + word.replace('"', '""') + '"' for word in indexed))
+
+    for word in search_words(search):
+        if len(word) < FTS_MIN_WORD_LENGTH:
+            clauses.append(f"({alias}.name LIKE ? OR {alias}.student_id LIKE ?)")
+            params.extend([f"%{word}%", f"%{word}%"])
+
+    return " AND ".join(clauses), params
+
+
+def _row_factory(row_type):
+    """sqlite3 row factory building the given NamedTuple"""
+    return lambda cursor, row: row_type._make(row)
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def allocate_student_ids(cur, count=1):
+    """Reserve count consecutive S### student IDs on the caller's cursor
+
+    One UPDATE of the counter row, whatever the size of students; it takes
+    the write lock, so two workstations can never be handed the same IDs.
+    """
+    if _HAS_RETURNING:
+        cur.execute(
+            "UPDATE id_sequences SET next_value = next_value + ? WHERE name = ? RETURNING next_value",
+            (count, STUDENT_ID_SEQUENCE)
+        )
+    else:
+        cur.execute(
+            "UPDATE id_sequences SET next_value = next_value + ? WHERE name = ?",
+            (count, STUDENT_ID_SEQUENCE)
+        )
+        cur.execute("SELECT next_value FROM id_sequences WHERE name = ?", (STUDENT_ID_SEQUENCE,))
+    end = cur.fetchone()[0]
+    return [f"S{number:03d}" for number in range(end - count, end)]
+
+
+def _move_to_trash(cur, student_id, subject, deleted_by):
+    """Trash one enrollment on the caller's cursor; False if the student is unknown"""
+    cur.execute("""
+        INSERT INTO student_trash
+        (original_id, student_id, name, grade_level, section,
+         deleted_from_subject, deleted_at, deleted_by)
+        SELECT s.student_id, ?, s.name, s.grade_level, sec.section_name, ?, ?, ?
+        FROM students s
+        LEFT JOIN sections sec ON sec.id = s.section_id
+        WHERE s.student_id = ?
+    """, (f"DELETED_{student_id}_{int(time.time())}", subject, _now(), deleted_by, student_id))
+    if not cur.rowcount:
+        return False
+    trash_id = cur.lastrowid
+
+    cur.execute(f"""
+        INSERT INTO trash_grades
+        (trash_id, subject, written_works, quizzes, activities,
+         performance_tasks, final_grade, status)
+        SELECT ?, ?, written_works, quizzes, activities,
+               performance_tasks, final_grade, status
+        FROM grades
+        WHERE student_id = ? AND subject_id = {SUBJECT_ID}
+    """, (trash_id, subject, student_id, subject))
+    cur.execute(f"""
+        INSERT INTO trash_attendance (trash_id, subject, year, marks)
+        SELECT ?, ?, year, marks
+        FROM attendance_terms
+        WHERE subject_id = {SUBJECT_ID} AND student_id = ?
+    """, (trash_id, subject, subject, student_id))
+
+    # Delete only from grades and attendance for this subject
+    cur.execute(f"DELETE FROM grades WHERE student_id = ? AND subject_id = {SUBJECT_ID}", (student_id, subject))
+    cur.execute(f"DELETE FROM attendance_terms WHERE subject_id = {SUBJECT_ID} AND student_id = ?", (subject, student_id))
+    return True
+
+
+def _trash_enrollments(cur, student_ids, deleted_by, deleted_at):
+    """Trash every enrollment of the given students on the caller's cursor
+
+    The set-based counterpart of _move_to_trash: one trash entry per
+    (student, subject) with grades or attendance, filled and cleared with a
+    handful of statements however many students there are. Returns the
+    number of entries created.
+    """
+    students = json.dumps(list(student_ids))
+    cur.execute("""
+        INSERT INTO student_trash
+        (original_id, student_id, name, grade_level, section,
+         deleted_from_subject, deleted_at, deleted_by)
+        SELECT s.student_id, 'DELETED_' || s.student_id || '_' || ?, s.name, s.grade_level,
+               sec.section_name, sub.subject_name, ?, ?
+        FROM (
+            SELECT student_id, subject_id FROM grades
+            WHERE student_id IN (SELECT value FROM json_each(?))
+            UNION
+            -- Marks in a subject without a grades row are backed up too;
+            -- both IN lists keep this on the primary key
+            SELECT student_id, subject_id FROM attendance_terms
+            WHERE subject_id IN (SELECT id FROM subjects)
+              AND student_id IN (SELECT value FROM json_each(?))
+        ) e
+        JOIN students s ON s.student_id = e.student_id
+        JOIN subjects sub ON sub.id = e.subject_id
+        LEFT JOIN sections sec ON sec.id = s.section_id
+        ORDER BY s.student_id, sub.subject_name
+    """, (int(time.time()), deleted_at, deleted_by, students, students))
+    created = cur.rowcount
+    if not created:
+        return 0
+    # One statement holding the write lock, so the new IDs are consecutive
+    last_id = cur.lastrowid
+    first_id = last_id - created + 1
+
+    cur.execute("""
+        INSERT INTO trash_grades
+        (trash_id, subject, written_works, quizzes, activities,
+         performance_tasks, final_grade, status)
+        SELECT t.id, t.deleted_from_subject, g.written_works, g.quizzes, g.activities,
+               g.performance_tasks, g.final_grade, g.status
+        FROM student_trash t
+        JOIN subjects sub ON sub.subject_name = t.deleted_from_subject
+        JOIN grades g ON g.student_id = t.original_id AND g.subject_id = sub.id
+        WHERE t.id BETWEEN ? AND ?
+        ORDER BY g.id
+    """, (first_id, last_id))
+    cur.execute("""
+        INSERT INTO trash_attendance (trash_id, subject, year, marks)
+        SELECT t.id, t.deleted_from_subject, a.year, a.marks
+        FROM student_trash t
+        JOIN subjects sub ON sub.subject_name = t.deleted_from_subject
+        JOIN attendance_terms a ON a.subject_id = sub.id AND a.student_id = t.original_id
+        WHERE t.id BETWEEN ? AND ?
+    """, (first_id, last_id))
+
+    cur.execute("""
+        DELETE FROM attendance_terms
+        WHERE subject_id IN (SELECT id FROM subjects)
+          AND student_id IN (SELECT value FROM json_each(?))
+    """, (students,))
+    cur.execute(
+        "DELETE FROM grades WHERE student_id IN (SELECT value FROM json_each(?))",
+        (students,)
+    )
+    return created
+
+
+def _restore_student(cur, student_id, name, grade_level, section):
+    """Recreate a trashed student's row under student_id"""
+    cur.execute(f"""
+        INSERT INTO students (student_id, name, grade_level, section_id)
+        VALUES (?, ?, ?, {SECTION_ID})
+    """, (student_id, name, grade_level, section))
+
+
+def _restore_entry(cur, trash_id, student_id, deleted_from):
+    """Give student_id back a trash entry's records and drop the entry"""
+    # Only restore records for the subject the student was removed
+    # from, and only while that subject still exists
+    cur.execute("""
+        INSERT INTO grades
+        (student_id, subject_id, written_works, quizzes, activities,
+         performance_tasks, final_grade, status, timestamp)
+        SELECT ?, sub.id, COALESCE(tg.written_works, 0.0), COALESCE(tg.quizzes, 0.0),
+               COALESCE(tg.activities, 0.0), COALESCE(tg.performance_tasks, 0.0),
+               COALESCE(tg.final_grade, 0.0), COALESCE(NULLIF(tg.status, ''), 'Passing'), ?
+        FROM trash_grades tg
+        JOIN subjects sub ON sub.subject_name = tg.subject
+        WHERE tg.trash_id = ? AND tg.subject = ?
+        ORDER BY tg.rowid
+    """, (student_id, _now(), trash_id, deleted_from))
+    cur.execute(f"""
+        INSERT OR IGNORE INTO attendance_terms (subject_id, student_id, year, marks, absences)
+        SELECT sub.id, ?, ta.year, ta.marks, {absences_sql('ta.marks')}
+        FROM trash_attendance ta
+        JOIN subjects sub ON sub.subject_name = ta.subject
+        WHERE ta.trash_id = ? AND ta.subject = ?
+    """, (student_id, trash_id, deleted_from))
+
+    # The backed up records go with the entry
+    cur.execute("DELETE FROM student_trash WHERE id = ?", (trash_id,))
+
+
+class Repository:
+    """Base for the repositories; each query checks out a pooled connection"""
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+
+    def connect(self):
+        return get_connection(self.db_path)
+
+
+class TeachersRepository(Repository):
+    def authenticate(self, teacher_id, password_hash):
+        """Teacher matching the credentials, or None"""
+        conn = self.connect()
+        cur = conn.cursor()
+        cur.row_factory = _row_factory(TeacherRecord)
+        cur.execute(
+            "SELECT teacher_id, name, email, password_hash FROM teachers "
+            "WHERE teacher_id = ? AND password_hash = ?",
+            (teacher_id, password_hash)
+        )
+        teacher = cur.fetchone()
+        conn.close()
+        return teacher
+
+    def list_subjects_for(self, teacher_id):
+        """Names of the subjects assigned to a teacher, in assignment order"""
+        conn = self.connect()
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT sub.subject_name
+            FROM teacher_subjects ts
+            JOIN subjects sub ON sub.id = ts.subject_id
+            WHERE ts.teacher_id = ?
+            ORDER BY ts.rowid
+        """, (teacher_id,))
+        subjects = [row[0] for row in cur.fetchall()]
+        conn.close()
+        return subjects
+
+    def list_teachers_for(self, subject):
+        """Teachers assigned to a subject"""
+        conn = self.connect()
+        cur = conn.cursor()
+        cur.row_factory = _row_factory(TeacherRecord)
+        cur.execute(f"""
+            SELECT t.teacher_id, t.name, t.email, t.password_hash
+            FROM teacher_subjects ts
+            JOIN teachers t ON t.teacher_id = ts.teacher_id
+            WHERE ts.subject_id = {SUBJECT_ID}
+            ORDER BY t.name
+        """, (subject,))
+        teachers = cur.fetchall()
+        conn.close()
+        return teachers
+
+    def teaches(self, teacher_id, subject):
+        conn = self.connect()
+        cur = conn.cursor()
+        cur.execute(
+            f"SELECT 1 FROM teacher_subjects WHERE teacher_id = ? AND subject_id = {SUBJECT_ID}",
+            (teacher_id, subject)
+        )
+        assigned = cur.fetchone() is not None
+        conn.close()
+        return assigned
+
+    def assign_subject(self, teacher_id, subject):
+        """Assign a subject to a teacher; False if it already was"""
+        with self.connect() as conn:
+            added = conn.execute(
+                "INSERT OR IGNORE INTO teacher_subjects (teacher_id, subject_id) "
+                "SELECT ?, id FROM subjects WHERE subject_name = ?",
+                (teacher_id, subject)
+            ).rowcount
+        return added > 0
+
+    def remove_subject(self, teacher_id, subject):
+        """Unassign a subject from a teacher; False if it was not assigned"""
+        with self.connect() as conn:
+            removed = conn.execute(
+                f"DELETE FROM teacher_subjects WHERE teacher_id = ? AND subject_id = {SUBJECT_ID}",
+                (teacher_id, subject)
+            ).rowcount
+        return removed > 0
+
+
+class SubjectsRepository(Repository):
+    def list_subjects(self):
+        """All subjects ordered by name"""
+        conn = self.connect()
+        cur = conn.cursor()
+        cur.row_factory = _row_factory(SubjectRecord)
+        cur.execute("SELECT id, subject_name FROM subjects ORDER BY subject_name")
+        subjects = cur.fetchall()
+        conn.close()
+        return subjects
+
+    def list_subject_names(self):
+        return [subject.subject_name for subject in self.list_subjects()]
+
+    def add_subject(self, subject_name):
+        """Raises sqlite3.IntegrityError when the subject already exists"""
+        conn = self.connect()
+        conn.execute("INSERT INTO subjects (subject_name) VALUES (?)", (subject_name,))
+        conn.commit()
+        conn.close()
+
+    def delete_subject(self, subject_id):
+        """Delete a subject; its teacher assignments, grades and attendance cascade"""
+        with self.connect() as conn:
+            conn.execute("DELETE FROM subjects WHERE id = ?", (subject_id,))
+
+
+class SectionsRepository(Repository):
+    def list_sections(self):
+        """Sections with their student counts"""
+        conn = self.connect()
+        cur = conn.cursor()
+        cur.row_factory = _row_factory(SectionSummary)
+        cur.execute("""
+            SELECT sec.id, sec.section_name, sec.grade_level, COUNT(s.student_id)
+            FROM sections sec
+            LEFT JOIN students s ON s.section_id = sec.id
+            GROUP BY sec.id
+            ORDER BY sec.grade_level, sec.section_name
+        """)
+        sections = cur.fetchall()
+        conn.close()
+        return sections
+
+    def list_names_for_grade(self, grade_level):
+        conn = self.connect()
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT section_name FROM sections WHERE grade_level = ? ORDER BY section_name",
+            (grade_level,)
+        )
+        names = [row[0] for row in cur.fetchall()]
+        conn.close()
+        return names
+
+    def exists(self, section_name):
+        conn = self.connect()
+        cur = conn.cursor()
+        cur.execute("SELECT 1 FROM sections WHERE section_name = ?", (section_name,))
+        found = cur.fetchone() is not None
+        conn.close()
+        return found
+
+    def add_section(self, section_name, grade_level):
+        conn = self.connect()
+        conn.execute(
+            "INSERT INTO sections (section_name, grade_level) VALUES (?, ?)",
+            (section_name, grade_level)
+        )
+        conn.commit()
+        conn.close()
+
+    def delete_section(self, section_id, deleted_by, progress=None):
+        """Move every enrollment of the section's students to trash, then drop the section
+
+        Runs as one transaction, SECTION_TRASH_BATCH students at a time, and
+        calls progress(done, total) after each batch. The students themselves
+        stay, without a section. Returns the number of students.
+        """
+        with self.connect() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                "SELECT student_id FROM students WHERE section_id = ? ORDER BY student_id",
+                (section_id,)
+            )
+            students = [row[0] for row in cur.fetchall()]
+
+            deleted_at = _now()
+            for start in range(0, len(students), SECTION_TRASH_BATCH):
+                batch = students[start:start + SECTION_TRASH_BATCH]
+                _trash_enrollments(cur, batch, deleted_by, deleted_at)
+                if progress:
+                    progress(start + len(batch), len(students))
+
+            cur.execute("DELETE FROM sections WHERE id = ?", (section_id,))
+        return len(students)
+
+
+class RosterRepository(Repository):
+    def list_student_sections(self):
+        """Distinct section names that have students"""
+        conn = self.connect()
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT sec.section_name
+            FROM sections sec
+            WHERE EXISTS (SELECT 1 FROM students s WHERE s.section_id = sec.id)
+            ORDER BY sec.section_name
+        """)
+        sections = [row[0] for row in cur.fetchall()]
+        conn.close()
+        return sections
+
+    def search_students(self, search="", section=None, limit=None):
+        """Students whose ID or name contains every word of search, ordered by name"""
+        query = """
+            SELECT s.student_id, s.name, s.grade_level, sec.section_name
+            FROM students s
+            LEFT JOIN sections sec ON sec.id = s.section_id
+            WHERE 1 = 1
+        """
+        params = []
+
+        if section:
+            query += f" AND s.section_id = {SECTION_ID}"
+            params.append(section)
+
+        if search_words(search):
+            search_sql, search_params = student_search_clause(search)
+            query += f" AND {search_sql}"
+            params.extend(search_params)
+
+        query += " ORDER BY s.name"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        conn = self.connect()
+        cur = conn.cursor()
+        cur.row_factory = _row_factory(StudentRecord)
+        cur.execute(query, params)
+        students = cur.fetchall()
+        conn.close()
+        return students
+
+    def list_enrolled(self, subject):
+        """Students enrolled in a subject, ordered by section and name"""
+        conn = self.connect()
+        cur = conn.cursor()
+        cur.row_factory = _row_factory(StudentSummary)
+        cur.execute(f"""
+            SELECT DISTINCT s.student_id, s.name, sec.section_name
+            FROM students s
+            JOIN grades g ON s.student_id = g.student_id
+            LEFT JOIN sections sec ON sec.id = s.section_id
+            WHERE g.subject_id = {SUBJECT_ID}
+            ORDER BY sec.section_name, s.name
+        """, (subject,))
+        students = cur.fetchall()
+        conn.close()
+        return students
+
+    def add_student(self, name, grade_level, section):
+        """Create a student with the next free ID and return that ID"""
+        with self.connect() as conn:
+            cur = conn.cursor()
+            student_id, = allocate_student_ids(cur)
+            cur.execute(
+                f"INSERT INTO students (student_id, name, grade_level, section_id) VALUES (?, ?, ?, {SECTION_ID})",
+                (student_id, name, grade_level, section)
+            )
+        return student_id
+
+    def add_students(self, students):
+        """Create students from (name, grade_level, section) rows in one transaction
+
+        Their IDs are reserved as one consecutive range. Returns the IDs in
+        the order the rows were given.
+        """
+        students = list(students)
+        if not students:
+            return []
+        with self.connect() as conn:
+            cur = conn.cursor()
+            student_ids = allocate_student_ids(cur, len(students))
+            # One statement for the batch keeps the students_fts trigger cheap
+            cur.execute("""
+                INSERT INTO students (student_id, name, grade_level, section_id)
+                SELECT json_extract(e.value, '$[0]'), json_extract(e.value, '$[1]'),
+                       json_extract(e.value, '$[2]'),
+                       (SELECT id FROM sections WHERE section_name = json_extract(e.value, '$[3]'))
+                FROM json_each(?) e
+            """, (json.dumps([
+                (student_id, name, grade_level, section)
+                for student_id, (name, grade_level, section) in zip(student_ids, students)
+            ]),))
+        return student_ids
+
+    def reserve_student_ids(self, count=1):
+        """Reserve count consecutive student IDs for rows inserted later"""
+        with self.connect() as conn:
+            return allocate_student_ids(conn.cursor(), count)
+
+
+class GradesRepository(Repository):
+    @staticmethod
+    def matches_search(row, search):
+        """In-memory equivalent of student_search_clause"""
+        name = row.name.lower()
+        student_id = row.student_id.lower()
+        return all(word in name or word in student_id for word in search_words(search))
+
+    def list_for_subject(self, subject, section=None, status=None, search=None):
+        """Grades table rows; None filters are ignored"""
+        query = f"""
+            SELECT s.student_id, s.name, s.grade_level, sec.section_name,
+                   g.written_works, g.quizzes, g.activities, g.performance_tasks,
+                   g.final_grade, g.status
+            FROM students s
+            JOIN grades g ON s.student_id = g.student_id
+            LEFT JOIN sections sec ON sec.id = s.section_id
+            WHERE g.subject_id = {SUBJECT_ID}
+        """
+        params = [subject]
+
+        if section:
+            query += f" AND s.section_id = {SECTION_ID}"
+            params.append(section)
+
+        if status:
+            query += " AND g.status = ?"
+            params.append(status)
+
+        if search_words(search):
+            search_sql, search_params = student_search_clause(search)
+            query += f" AND {search_sql}"
+            params.extend(search_params)
+
+        query += " ORDER BY sec.section_name, s.name"
+
+        conn = self.connect()
+        cur = conn.cursor()
+        cur.row_factory = _row_factory(GradeRow)
+        cur.execute(query, params)
+        rows = cur.fetchall()
+        conn.close()
+        return rows
+
+    def get_grades(self, student_id, subject):
+        """StudentGrades for an enrollment, or None"""
+        conn = self.connect()
+        cur = conn.cursor()
+        cur.row_factory = _row_factory(StudentGrades)
+        cur.execute(f"""
+            SELECT written_works, quizzes, activities, performance_tasks, final_grade, status
+            FROM grades
+            WHERE student_id = ? AND subject_id = {SUBJECT_ID}
+        """, (student_id, subject))
+        grades = cur.fetchone()
+        conn.close()
+        return grades
+
+    def get_status(self, student_id, subject):
+        grades = self.get_grades(student_id, subject)
+        return grades.status if grades else None
+
+    def is_enrolled(self, student_id, subject):
+        conn = self.connect()
+        cur = conn.cursor()
+        cur.execute(f"SELECT 1 FROM grades WHERE student_id = ? AND subject_id = {SUBJECT_ID}", (student_id, subject))
+        enrolled = cur.fetchone() is not None
+        conn.close()
+        return enrolled
+
+    def enroll(self, student_id, subject, grades, status):
+        """Add a grades row for a new enrollment
+
+        grades holds written_works, quizzes, activities, performance_tasks
+        and final_grade.
+        """
+        conn = self.connect()
+        conn.execute(f"""
+            INSERT INTO grades
+            (student_id, subject_id, written_works, quizzes, activities, performance_tasks,
+             final_grade, status, timestamp)
+            VALUES (?, {SUBJECT_ID}, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            student_id, subject, grades["written_works"], grades["quizzes"],
+            grades["activities"], grades["performance_tasks"],
+            grades["final_grade"], status, _now()
+        ))
+        conn.commit()
+        conn.close()
+
+    def update_grades(self, student_id, subject, components, final_grade, status):
+        """Update the given components plus the final grade and status"""
+        update_fields = []
+        update_values = []
+
+        for component, grade in components.items():
+            update_fields.append(f"{component} = ?")
+            update_values.append(grade)
+
+        update_fields.append("final_grade = ?")
+        update_values.append(round(final_grade, 1))
+
+        update_fields.append("status = ?")
+        update_values.append(status)
+
+        update_fields.append("timestamp = ?")
+        update_values.append(_now())
+
+        update_values.extend([student_id, subject])
+
+        conn = self.connect()
+        conn.execute(f"""
+            UPDATE grades
+            SET {', '.join(update_fields)}
+            WHERE student_id = ? AND subject_id = {SUBJECT_ID}
+        """, update_values)
+        conn.commit()
+        conn.close()
+
+    def set_status(self, student_id, subject, status):
+        """Change academic status; Dropped also zeroes every grade"""
+        conn = self.connect()
+        if status == "Dropped":
+            conn.execute(f"""
+                UPDATE grades
+                SET status = ?,
+                    written_works = 0,
+                    quizzes = 0,
+                    activities = 0,
+                    performance_tasks = 0,
+                    final_grade = 0
+                WHERE student_id = ? AND subject_id = {SUBJECT_ID}
+            """, (status, student_id, subject))
+        else:
+            conn.execute(f"""
+                UPDATE grades
+                SET status = ?
+                WHERE student_id = ? AND subject_id = {SUBJECT_ID}
+            """, (status, student_id, subject))
+        conn.commit()
+        conn.close()
+
+
+class AttendanceRepository(Repository):
+    """Marks packed per student, subject and year; see attendance_codec.py"""
+
+    def list_for_day(self, subject, date_str, section=None):
+        """Attendance of every student enrolled in the subject on one day"""
+        year, day = term_slot(date_str)
+        query = f"""
+            SELECT s.student_id, s.name, s.grade_level, sec.section_name,
+                   COALESCE(CAST(NULLIF(substr(t.marks, ?, 1), x'00') AS TEXT), 'Not Marked') as status,
+                   g.status as academic_status
+            FROM grades g
+            JOIN students s ON s.student_id = g.student_id
+            LEFT JOIN sections sec ON sec.id = s.section_id
+            LEFT JOIN attendance_terms t ON t.subject_id = g.subject_id
+                AND t.student_id = g.student_id AND t.year = ?
+            WHERE g.subject_id = {SUBJECT_ID}
+        """
+        params = [day, year, subject]
+
+        if section is not None:
+            query += f" AND s.section_id = {SECTION_ID}"
+            params.append(section)
+
+        query += " ORDER BY sec.section_name, s.name"
+
+        conn = self.connect()
+        cur = conn.cursor()
+        cur.row_factory = _row_factory(AttendanceRow)
+        cur.execute(query, params)
+        rows = cur.fetchall()
+        conn.close()
+        return rows
+
+    @staticmethod
+    def _upsert(date_str, status, overwrite):
+        """INSERT prefix, ON CONFLICT suffix and their params for writing one day's byte
+
+        A student without a row for the year gets a fresh one holding just
+        this mark; an existing row has the day's byte replaced in place and
+        its absences count moved by the difference.
+        """
+        year, day = term_slot(date_str)
+        insert = """
+            INSERT INTO attendance_terms (subject_id, student_id, year, marks, absences)
+            SELECT g.subject_id, g.student_id, ?, ?, ?
+        """
+        upsert = """
+            ON CONFLICT (subject_id, student_id, year) DO UPDATE
+            SET marks = CAST(substr(marks, 1, ?) || substr(excluded.marks, ?, 1) || substr(marks, ?) AS BLOB),
+                absences = absences - (substr(marks, ?, 1) = ?) + excluded.absences
+        """
+        upsert_params = [day - 1, day, day + 1, day, ABSENT]
+        if not overwrite:
+            upsert += " WHERE substr(marks, ?, 1) = x'00'"
+            upsert_params.append(day)
+        marks = pack_marks({day: status})
+        return insert, [year, marks, count_absences(marks)], upsert, upsert_params
+
+    def mark(self, subject, date_str, student_ids, status):
+        """Mark students P or A for a day in one upsert, skipping Dropped ones; returns count marked"""
+        insert, insert_params, upsert, upsert_params = self._upsert(date_str, status, True)
+        with self.connect() as conn:
+            cur = conn.execute(f"""
+                {insert}
+                FROM grades g
+                WHERE g.subject_id = {SUBJECT_ID} AND g.status IS NOT 'Dropped'
+                  AND g.student_id IN (SELECT value FROM json_each(?))
+                {upsert}
+            """, insert_params + [subject, json.dumps(list(student_ids))] + upsert_params)
+            marked = cur.rowcount
+        return marked
+
+    def mark_all(self, subject, date_str, status, section=None, overwrite=True):
+        """Mark every non-Dropped student of a subject, or of one section, in one upsert
+
+        With overwrite=False students that already have a mark for the day
+        keep it, which is how "mark everyone not yet marked" works. Returns
+        the number of rows written.
+        """
+        insert, params, upsert, upsert_params = self._upsert(date_str, status, overwrite)
+        query = f"""
+            {insert}
+            FROM grades g
+            JOIN students s ON s.student_id = g.student_id
+            WHERE g.subject_id = {SUBJECT_ID} AND g.status IS NOT 'Dropped'
+        """
+        params.append(subject)
+
+        if section:
+            query += f" AND s.section_id = {SECTION_ID}"
+            params.append(section)
+
+        query += upsert
+        params.extend(upsert_params)
+
+        with self.connect() as conn:
+            marked = conn.execute(query, params).rowcount
+        return marked
+
+    def total_absences(self, subject=None):
+        """Absent marks on any day, for one subject or across all of them"""
+        query = "SELECT COALESCE(SUM(absences), 0) FROM attendance_terms"
+        params = []
+        if subject is not None:
+            query += f" WHERE subject_id = {SUBJECT_ID}"
+            params.append(subject)
+
+        conn = self.connect()
+        cur = conn.cursor()
+        cur.execute(query, params)
+        total = cur.fetchone()[0]
+        conn.close()
+        return total
+
+
+class StatsRepository(Repository):
+    """Statistics queries, with the welcome screen totals cached in memory
+
+    Cached values are tagged with PRAGMA data_version read on a connection
+    that never writes, so any commit to the file, from this process or
+    another workstation, makes them stale.
+    """
+
+    def __init__(self, db_path=DB_PATH):
+        super().__init__(db_path)
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._watcher = None
+
+    def data_version(self):
+        """Counter that changes whenever any connection commits to the database"""
+        with self._lock:
+            if self._watcher is None:
+                self._watcher = get_pool(self.db_path).open_unpooled()
+            return self._watcher.execute("PRAGMA data_version").fetchone()[0]
+
+    def invalidate(self):
+        """Forget cached statistics, e.g. after the database file is replaced"""
+        with self._lock:
+            self._cache.clear()
+
+    def cached(self, key, compute):
+        """compute(), reused until the database changes"""
+        version = self.data_version()
+        with self._lock:
+            entry = self._cache.get(key)
+        if entry and entry[0] == version:
+            return entry[1]
+
+        # Tagged with the version read before computing, so a commit made
+        # while compute() runs leaves the entry stale rather than wrong
+        value = compute()
+        with self._lock:
+            self._cache[key] = (version, value)
+        return value
+
+    def subject_stats(self, subject, date_str):
+        """Enrollment, average, failing, dropped and absence counts for a subject"""
+        year, day = term_slot(date_str)
+        conn = self.connect()
+        cur = conn.cursor()
+        cur.execute(f"""
+            SELECT COALESCE(st.enrolled, 0),
+                   COALESCE(st.grade_sum / NULLIF(st.graded, 0), 0),
+                   COALESCE(st.failing, 0),
+                   COALESCE(st.dropped, 0),
+                   (SELECT COUNT(*) FROM attendance_terms t
+                    WHERE t.subject_id = k.subject_id AND t.year = ? AND substr(t.marks, ?, 1) = ?)
+            FROM (SELECT {SUBJECT_ID} AS subject_id) k
+            LEFT JOIN subject_stats st ON st.subject_id = k.subject_id
+        """, (year, day, ABSENT, subject))
+        stats = SubjectStats(*cur.fetchone())
+        conn.close()
+        return stats
+
+    def system_stats(self, date_str):
+        """Student, failing, dropped and absence counts across all subjects"""
+        return self.cached(("system", date_str), lambda: self._system_stats(date_str))
+
+    def _system_stats(self, date_str):
+        conn = self.connect()
+        cur = conn.cursor()
+
+        cur.execute("SELECT COUNT(student_id) FROM students")
+        total_students = cur.fetchone()[0]
+
+        cur.execute("SELECT COALESCE(SUM(failing), 0), COALESCE(SUM(dropped), 0) FROM subject_stats")
+        failing, dropped = cur.fetchone()
+
+        year, day = term_slot(date_str)
+        cur.execute(
+            "SELECT COUNT(*) FROM attendance_terms WHERE year = ? AND substr(marks, ?, 1) = ?",
+            (year, day, ABSENT)
+        )
+        absences = cur.fetchone()[0]
+
+        conn.close()
+        return SystemStats(total_students, failing, dropped, absences)
+
+
+class TrashRepository(Repository):
+    def list_entries(self):
+        """Trash bin contents, newest first"""
+        conn = self.connect()
+        cur = conn.cursor()
+        cur.row_factory = _row_factory(TrashEntry)
+        cur.execute("""
+            SELECT id, original_id, student_id, name, grade_level, section,
+                   deleted_from_subject, deleted_at, deleted_by
+            FROM student_trash
+            ORDER BY deleted_at DESC
+        """)
+        entries = cur.fetchall()
+        conn.close()
+        return entries
+
+    def count(self):
+        conn = self.connect()
+        cur = conn.cursor()
+        cur.execute("SELECT COUNT(*) FROM student_trash")
+        total = cur.fetchone()[0]
+        conn.close()
+        return total
+
+    def get_records(self, trash_id):
+        """(grades, attendance) backed up with a trash entry, or None if it is gone"""
+        conn = self.connect()
+        cur = conn.cursor()
+        cur.execute("SELECT 1 FROM student_trash WHERE id = ?", (trash_id,))
+        if not cur.fetchone():
+            conn.close()
+            return None
+
+        cur.execute("""
+            SELECT subject, written_works, quizzes, activities,
+                   performance_tasks, final_grade, status
+            FROM trash_grades
+            WHERE trash_id = ?
+            ORDER BY rowid
+        """, (trash_id,))
+        grades = [TrashGrade._make(row) for row in cur.fetchall()]
+
+        cur.execute("""
+            SELECT subject, year, marks
+            FROM trash_attendance
+            WHERE trash_id = ?
+            ORDER BY subject, year
+        """, (trash_id,))
+        attendance = [
+            TrashAttendance(date_str, subject, status)
+            for subject, year, marks in cur.fetchall()
+            for date_str, status in unpack_marks(year, marks)
+        ]
+        conn.close()
+        return grades, attendance
+
+    def move_student_to_trash(self, student_id, subject, deleted_by):
+        """Back up a student's grades and attendance for one subject, then remove them"""
+        with self.connect() as conn:
+            return _move_to_trash(conn.cursor(), student_id, subject, deleted_by)
+
+    def restore(self, trash_id):
+        """Restore a trashed student into the subject they were removed from
+
+        Returns the student ID used, which is a new one when the original ID
+        is taken, or None when the trash entry no longer exists.
+        """
+        return self.restore_many([trash_id]).get(trash_id)
+
+    def restore_many(self, trash_ids):
+        """Restore several trash entries in one transaction
+
+        Returns {trash_id: student ID used} for the entries that still
+        existed. Entries of the same original student, such as the ones a
+        section delete leaves, come back as one student; when the original
+        ID is taken that student gets one new ID from the student ID
+        sequence.
+        """
+        restored = {}
+        student_ids = {}  # original ID -> student ID its entries go back to
+        with self.connect() as conn:
+            cur = conn.cursor()
+            for trash_id in trash_ids:
+                cur.execute("""
+                    SELECT original_id, name, grade_level, section, deleted_from_subject
+                    FROM student_trash WHERE id = ?
+                """, (trash_id,))
+                entry = cur.fetchone()
+                if not entry:
+                    continue
+
+                original_id, name, grade_level, section, deleted_from = entry
+
+                new_student_id = student_ids.get(original_id)
+                if new_student_id is None:
+                    new_student_id = original_id
+                    cur.execute("SELECT 1 FROM students WHERE student_id = ?", (original_id,))
+                    if cur.fetchone():
+                        new_student_id, = allocate_student_ids(cur)
+                    _restore_student(cur, new_student_id, name, grade_level, section)
+                    student_ids[original_id] = new_student_id
+
+                _restore_entry(cur, trash_id, new_student_id, deleted_from)
+                restored[trash_id] = new_student_id
+        return restored
+
+    def delete(self, trash_id):
+        """Permanently delete one trash entry and its backed up records"""
+        self.delete_many([trash_id])
+
+    def delete_many(self, trash_ids):
+        """Permanently delete several trash entries; returns how many were removed"""
+        with self.connect() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                "DELETE FROM student_trash WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps(list(trash_ids)),)
+            )
+            removed = cur.rowcount
+        return removed
+
+    def purge_older_than(self, days):
+        """Permanently delete entries trashed more than days ago; returns how many were removed"""
+        cutoff = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+        with self.connect() as conn:
+            cur = conn.cursor()
+            cur.execute("DELETE FROM student_trash WHERE deleted_at < ?", (cutoff,))
+            removed = cur.rowcount
+        return removed
+
+    def empty(self):
+        """Permanently delete every trash entry; returns how many were removed"""
+        with self.connect() as conn:
+            cur = conn.cursor()
+            cur.execute("DELETE FROM student_trash")
+            removed = cur.rowcount
+        return removed
+
+
+class ArchiveRepository(Repository):
+    """Past school years kept in their own database files, attached read-only
+
+    Archives are snapshots written by archive.py and are never migrated, so
+    queries against them only use columns every archived schema has.
+    """
+
+    def __init__(self, db_path=DB_PATH):
+        super().__init__(db_path)
+        self._schemas = {}  # school year label -> attached schema name
+
+    def attach(self, label, path):
+        """Make an archived school year queryable; raises sqlite3.OperationalError if it cannot be opened"""
+        schema = "archive_" + re.sub(r"\W", "_", label)
+        get_pool(self.db_path).attach(schema, path)
+        self._schemas[label] = schema
+
+    def detach(self, label):
+        schema = self._schemas.pop(label, None)
+        if schema:
+            get_pool(self.db_path).detach(schema)
+
+    def list_years(self):
+        """Labels of the attached school years, newest first"""
+        return sorted(self._schemas, reverse=True)
+
+    def student_history(self, student_id):
+        """A student's final grades and absences in every attached school year, newest first"""
+        history = []
+        conn = self.connect()
+        cur = conn.cursor()
+        for label in self.list_years():
+            schema = self._schemas[label]
+            # One row per calendar year of marks; a school year usually has two
+            cur.execute(f"""
+                SELECT sub.subject_name, g.final_grade, g.status, t.marks
+                FROM {schema}.grades g
+                JOIN {schema}.subjects sub ON sub.id = g.subject_id
+                LEFT JOIN {schema}.attendance_terms t
+                    ON t.subject_id = g.subject_id AND t.student_id = g.student_id
+                WHERE g.student_id = ?
+                ORDER BY sub.subject_name
+            """, (student_id,))
+            for (subject, final_grade, status), rows in groupby(cur.fetchall(), key=lambda row: row[:3]):
+                absences = sum((marks or b"").count(ABSENT) for _, _, _, marks in rows)
+                history.append(ArchivedGrade(label, subject, final_grade, status, absences))
+        conn.close()
+        return history
+
+
+class DataStore:
+    """All repositories for one database file"""
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self.teachers = TeachersRepository(db_path)
+        self.subjects = SubjectsRepository(db_path)
+        self.sections = SectionsRepository(db_path)
+        self.roster = RosterRepository(db_path)
+        self.grades = GradesRepository(db_path)
+        self.attendance = AttendanceRepository(db_path)
+        self.stats = StatsRepository(db_path)
+        self.trash = TrashRepository(db_path)
+        self.archives = ArchiveRepository(db_path)
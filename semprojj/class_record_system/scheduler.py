@@ -0,0 +1,131 @@
+import queue
+import threading
+import traceback
+from tkinter import TclError
+
+
+POLL_INTERVAL_MS = 20
+DEFAULT_WORKERS = 2
+
+
+class QueryScheduler:
+    """Runs database work on background threads and hands results back to Tk
+
+    Jobs are submitted under a key; submitting again under the same key
+    supersedes the earlier job, which is skipped if it has not started and
+    has its result dropped if it has. Callbacks always run on the Tk thread:
+    workers only touch queues, and the Tk side drains them with root.after.
+    """
+
+    def __init__(self, root, workers=DEFAULT_WORKERS, poll_interval=POLL_INTERVAL_MS):
+        self.root = root
+        self.poll_interval = poll_interval
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._calls = queue.Queue()
+        self._lock = threading.Lock()
+        self._generations = {}
+        self._pending = 0
+        self._polling = False
+
+        for i in range(workers):
+            thread = threading.Thread(target=self._worker, name=f"query-worker-{i}", daemon=True)
+            thread.start()
+
+    def submit(self, key, work, on_done, on_error=None):
+        """Run work() off the Tk thread, then on_done(result) on it"""
+        with self._lock:
+            generation = self._generations.get(key, 0) + 1
+            self._generations[key] = generation
+
+        self._jobs.put((key, generation, work, on_done, on_error))
+        self._pending += 1
+        self._set_busy(True)
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_interval, self._poll)
+
+    def cancel(self, key):
+        """Drop any queued or running job submitted under key"""
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def post(self, callback, *args):
+        """Run callback(*args) on the Tk thread; for progress reports from running jobs"""
+        self._calls.put((callback, args))
+
+    def is_current(self, key, generation):
+        with self._lock:
+            return self._generations.get(key) == generation
+
+    @property
+    def busy(self):
+        return self._pending > 0
+
+    def _worker(self):
+        while True:
+            key, generation, work, on_done, on_error = self._jobs.get()
+            if not self.is_current(key, generation):
+                self._results.put((key, generation, None, None, None, None))
+                continue
+            try:
+                self._results.put((key, generation, on_done, None, work(), None))
+            except Exception as e:
+                self._results.put((key, generation, None, on_error, None, e))
+
+    def _poll(self):
+        """Deliver posted calls and finished jobs on the Tk thread
+
+        A callback that raises is reported and skipped; polling carries on
+        so later results are still delivered.
+        """
+        try:
+            self._deliver()
+        finally:
+            if self._pending > 0:
+                self.root.after(self.poll_interval, self._poll)
+            else:
+                self._polling = False
+                self._set_busy(False)
+
+    def _deliver(self):
+        while True:
+            try:
+                callback, args = self._calls.get_nowait()
+            except queue.Empty:
+                break
+            self._run_callback("posted call", callback, *args)
+
+        while True:
+            try:
+                key, generation, on_done, on_error, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            self._pending -= 1
+            if not self.is_current(key, generation):
+                continue  # Superseded while it ran
+
+            if error is not None:
+                if on_error:
+                    self._run_callback(f"error handler of '{key}'", on_error, error)
+                else:
+                    print(f"Background query '{key}' failed: {error}")
+            elif on_done:
+                self._run_callback(f"result handler of '{key}'", on_done, result)
+
+    @staticmethod
+    def _run_callback(name, callback, *args):
+        try:
+            callback(*args)
+        except TclError:
+            pass  # Its widget was destroyed
+        except Exception:
+            print(f"Background query {name} failed:")
+            traceback.print_exc()
+
+    def _set_busy(self, busy):
+        try:
+            self.root.configure(cursor="watch" if busy else "")
+        except TclError:
+            pass  # Window already destroyed
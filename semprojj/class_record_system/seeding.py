@@ -0,0 +1,380 @@
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from attendance_codec import pack_by_term, count_absences
+from connection import get_connection, DB_PATH
+from database import (
+    simple_hash_password, rebuild_student_search, rebuild_keyed_subject_stats, sync_student_sequence,
+    reset_database
+)
+from migrations import migrate
+
+
+DEFAULT_SECTIONS = [
+    ("Grade 9 Diamond", 9),
+    ("Grade 9 Ruby", 9),
+    ("Grade 9 Emerald", 9),
+    ("Grade 9 Sapphire", 9),
+    ("Grade 9 Pearl", 9),
+    ("Grade 10 Diamond", 10),
+    ("Grade 10 Ruby", 10),
+    ("Grade 10 Emerald", 10),
+    ("Grade 10 Sapphire", 10),
+    ("Grade 10 Pearl", 10),
+    ("Grade 11 STEM", 11),
+    ("Grade 11 ABM", 11),
+    ("Grade 11 HUMSS", 11),
+    ("Grade 11 GAS", 11),
+    ("Grade 11 TVL", 11),
+    ("Grade 12 STEM", 12),
+    ("Grade 12 ABM", 12),
+    ("Grade 12 HUMSS", 12),
+    ("Grade 12 GAS", 12),
+    ("Grade 12 TVL", 12)
+]
+
+DEFAULT_TEACHERS = [
+    ("T001", "Dr. Sarah Johnson", "s.johnson@school.edu", "Math,Physics"),
+    ("T002", "Prof. Michael Chen", "m.chen@school.edu", "Science,Biology"),
+    ("T003", "Ms. Emily Davis", "e.davis@school.edu", "English,Literature"),
+    ("T004", "Mr. Robert Wilson", "r.wilson@school.edu", "History,Geography")
+]
+
+ALL_SUBJECTS = [
+    "Math", "Science", "English", "History",
+    "Physics", "Biology", "Literature", "Geography"
+]
+
+FIRST_NAMES = [
+    "James", "Mary", "John", "Patricia", "Robert",
+    "Jennifer", "Michael", "Linda", "William", "Elizabeth"
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones",
+    "Garcia", "Miller", "Davis", "Rodriguez", "Martinez"
+]
+
+# Per-connection settings used while bulk loading; durability does not
+# matter for a database that is being generated from scratch, and every
+# subject and section ID written is taken from the tables themselves
+LOAD_PRAGMAS = {
+    "foreign_keys": "OFF",
+    "synchronous": "OFF",
+    "cache_size": "-200000",
+    "temp_store": "MEMORY",
+}
+
+# Tables whose secondary indexes are dropped during the load and rebuilt after
+BULK_TABLES = ("students", "grades", "attendance_terms")
+
+
+def build_sections(num_sections):
+    """Default sections first, then extra numbered sections spread over grades 9-12"""
+    sections = list(DEFAULT_SECTIONS[:num_sections])
+    extra = 1
+    while len(sections) < num_sections:
+        for grade_level in (9, 10, 11, 12):
+            if len(sections) == num_sections:
+                break
+            sections.append((f"Grade {grade_level} Section {extra}", grade_level))
+        extra += 1
+    return sections
+
+
+def school_days(start_date, days):
+    """Consecutive attendance dates as YYYY-MM-DD strings"""
+    first = date.fromisoformat(start_date)
+    return [(first + timedelta(days=offset)).isoformat() for offset in range(days)]
+
+
+def random_grades(rng, dropped_rate):
+    """Component grades, final grade and status for one enrollment"""
+    written_works = round(rng.uniform(80.0, 95.0), 1)
+    quizzes = round(rng.uniform(75.0, 92.0), 1)
+    activities = round(rng.uniform(85.0, 98.0), 1)
+    performance_tasks = round(rng.uniform(82.0, 96.0), 1)
+
+    final_grade = (
+        written_works * 0.25 +
+        quizzes * 0.25 +
+        activities * 0.25 +
+        performance_tasks * 0.25
+    )
+    status = "Passing" if final_grade >= 75.0 else "Failing"
+
+    # Small chance of being Dropped
+    if rng.random() < dropped_rate:
+        status = "Dropped"
+        written_works = round(rng.uniform(0.0, 50.0), 1)
+        quizzes = round(rng.uniform(0.0, 50.0), 1)
+        activities = round(rng.uniform(0.0, 50.0), 1)
+        performance_tasks = round(rng.uniform(0.0, 50.0), 1)
+        final_grade = rng.uniform(0.0, 50.0)
+
+    return {
+        "written_works": written_works,
+        "quizzes": quizzes,
+        "activities": activities,
+        "performance_tasks": performance_tasks,
+        "final_grade": round(final_grade, 1),
+        "status": status
+    }
+
+
+def _apply_pragmas(cur, pragmas):
+    previous = {}
+    for name, value in pragmas.items():
+        cur.execute(f"PRAGMA {name}")
+        previous[name] = cur.fetchone()[0]
+        cur.execute(f"PRAGMA {name} = {value}")
+    return previous
+
+
+def _drop_bulk_schema(cur):
+    """Drop secondary indexes and triggers on the bulk tables, returning their definitions"""
+    placeholders = ", ".join("?" for _ in BULK_TABLES)
+    cur.execute(
+        f"SELECT type, name, sql FROM sqlite_master "
+        f"WHERE type IN ('index', 'trigger') AND sql IS NOT NULL AND tbl_name IN ({placeholders})",
+        BULK_TABLES
+    )
+    objects = cur.fetchall()
+    for object_type, object_name, _ in objects:
+        cur.execute(f'DROP {object_type.upper()} IF EXISTS "{object_name}"')
+    return [(object_name, object_sql) for _, object_name, object_sql in objects]
+
+
+def _flush(conn, cur, statement, rows, counters, key):
+    if rows:
+        cur.executemany(statement, rows)
+        conn.commit()
+        counters[key] += len(rows)
+        rows.clear()
+
+
+def seed_database(
+    db_path=DB_PATH,
+    num_sections=len(DEFAULT_SECTIONS),
+    students_per_section=5,
+    days=15,
+    start_date="2024-01-01",
+    absence_rate=0.0,
+    dropped_rate=0.05,
+    batch_size=50000,
+    random_seed=None,
+    reset=False,
+    verbose=True
+):
+    """Generate teachers, sections, students, grades and attendance in bulk
+
+    Rows are produced lazily and written with executemany in batches of
+    batch_size, one transaction per batch. Secondary indexes and the search
+    and summary triggers on the bulk tables are dropped for the load and
+    rebuilt afterwards. Returns a dict of row counts plus the elapsed seconds.
+    """
+    started = time.perf_counter()
+    rng = random.Random(random_seed)
+
+    if reset:
+        reset_database(db_path)
+    migrate(db_path)
+
+    conn = get_connection(db_path)
+    cur = conn.cursor()
+
+    cur.execute("SELECT 1 FROM students LIMIT 1")
+    if cur.fetchone():
+        conn.close()
+        raise ValueError(f"{db_path} already has students; seed with reset=True to rebuild it")
+
+    counters = {"sections": 0, "teachers": 0, "subjects": 0, "students": 0, "grades": 0, "attendance": 0}
+
+    cur.execute("PRAGMA journal_mode")
+    journal_mode = cur.fetchone()[0]
+    if journal_mode.lower() != "wal":
+        cur.execute("PRAGMA journal_mode = MEMORY")
+    previous_pragmas = _apply_pragmas(cur, LOAD_PRAGMAS)
+    dropped_schema = []
+
+    try:
+        sections = build_sections(num_sections)
+        cur.executemany(
+            "INSERT OR IGNORE INTO sections (section_name, grade_level) VALUES (?, ?)",
+            sections
+        )
+        counters["sections"] = len(sections)
+        cur.execute("SELECT section_name, id FROM sections")
+        section_ids = dict(cur.fetchall())
+
+        cur.executemany(
+            "INSERT OR IGNORE INTO subjects (subject_name) VALUES (?)",
+            [(subject,) for subject in ALL_SUBJECTS]
+        )
+        counters["subjects"] = len(ALL_SUBJECTS)
+        cur.execute("SELECT subject_name, id FROM subjects")
+        subject_ids = dict(cur.fetchall())
+
+        # Teachers with hashed passwords
+        default_password = simple_hash_password("password123")
+        cur.execute("DELETE FROM teachers")
+        cur.execute("DELETE FROM teacher_subjects")
+        cur.executemany(
+            "INSERT INTO teachers (teacher_id, name, email, password_hash) VALUES (?, ?, ?, ?)",
+            [(teacher_id, name, email, default_password) for teacher_id, name, email, _ in DEFAULT_TEACHERS]
+        )
+        cur.executemany(
+            "INSERT INTO teacher_subjects (teacher_id, subject_id) VALUES (?, ?)",
+            [
+                (teacher_id, subject_ids[subject])
+                for teacher_id, _, _, subjects in DEFAULT_TEACHERS
+                for subject in subjects.split(",")
+            ]
+        )
+        counters["teachers"] = len(DEFAULT_TEACHERS)
+        conn.commit()
+
+        dropped_schema.extend(_drop_bulk_schema(cur))
+        conn.commit()
+
+        dates = school_days(start_date, days)
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        student_sql = """
+            INSERT INTO students (student_id, name, grade_level, section_id)
+            VALUES (?, ?, ?, ?)
+        """
+        grade_sql = """
+            INSERT INTO grades
+            (student_id, subject_id, written_works, quizzes, activities,
+             performance_tasks, final_grade, status, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        attendance_sql = """
+            INSERT INTO attendance_terms (subject_id, student_id, year, marks, absences)
+            VALUES (?, ?, ?, ?, ?)
+        """
+
+        student_rows = []
+        grade_rows = []
+        attendance_rows = []
+        student_count = 0
+
+        for section_name, grade_level in sections:
+            for _ in range(students_per_section):
+                student_count += 1
+                student_id = f"S{student_count:03d}"
+                name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+                selected_subjects = rng.sample(ALL_SUBJECTS, rng.randint(3, 6))
+                student_subjects = {subj: random_grades(rng, dropped_rate) for subj in selected_subjects}
+
+                if absence_rate > 0:
+                    attendance_data = {
+                        date_str: "A" if rng.random() < absence_rate else "P" for date_str in dates
+                    }
+                else:
+                    attendance_data = dict.fromkeys(dates, "P")
+                attendance_terms = pack_by_term(attendance_data)
+
+                student_rows.append((student_id, name, grade_level, section_ids[section_name]))
+
+                for subj, grades in student_subjects.items():
+                    subject_id = subject_ids[subj]
+                    grade_rows.append((
+                        student_id, subject_id,
+                        grades["written_works"], grades["quizzes"],
+                        grades["activities"], grades["performance_tasks"],
+                        grades["final_grade"], grades["status"], timestamp
+                    ))
+                    attendance_rows.extend(
+                        (subject_id, student_id, year, marks, count_absences(marks))
+                        for year, marks in attendance_terms.items()
+                    )
+
+                if len(attendance_rows) >= batch_size:
+                    _flush(conn, cur, student_sql, student_rows, counters, "students")
+                    _flush(conn, cur, grade_sql, grade_rows, counters, "grades")
+                    _flush(conn, cur, attendance_sql, attendance_rows, counters, "attendance")
+                    if verbose:
+                        print(f"  {counters['students']} students, {counters['attendance']} attendance rows...")
+
+        _flush(conn, cur, student_sql, student_rows, counters, "students")
+        _flush(conn, cur, grade_sql, grade_rows, counters, "grades")
+        _flush(conn, cur, attendance_sql, attendance_rows, counters, "attendance")
+
+    finally:
+        conn.rollback()
+
+        # Rebuild the secondary indexes, the search index, the subject
+        # summary and the student ID counter in one pass over the loaded
+        # data, also after a failed load so the schema is never left without them
+        for _, object_sql in dropped_schema:
+            cur.execute(object_sql)
+        rebuild_student_search(cur)
+        rebuild_keyed_subject_stats(cur)
+        sync_student_sequence(cur)
+        # Sampled statistics are plenty for the planner and avoid a full scan
+        cur.execute("PRAGMA analysis_limit = 1000")
+        cur.execute("ANALYZE")
+        conn.commit()
+
+        _apply_pragmas(cur, previous_pragmas)
+        if journal_mode.lower() != "wal":
+            cur.execute(f"PRAGMA journal_mode = {journal_mode}")
+        conn.close()
+
+    counters["seconds"] = round(time.perf_counter() - started, 3)
+    if verbose:
+        print(
+            f"Seeded {counters['students']} students, {counters['grades']} grades and "
+            f"{counters['attendance']} attendance rows in {counters['seconds']}s"
+        )
+    return counters
+
+
+def generate_sample_data(db_path=DB_PATH):
+    """Generate sample data for testing and demonstration"""
+    seed_database(db_path, verbose=False)
+    print("Sample data generated successfully!")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a class records database for testing")
+    parser.add_argument("--db", default=DB_PATH, help="database file to seed")
+    parser.add_argument("--sections", type=int, default=len(DEFAULT_SECTIONS), help="number of sections")
+    parser.add_argument("--students-per-section", type=int, default=5)
+    parser.add_argument(
+        "--students", type=int,
+        help="total students, spread evenly over the sections (overrides --students-per-section)"
+    )
+    parser.add_argument("--days", type=int, default=15, help="attendance days per enrollment")
+    parser.add_argument("--start-date", default="2024-01-01")
+    parser.add_argument("--absence-rate", type=float, default=0.0)
+    parser.add_argument("--dropped-rate", type=float, default=0.05)
+    parser.add_argument("--batch-size", type=int, default=50000)
+    parser.add_argument("--random-seed", type=int)
+    parser.add_argument("--reset", action="store_true", help="drop all existing tables first")
+    args = parser.parse_args()
+
+    students_per_section = args.students_per_section
+    if args.students:
+        students_per_section = max(1, -(-args.students // args.sections))
+
+    seed_database(
+        db_path=args.db,
+        num_sections=args.sections,
+        students_per_section=students_per_section,
+        days=args.days,
+        start_date=args.start_date,
+        absence_rate=args.absence_rate,
+        dropped_rate=args.dropped_rate,
+        batch_size=args.batch_size,
+        random_seed=args.random_seed,
+        reset=args.reset
+    )
+
+
+if __name__ == "__main__":
+    main()
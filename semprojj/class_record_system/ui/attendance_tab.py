@@ -1,8 +1,13 @@
 import customtkinter as ctk
-from tkinter import ttk, messagebox
-import sqlite3
+import re
+from tkinter import messagebox
 from datetime import datetime
 
+from .virtual_table import VirtualTable
+
+
+DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+
 
 class AttendanceTabMixin:
     def setup_attendance_tab(self, parent):
@@ -49,6 +54,14 @@ class AttendanceTabMixin:
         self.attendance_section_filter.pack(side="left", padx=(0, 10))
         self.attendance_section_filter.bind("<<ComboboxSelected>>", self.filter_attendance)
 
+        self.attendance_loading_label = ctk.CTkLabel(
+            date_frame,
+            text="",
+            font=("Arial", 12),
+            text_color=("gray50", "gray70")
+        )
+        self.attendance_loading_label.pack(side="left", padx=(10, 0))
+
         self.load_attendance_section_filter()
 
         # Attendance table
@@ -59,7 +72,9 @@ class AttendanceTabMixin:
         tree_container.pack(fill="both", expand=True, padx=10, pady=10)
 
         columns = ("ID", "Name", "Grade Level", "Section", "Status", "Mark")
-        self.attendance_tree = ttk.Treeview(tree_container, columns=columns, show="headings", height=15)
+        self.attendance_table = VirtualTable(tree_container, columns, self.format_attendance_row, height=15)
+        self.attendance_view = None
+        self.attendance_tree = self.attendance_table.tree
 
         column_config = {
             "ID": 80,
@@ -74,11 +89,7 @@ class AttendanceTabMixin:
             self.attendance_tree.heading(col, text=col)
             self.attendance_tree.column(col, width=column_config[col])
 
-        scrollbar = ttk.Scrollbar(tree_container, orient="vertical", command=self.attendance_tree.yview)
-        self.attendance_tree.configure(yscrollcommand=scrollbar.set)
-
-        self.attendance_tree.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        self.attendance_table.pack()
 
         # Marking buttons
         button_frame = ctk.CTkFrame(parent, fg_color="transparent")
@@ -102,147 +113,141 @@ class AttendanceTabMixin:
             height=40
         ).pack(side="left", padx=5)
 
+        ctk.CTkButton(
+            button_frame,
+            text="Mark Unmarked as Present",
+            command=self.mark_unmarked_present,
+            fg_color="#4169E1",
+            height=40
+        ).pack(side="left", padx=5)
+
         self.load_attendance_data()
 
     def load_attendance_section_filter(self):
         """Load available sections for filtering"""
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute("SELECT DISTINCT section FROM students ORDER BY section")
-        sections = cur.fetchall()
-        conn.close()
-
-        section_values = ["All Sections"] + [section[0] for section in sections]
+        section_values = ["All Sections"] + self.db.roster.list_student_sections()
         self.attendance_section_filter.configure(values=section_values)
 
-    def load_attendance_data(self):
-        """Load and display attendance records for selected date"""
-        for item in self.attendance_tree.get_children():
-            self.attendance_tree.delete(item)
+    def checked_attendance_date(self):
+        """Date in the entry if it is a real YYYY-MM-DD date, else None after telling the user"""
+        date_str = self.attendance_date.get().strip()
+        try:
+            if not DATE_PATTERN.fullmatch(date_str):
+                raise ValueError(date_str)
+            datetime.strptime(date_str, "%Y-%m-%d")
+        except ValueError:
+            messagebox.showerror("Invalid Date", f"'{date_str}' is not a valid date. Use YYYY-MM-DD, e.g. 2024-01-05.")
+            return None
+        return date_str
 
-        date_str = self.attendance_date.get()
-        if not date_str:
-            date_str = datetime.now().strftime("%Y-%m-%d")
+    def load_attendance_data(self):
+        """Load attendance records for the selected date in the background"""
+        if not self.attendance_date.get().strip():
             self.attendance_date.delete(0, "end")
-            self.attendance_date.insert(0, date_str)
+            self.attendance_date.insert(0, datetime.now().strftime("%Y-%m-%d"))
+        date_str = self.checked_attendance_date()
+        if not date_str:
+            return
 
+        subject = self.selected_subject
         section_filter = self.attendance_section_filter.get()
 
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-
-        if section_filter == "All Sections":
-            cur.execute("""
-                SELECT s.student_id, s.name, s.grade_level, s.section,
-                       COALESCE(a.status, 'Not Marked') as status,
-                       g.status as academic_status
-                FROM students s
-                LEFT JOIN attendance a ON s.student_id = a.student_id 
-                    AND a.subject = ? AND a.date = ?
-                LEFT JOIN grades g ON s.student_id = g.student_id AND g.subject = ?
-                WHERE EXISTS (
-                    SELECT 1 FROM grades g2 
-                    WHERE g2.student_id = s.student_id AND g2.subject = ?
-                )
-                ORDER BY s.section, s.name
-            """, (self.selected_subject, date_str, self.selected_subject, self.selected_subject))
-        else:
-            cur.execute("""
-                SELECT s.student_id, s.name, s.grade_level, s.section,
-                       COALESCE(a.status, 'Not Marked') as status,
-                       g.status as academic_status
-                FROM students s
-                LEFT JOIN attendance a ON s.student_id = a.student_id 
-                    AND a.subject = ? AND a.date = ?
-                LEFT JOIN grades g ON s.student_id = g.student_id AND g.subject = ?
-                WHERE EXISTS (
-                    SELECT 1 FROM grades g2 
-                    WHERE g2.student_id = s.student_id AND g2.subject = ?
-                ) AND s.section = ?
-                ORDER BY s.name
-            """, (
-                self.selected_subject, date_str, self.selected_subject,
-                self.selected_subject, section_filter
-            ))
-
-        rows = cur.fetchall()
-        conn.close()
-
-        # Populate treeview with attendance data
-        for row in rows:
-            attendance_status = row[4]
-            academic_status = row[5] if row[5] else "Not Enrolled"
-            status_display = "Present" if attendance_status == "P" else \
-                "Absent" if attendance_status == "A" else "Not Marked"
-
-            if academic_status == "Dropped":
-                status_display = f"Dropped ({status_display})"
-
-            mark_display = "X Absent" if attendance_status == "A" else \
-                "Not Marked" if attendance_status == "Not Marked" else "Present"
-
-            self.attendance_tree.insert("", "end", values=(
-                row[0], row[1], row[2], row[3],
-                status_display,
-                mark_display
-            ))
+        def on_loaded(rows):
+            # Same student list (another date, or after marking): keep the scroll position
+            view = (subject, section_filter)
+            self.show_attendance_rows(rows, keep_position=view == self.attendance_view)
+            self.attendance_view = view
+
+        self.attendance_loading_label.configure(text="Loading...")
+        self.scheduler.submit(
+            "attendance",
+            lambda: self.db.attendance.list_for_day(
+                subject,
+                date_str,
+                section=section_filter if section_filter != "All Sections" else None
+            ),
+            on_loaded,
+            self.show_attendance_error
+        )
+
+    def show_attendance_error(self, error):
+        if self.attendance_loading_label.winfo_exists():
+            self.attendance_loading_label.configure(text="")
+        messagebox.showerror("Database Error", f"Failed to load attendance: {str(error)}")
+
+    def show_attendance_rows(self, rows, keep_position=False):
+        """Reconcile the attendance table with rows; only changed items are redrawn"""
+        # The tab may have been closed while the query ran
+        if not self.attendance_tree.winfo_exists():
+            return
+
+        self.attendance_loading_label.configure(text=f"{len(rows)} students")
+
+        self.attendance_table.set_rows(rows, keep_position=keep_position)
+
+    def format_attendance_row(self, row):
+        """Treeview values and tags for one AttendanceRow"""
+        attendance_status = row.status
+        academic_status = row.academic_status or "Not Enrolled"
+        status_display = "Present" if attendance_status == "P" else \
+            "Absent" if attendance_status == "A" else "Not Marked"
+
+        if academic_status == "Dropped":
+            status_display = f"Dropped ({status_display})"
+
+        mark_display = "X Absent" if attendance_status == "A" else \
+            "Not Marked" if attendance_status == "Not Marked" else "Present"
+
+        values = (
+            row.student_id, row.name, row.grade_level, row.section,
+            status_display,
+            mark_display
+        )
+        return values, ()
 
     def filter_attendance(self, event=None):
         """Apply section filter to attendance data"""
         self.load_attendance_data()
 
-    def bulk_mark_attendance(self, status):
-        """Mark selected students as present or absent"""
-        selected = self.attendance_tree.selection()
-        if not selected:
-            messagebox.showerror("Error", "Please select students to mark!")
+    def mark_unmarked_present(self):
+        """Mark every student in the current section filter without a mark today as present"""
+        date_str = self.checked_attendance_date()
+        if not date_str:
             return
+        section_filter = self.attendance_section_filter.get()
 
-        date_str = self.attendance_date.get()
-
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-
-        for item in selected:
-            student_id = self.attendance_tree.item(item)["values"][0]
+        marked = self.db.attendance.mark_all(
+            self.selected_subject,
+            date_str,
+            "P",
+            section=section_filter if section_filter != "All Sections" else None,
+            overwrite=False
+        )
 
-            # Check if student is dropped
-            cur.execute("""
-                SELECT status FROM grades 
-                WHERE student_id = ? AND subject = ?
-            """, (student_id, self.selected_subject))
+        messagebox.showinfo("Success", f"Marked {marked} unmarked students as Present")
 
-            academic_status = cur.fetchone()
-            if academic_status and academic_status[0] == "Dropped":
-                continue
+        self.load_attendance_data()
 
-            # Check for existing attendance record
-            cur.execute("""
-                SELECT id FROM attendance 
-                WHERE student_id = ? AND subject = ? AND date = ?
-            """, (student_id, self.selected_subject, date_str))
+        # Refresh dashboard stats
+        if self.selected_subject and self.current_stats_frame:
+            self.create_stats_section(self.current_stats_frame)
 
-            existing_record = cur.fetchone()
+    def bulk_mark_attendance(self, status):
+        """Mark selected students as present or absent"""
+        selected = self.attendance_table.selected_keys()
+        if not selected:
+            messagebox.showerror("Error", "Please select students to mark!")
+            return
 
-            if existing_record:
-                # Update existing record
-                cur.execute("""
-                    UPDATE attendance SET status = ?
-                    WHERE student_id = ? AND subject = ? AND date = ?
-                """, (status, student_id, self.selected_subject, date_str))
-            else:
-                # Insert new record
-                cur.execute("""
-                    INSERT INTO attendance (student_id, subject, date, status)
-                    VALUES (?, ?, ?, ?)
-                """, (student_id, self.selected_subject, date_str, status))
+        date_str = self.checked_attendance_date()
+        if not date_str:
+            return
 
-        conn.commit()
-        conn.close()
+        marked = self.db.attendance.mark(self.selected_subject, date_str, selected, status)
 
         messagebox.showinfo(
             "Success",
-            f"Marked {len(selected)} students as {'Present' if status == 'P' else 'Absent'}"
+            f"Marked {marked} students as {'Present' if status == 'P' else 'Absent'}"
         )
 
         self.load_attendance_data()
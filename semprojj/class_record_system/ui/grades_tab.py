@@ -1,6 +1,12 @@
 import customtkinter as ctk
 from tkinter import ttk, messagebox
-import sqlite3
+
+from repository import GradesRepository
+from .virtual_table import VirtualTable
+
+
+# Quiet period after the last keystroke before the grades search runs
+SEARCH_DEBOUNCE_MS = 200
 
 
 class GradesTabMixin:
@@ -16,6 +22,8 @@ class GradesTabMixin:
         )
         self.grade_search_entry.pack(side="left", padx=(0, 10))
         self.grade_search_entry.bind("<KeyRelease>", self.search_grades)
+        self.grade_search_after_id = None
+        self.grades_result_cache = None
 
         ctk.CTkLabel(search_frame, text="Filter:", font=("Arial", 14)).pack(side="left", padx=(10, 10))
         self.grade_filter = ctk.CTkComboBox(
@@ -67,6 +75,25 @@ class GradesTabMixin:
         )
         delete_student_btn.pack(side="left", padx=(10, 0))
 
+        # Only offered when main.py attached past school years
+        if self.db.archives.list_years():
+            history_btn = ctk.CTkButton(
+                search_frame,
+                text="📜 Past School Years",
+                command=self.show_student_history,
+                width=160,
+                height=30
+            )
+            history_btn.pack(side="left", padx=(10, 0))
+
+        self.grades_loading_label = ctk.CTkLabel(
+            search_frame,
+            text="",
+            font=("Arial", 12),
+            text_color=("gray50", "gray70")
+        )
+        self.grades_loading_label.pack(side="left", padx=(10, 0))
+
         self.load_section_filter()
 
         table_frame = ctk.CTkFrame(parent)
@@ -80,7 +107,8 @@ class GradesTabMixin:
             "Written Works", "Quizzes", "Activities",
             "Performance Tasks", "Final Grade", "Status"
         )
-        self.grades_tree = ttk.Treeview(tree_container, columns=columns, show="headings", height=12)
+        self.grades_table = VirtualTable(tree_container, columns, self.format_grade_row, height=12)
+        self.grades_tree = self.grades_table.tree
 
         column_config = {
             "ID": 80,
@@ -103,13 +131,7 @@ class GradesTabMixin:
         self.grades_tree.tag_configure('failing', background='#f8d7da', foreground='#721c24')
         self.grades_tree.tag_configure('dropped', background='#f5e6e8', foreground='#721c24', font=('Arial', 10, 'italic'))
 
-        scrollbar_x = ttk.Scrollbar(tree_container, orient="horizontal", command=self.grades_tree.xview)
-        scrollbar_y = ttk.Scrollbar(tree_container, orient="vertical", command=self.grades_tree.yview)
-        self.grades_tree.configure(xscrollcommand=scrollbar_x.set, yscrollcommand=scrollbar_y.set)
-
-        self.grades_tree.pack(side="left", fill="both", expand=True)
-        scrollbar_y.pack(side="right", fill="y")
-        scrollbar_x.pack(side="bottom", fill="x")
+        self.grades_table.pack(horizontal=True)
 
         style = ttk.Style()
         style.theme_use("default")
@@ -132,13 +154,13 @@ class GradesTabMixin:
 
     def delete_student_from_subject(self):
         """Delete student from subject and move to trash bin"""
-        selected = self.grades_tree.selection()
+        selected = self.grades_table.selected_rows()
         if not selected:
             messagebox.showerror("Error", "Please select a student to delete!")
             return
 
-        student_id = self.grades_tree.item(selected[0])["values"][0]
-        student_name = self.grades_tree.item(selected[0])["values"][1]
+        student_id = selected[0].student_id
+        student_name = selected[0].name
         subject = self.selected_subject
 
         result = messagebox.askyesno(
@@ -167,6 +189,71 @@ class GradesTabMixin:
         except Exception as e:
             messagebox.showerror("Database Error", f"Failed to move student to trash: {str(e)}")
 
+    def show_student_history(self):
+        """Load the selected student's results in the archived school years"""
+        selected = self.grades_table.selected_rows()
+        if not selected:
+            messagebox.showerror("Error", "Please select a student to view their history!")
+            return
+
+        student = selected[0]
+        self.scheduler.submit(
+            "student_history",
+            lambda: self.db.archives.student_history(student.student_id),
+            lambda history: self.show_history_window(student, history),
+            lambda error: messagebox.showerror("Database Error", f"Failed to load school year history: {str(error)}")
+        )
+
+    def show_history_window(self, student, history):
+        """Final grades and absences per archived school year, newest first"""
+        if not history:
+            messagebox.showinfo("No History", f"{student.name} has no records in the archived school years.")
+            return
+
+        history_window = ctk.CTkToplevel(self.root)
+        history_window.title(f"School Year History for {student.name}")
+        history_window.geometry("700x400")
+        history_window.transient(self.root)
+
+        main_container = ctk.CTkFrame(history_window)
+        main_container.pack(fill="both", expand=True, padx=20, pady=20)
+
+        ctk.CTkLabel(
+            main_container,
+            text=f"{student.name} ({student.student_id})",
+            font=("Arial", 20, "bold")
+        ).pack(anchor="w", pady=(0, 10))
+
+        tree_container = ctk.CTkFrame(main_container)
+        tree_container.pack(fill="both", expand=True)
+
+        columns = ("School Year", "Subject", "Final Grade", "Status", "Absences")
+        history_tree = ttk.Treeview(tree_container, columns=columns, show="headings", height=12)
+        for col in columns:
+            history_tree.heading(col, text=col)
+            history_tree.column(col, width=130)
+
+        scrollbar = ttk.Scrollbar(tree_container, orient="vertical", command=history_tree.yview)
+        history_tree.configure(yscrollcommand=scrollbar.set)
+        history_tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+
+        for record in history:
+            history_tree.insert("", "end", values=(
+                record.school_year,
+                record.subject,
+                f"{record.final_grade:.1f}%" if record.final_grade is not None else "N/A",
+                record.status or "N/A",
+                record.absences
+            ))
+
+        ctk.CTkButton(
+            main_container,
+            text="Close",
+            command=history_window.destroy,
+            width=100
+        ).pack(pady=(10, 0))
+
     def confirm_section_filter(self):
         self.load_grades_data_with_filters()
         messagebox.showinfo(
@@ -175,75 +262,110 @@ class GradesTabMixin:
         )
 
     def load_section_filter(self):
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute("SELECT DISTINCT section FROM students ORDER BY section")
-        sections = cur.fetchall()
-        conn.close()
-
-        section_values = ["All Sections"] + [section[0] for section in sections]
+        section_values = ["All Sections"] + self.db.roster.list_student_sections()
         self.section_filter.configure(values=section_values)
 
+    def grade_filter_state(self):
+        return (self.selected_subject, self.section_filter.get(), self.grade_filter.get())
+
     def load_grades_data_with_filters(self):
-        for item in self.grades_tree.get_children():
-            self.grades_tree.delete(item)
+        """Query grades in the background; a newer request replaces a pending one"""
+        filters = self.grade_filter_state()
+        subject, section_filter, status_filter = filters
+        search_term = self.grade_search_entry.get().strip()
 
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
+        def on_loaded(rows):
+            # Reloading the same view (e.g. after an edit) keeps the scroll position
+            cache = self.grades_result_cache
+            refresh = bool(cache) and cache["filters"] == filters and cache["shown"] == search_term
+
+            # Later keystrokes that narrow this term are answered from these rows
+            self.grades_result_cache = {
+                "filters": filters,
+                "term": search_term,
+                "rows": rows,
+                "shown": search_term
+            }
+            self.show_grades_rows(rows, keep_position=refresh)
+
+        self.grades_loading_label.configure(text="Loading...")
+        self.scheduler.submit(
+            "grades",
+            lambda: self.db.grades.list_for_subject(
+                subject,
+                section=section_filter if section_filter != "All Sections" else None,
+                status=status_filter if status_filter != "All" else None,
+                search=search_term
+            ),
+            on_loaded,
+            self.show_grades_error
+        )
 
-        query = """
-            SELECT s.student_id, s.name, s.grade_level, s.section, 
-                   g.written_works, g.quizzes, g.activities, g.performance_tasks, 
-                   g.final_grade, g.status 
-            FROM students s
-            JOIN grades g ON s.student_id = g.student_id
-            WHERE g.subject = ?
-        """
+    def show_grades_error(self, error):
+        if self.grades_loading_label.winfo_exists():
+            self.grades_loading_label.configure(text="")
+        messagebox.showerror("Database Error", f"Failed to load grades: {str(error)}")
 
-        params = [self.selected_subject]
+    def show_grades_rows(self, rows, keep_position=False):
+        """Reconcile the grades table with rows; only changed items are redrawn"""
+        # The tab may have been closed while the query ran
+        if not self.grades_tree.winfo_exists():
+            return
 
-        section_filter = self.section_filter.get()
-        if section_filter != "All Sections":
-            query += " AND s.section = ?"
-            params.append(section_filter)
+        self.grades_loading_label.configure(text=f"{len(rows)} students")
+
+        self.grades_table.set_rows(rows, keep_position=keep_position)
+
+    def format_grade_row(self, row):
+        """Treeview values and tags for one GradeRow"""
+        tag = ''
+        if row.status == 'Passing':
+            tag = 'passing'
+        elif row.status == 'Failing':
+            tag = 'failing'
+        elif row.status == 'Dropped':
+            tag = 'dropped'
+
+        values = (
+            row.student_id, row.name, row.grade_level, row.section,
+            f"{row.written_works:.1f}%" if row.written_works is not None else "N/A",
+            f"{row.quizzes:.1f}%" if row.quizzes is not None else "N/A",
+            f"{row.activities:.1f}%" if row.activities is not None else "N/A",
+            f"{row.performance_tasks:.1f}%" if row.performance_tasks is not None else "N/A",
+            f"{row.final_grade:.1f}%" if row.final_grade is not None else "N/A",
+            row.status
+        )
+        return values, (tag,)
 
-        status_filter = self.grade_filter.get()
-        if status_filter != "All":
-            query += " AND g.status = ?"
-            params.append(status_filter)
+    def search_grades(self, event=None):
+        """Debounce keystrokes so only the term the user settles on is searched"""
+        if self.grade_search_after_id:
+            self.root.after_cancel(self.grade_search_after_id)
+        self.grade_search_after_id = self.root.after(SEARCH_DEBOUNCE_MS, self.apply_grade_search)
+
+    def apply_grade_search(self):
+        """Narrow the loaded rows in memory, only querying when the search widens"""
+        self.grade_search_after_id = None
+        if not self.grade_search_entry.winfo_exists():
+            return
 
         search_term = self.grade_search_entry.get().strip()
-        if search_term:
-            query += " AND (s.name LIKE ? OR s.student_id LIKE ?)"
-            params.extend([f"%{search_term}%", f"%{search_term}%"])
-
-        query += " ORDER BY s.section, s.name"
-
-        cur.execute(query, params)
-        rows = cur.fetchall()
-        conn.close()
-
-        for row in rows:
-            status = row[9]
-            tag = ''
-            if status == 'Passing':
-                tag = 'passing'
-            elif status == 'Failing':
-                tag = 'failing'
-            elif status == 'Dropped':
-                tag = 'dropped'
-
-            self.grades_tree.insert("", "end", values=(
-                row[0], row[1], row[2], row[3],
-                f"{row[4]:.1f}%" if row[4] is not None else "N/A",
-                f"{row[5]:.1f}%" if row[5] is not None else "N/A",
-                f"{row[6]:.1f}%" if row[6] is not None else "N/A",
-                f"{row[7]:.1f}%" if row[7] is not None else "N/A",
-                f"{row[8]:.1f}%" if row[8] is not None else "N/A",
-                status
-            ), tags=(tag,))
+        cache = self.grades_result_cache
+
+        if cache and cache["filters"] == self.grade_filter_state():
+            if search_term == cache["shown"]:
+                return  # Navigation keys, nothing to redo
+
+            # Every row matching a longer term also matched the cached one
+            if cache["term"].lower() in search_term.lower():
+                self.scheduler.cancel("grades")
+                cache["shown"] = search_term
+                self.show_grades_rows([
+                    row for row in cache["rows"]
+                    if GradesRepository.matches_search(row, search_term)
+                ])
+                return
 
-    def search_grades(self, event=None):
         self.load_grades_data_with_filters()
 
     def filter_grades(self, event=None):
@@ -1,6 +1,5 @@
 import customtkinter as ctk
 from tkinter import messagebox
-import sqlite3
 
 
 class LoginScreenMixin:
@@ -159,14 +158,7 @@ class LoginScreenMixin:
         password_hash = self.simple_hash_password(password)
 
         # Verify credentials in database
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT * FROM teachers WHERE teacher_id = ? AND password_hash = ?",
-            (teacher_id, password_hash)
-        )
-        teacher = cur.fetchone()
-        conn.close()
+        teacher = self.db.teachers.authenticate(teacher_id, password_hash)
 
         if teacher:
             self.current_user = teacher
@@ -1,6 +1,5 @@
 import customtkinter as ctk
 from tkinter import ttk
-import sqlite3
 from datetime import datetime
 
 from .grades_tab import GradesTabMixin
@@ -52,10 +51,8 @@ class MainScreenMixin(
         ).pack(anchor="w", pady=(10, 5))
 
         # Load teacher's subjects
-        subjects = self.current_user[3].split(",") if self.current_user[3] else []
+        subjects = self.db.teachers.list_subjects_for(self.current_user.teacher_id)
         for subject in subjects:
-            if not subject:
-                continue
             subject_btn = ctk.CTkButton(
                 nav_frame,
                 text=f"{subject}",
@@ -135,13 +132,11 @@ class MainScreenMixin(
                         btn.destroy()
 
                     # Get current subjects
-                    subjects = self.current_user[3].split(",") if self.current_user[3] else []
+                    subjects = self.db.teachers.list_subjects_for(self.current_user.teacher_id)
 
                     # Add new subject buttons
                     if management_label:
                         for subject in subjects:
-                            if not subject:
-                                continue
                             subject_btn = ctk.CTkButton(
                                 nav_frame,
                                 text=f"{subject}",
@@ -154,8 +149,6 @@ class MainScreenMixin(
                             subject_btn.pack(fill="x", pady=2, before=management_label)
                     else:
                         for subject in subjects:
-                            if not subject:
-                                continue
                             subject_btn = ctk.CTkButton(
                                 nav_frame,
                                 text=f"{subject}",
@@ -194,27 +187,9 @@ class MainScreenMixin(
         stats_frame = ctk.CTkFrame(self.main_content, fg_color="transparent")
         stats_frame.pack(fill="x", pady=(0, 20))
 
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-
-        # Get statistics
-        cur.execute("SELECT COUNT(DISTINCT student_id) FROM students")
-        total_students = cur.fetchone()[0]
-
-        cur.execute("SELECT COUNT(*) FROM grades WHERE status = 'Failing'")
-        failing_students = cur.fetchone()[0]
-
-        cur.execute("SELECT COUNT(*) FROM grades WHERE status = 'Dropped'")
-        dropped_students = cur.fetchone()[0]
-
         current_date = datetime.now().strftime("%Y-%m-%d")
-        cur.execute(
-            "SELECT COUNT(*) FROM attendance WHERE status = 'A' AND date = ?",
-            (current_date,)
-        )
-        total_absences = cur.fetchone()[0]
-
-        conn.close()
+        total_students, failing_students, dropped_students, total_absences = \
+            self.db.stats.system_stats(current_date)
 
         # Define stats data
         stats_data = [
@@ -222,7 +197,7 @@ class MainScreenMixin(
             ("Failing", failing_students, "#DC143C"),
             ("Dropped", dropped_students, "#8B0000"),
             ("Absences", total_absences, "#FF8C00"),
-            ("Subjects", len(self.current_user[3].split(",")), "#4169E1")
+            ("Subjects", len(self.db.teachers.list_subjects_for(self.current_user.teacher_id)), "#4169E1")
         ]
 
         # Create stat cards
@@ -293,33 +268,9 @@ class MainScreenMixin(
         for widget in stats_frame.winfo_children():
             widget.destroy()
 
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-
-        # Get subject statistics
-        cur.execute("""
-            SELECT COUNT(*), AVG(final_grade), 
-                   SUM(CASE WHEN status = 'Failing' THEN 1 ELSE 0 END),
-                   SUM(CASE WHEN status = 'Dropped' THEN 1 ELSE 0 END)
-            FROM grades WHERE subject = ?
-        """, (self.selected_subject,))
-        result = cur.fetchone()
-        total = result[0] if result else 0
-        avg_grade = result[1] if result and result[1] else 0
-        failing = result[2] if result else 0
-        dropped = result[3] if result else 0
-
-        # Get today's absences
         current_date = datetime.now().strftime("%Y-%m-%d")
-        cur.execute("""
-            SELECT COUNT(*) 
-            FROM attendance 
-            WHERE subject = ? AND status = 'A' AND date = ?
-        """, (self.selected_subject, current_date))
-        result = cur.fetchone()
-        absences = result[0] if result else 0
-
-        conn.close()
+        total, avg_grade, failing, dropped, absences = \
+            self.db.stats.subject_stats(self.selected_subject, current_date)
 
         # Define stats to display
         stats_data = [
@@ -1,8 +1,13 @@
 import customtkinter as ctk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import sqlite3
 import random
-from datetime import datetime
+
+from roster_import import import_roster, REQUIRED_COLUMNS, OPTIONAL_COLUMNS
+
+
+# Dropdowns list at most this many students; typing narrows the list
+STUDENT_COMBO_LIMIT = 200
 
 
 class ManagementMixin:
@@ -53,7 +58,7 @@ class ManagementMixin:
 
         ctk.CTkLabel(
             main_frame,
-            text="Restore accidentally deleted students with all their records",
+            text="Restore accidentally deleted students with all their records (Ctrl or Shift click to select several)",
             font=("Arial", 14),
             text_color=("gray50", "gray70")
         ).pack(anchor="w", pady=(0, 20))
@@ -63,7 +68,9 @@ class ManagementMixin:
         tree_container.pack(fill="both", expand=True, pady=10)
 
         columns = ("ID", "Student ID", "Name", "Grade Level", "Section", "Deleted From", "Deleted At", "Deleted By")
-        self.trash_tree = ttk.Treeview(tree_container, columns=columns, show="headings", height=10)
+        self.trash_tree = ttk.Treeview(
+            tree_container, columns=columns, show="headings", height=10, selectmode="extended"
+        )
 
         column_config = {
             "ID": 50,
@@ -147,19 +154,11 @@ class ManagementMixin:
         for item in self.trash_tree.get_children():
             self.trash_tree.delete(item)
 
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT id, original_id, student_id, name, grade_level, section, 
-                   deleted_from_subject, deleted_at, deleted_by 
-            FROM student_trash 
-            ORDER BY deleted_at DESC
-        """)
-        rows = cur.fetchall()
-        conn.close()
-
-        for row in rows:
-            self.trash_tree.insert("", "end", values=row)
+        for entry in self.db.trash.list_entries():
+            self.trash_tree.insert("", "end", values=(
+                entry.trash_id, entry.original_id, entry.name, entry.grade_level, entry.section,
+                entry.deleted_from_subject, entry.deleted_at, entry.deleted_by
+            ))
 
     def view_trash_records(self):
         """Open window to view deleted student's grades and attendance"""
@@ -172,15 +171,11 @@ class ManagementMixin:
         student_name = self.trash_tree.item(selected[0])["values"][2]
         deleted_from = self.trash_tree.item(selected[0])["values"][5]
 
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute("SELECT grades_backup, attendance_backup FROM student_trash WHERE id = ?", (trash_id,))
-        result = cur.fetchone()
-        conn.close()
-
-        if not result or not result[0]:
+        result = self.db.trash.get_records(trash_id)
+        if not result:
             messagebox.showinfo("Info", "No backup records available for this student.")
             return
+        trash_grades, trash_attendance = result
 
         # Create modal window for records
         records_window = ctk.CTkToplevel(self.root)
@@ -253,26 +248,16 @@ class ManagementMixin:
         grades_tree.pack(side="left", fill="both", expand=True)
         grades_scrollbar.pack(side="right", fill="y")
 
-        # Parse and display grades backup
-        grades_backup = result[0]
-        if grades_backup and grades_backup != "No grades backup":
-            grade_lines = grades_backup.split("||")
-            for line in grade_lines:
-                if line:
-                    parts = line.split("|")
-                    if len(parts) >= 7:
-                        try:
-                            grades_tree.insert("", "end", values=(
-                                parts[0],  # subject
-                                f"{float(parts[1]):.1f}%" if parts[1] and parts[1] != 'None' else "N/A",
-                                f"{float(parts[2]):.1f}%" if parts[2] and parts[2] != 'None' else "N/A",
-                                f"{float(parts[3]):.1f}%" if parts[3] and parts[3] != 'None' else "N/A",
-                                f"{float(parts[4]):.1f}%" if parts[4] and parts[4] != 'None' else "N/A",
-                                f"{float(parts[5]):.1f}%" if parts[5] and parts[5] != 'None' else "N/A",
-                                parts[6] if parts[6] else "N/A"
-                            ))
-                        except:
-                            pass  # Skip parsing errors
+        for grade in trash_grades:
+            grades_tree.insert("", "end", values=(
+                grade.subject,
+                f"{grade.written_works:.1f}%" if grade.written_works is not None else "N/A",
+                f"{grade.quizzes:.1f}%" if grade.quizzes is not None else "N/A",
+                f"{grade.activities:.1f}%" if grade.activities is not None else "N/A",
+                f"{grade.performance_tasks:.1f}%" if grade.performance_tasks is not None else "N/A",
+                f"{grade.final_grade:.1f}%" if grade.final_grade is not None else "N/A",
+                grade.status or "N/A"
+            ))
 
         # Attendance tab
         attendance_frame = ctk.CTkFrame(notebook, fg_color="transparent")
@@ -300,23 +285,9 @@ class ManagementMixin:
         attendance_tree.pack(side="left", fill="both", expand=True)
         attendance_scrollbar.pack(side="right", fill="y")
 
-        # Parse and display attendance backup
-        attendance_backup = result[1] if len(result) > 1 else ""
-        if attendance_backup and attendance_backup != "No attendance backup":
-            attendance_lines = attendance_backup.split("||")
-            for line in attendance_lines:
-                if line:
-                    parts = line.split("|")
-                    if len(parts) >= 3:
-                        try:
-                            status_display = "Present" if parts[2] == "P" else "Absent" if parts[2] == "A" else parts[2]
-                            attendance_tree.insert("", "end", values=(
-                                parts[0],  # date
-                                parts[1],  # subject
-                                status_display
-                            ))
-                        except:
-                            pass  # Skip parsing errors
+        for att in trash_attendance:
+            status_display = "Present" if att.status == "P" else "Absent" if att.status == "A" else att.status
+            attendance_tree.insert("", "end", values=(att.date, att.subject, status_display))
 
         # Close button
         close_btn = ctk.CTkButton(
@@ -329,171 +300,77 @@ class ManagementMixin:
         close_btn.pack(pady=10)
 
     def restore_student_from_trash(self):
-        """Restore deleted student with all records to original subject"""
+        """Restore the selected students with all records to their original subjects"""
         selected = self.trash_tree.selection()
         if not selected:
             messagebox.showerror("Error", "Please select a student to restore!")
             return
 
-        trash_id = self.trash_tree.item(selected[0])["values"][0]
-        original_id = self.trash_tree.item(selected[0])["values"][1]
-        student_name = self.trash_tree.item(selected[0])["values"][2]
-        deleted_from = self.trash_tree.item(selected[0])["values"][5]
-
-        # Check if original ID exists
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute("SELECT student_id FROM students WHERE student_id = ?", (original_id,))
-        
-        new_student_id = original_id
-        if cur.fetchone():
-            # Generate new ID if original exists
-            cur.execute("""
-                SELECT student_id FROM students 
-                WHERE student_id LIKE 'S%' 
-                ORDER BY CAST(SUBSTR(student_id, 2) AS INTEGER) DESC LIMIT 1
-            """)
-            result = cur.fetchone()
-            
-            if result:
-                last_id = result[0]
-                last_number = int(last_id[1:])
-                new_number = last_number + 1
-                new_student_id = f"S{new_number:03d}"
-            else:
-                new_student_id = "S001"
+        entries = [self.trash_tree.item(item)["values"] for item in selected]
+        restored = self.db.trash.restore_many([values[0] for values in entries])
+        if not restored:
+            messagebox.showerror("Error", "Student data not found in trash bin!")
+            return
 
-        # Get student data from trash
-        cur.execute("SELECT * FROM student_trash WHERE id = ?", (trash_id,))
-        student_data = cur.fetchone()
-        
-        if student_data:
-            # Restore to students table
-            cur.execute("""
-                INSERT INTO students (student_id, name, grade_level, section, subjects, attendance)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                new_student_id,
-                student_data[3],  # name
-                student_data[4],  # grade_level
-                student_data[5],  # section
-                student_data[6],  # subjects
-                student_data[7]   # attendance
-            ))
-            
-            # Restore grades from backup
-            grades_backup = student_data[8]  # grades_backup
-            if grades_backup and grades_backup != "No grades backup":
-                grade_lines = grades_backup.split("||")
-                for line in grade_lines:
-                    if line:
-                        parts = line.split("|")
-                        if len(parts) >= 7 and parts[0] == deleted_from:  # Only restore for deleted subject
-                            try:
-                                ww = float(parts[1]) if parts[1] and parts[1] != 'None' else 0.0
-                                quiz = float(parts[2]) if parts[2] and parts[2] != 'None' else 0.0
-                                act = float(parts[3]) if parts[3] and parts[3] != 'None' else 0.0
-                                pt = float(parts[4]) if parts[4] and parts[4] != 'None' else 0.0
-                                fg = float(parts[5]) if parts[5] and parts[5] != 'None' else 0.0
-                                
-                                cur.execute("""
-                                    INSERT INTO grades 
-                                    (student_id, subject, written_works, quizzes, activities,
-                                     performance_tasks, final_grade, status, timestamp)
-                                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                                """, (
-                                    new_student_id,
-                                    parts[0],  # subject
-                                    ww,
-                                    quiz,
-                                    act,
-                                    pt,
-                                    fg,
-                                    parts[6] if parts[6] else "Passing",  # status
-                                    datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                                ))
-                            except Exception as e:
-                                print(f"Error restoring grade: {e}")
-                                pass  # Skip errors
-            
-            # Restore attendance from backup
-            attendance_backup = student_data[9]  # attendance_backup
-            if attendance_backup and attendance_backup != "No attendance backup":
-                attendance_lines = attendance_backup.split("||")
-                for line in attendance_lines:
-                    if line:
-                        parts = line.split("|")
-                        if len(parts) >= 3 and parts[1] == deleted_from:  # Only restore for deleted subject
-                            try:
-                                cur.execute("""
-                                    INSERT INTO attendance (student_id, subject, date, status)
-                                    VALUES (?, ?, ?, ?)
-                                """, (
-                                    new_student_id,
-                                    parts[1],  # subject
-                                    parts[0],  # date
-                                    parts[2]   # status
-                                ))
-                            except Exception as e:
-                                print(f"Error restoring attendance: {e}")
-                                pass  # Skip errors
-            
-            # Delete from trash
-            cur.execute("DELETE FROM student_trash WHERE id = ?", (trash_id,))
-            
-            conn.commit()
-            conn.close()
-            
+        if len(entries) == 1:
+            trash_id, original_id, student_name = entries[0][:3]
+            deleted_from = entries[0][5]
+            new_student_id = restored[trash_id]
             message = f"Student '{student_name}' restored successfully to {deleted_from}!"
             if new_student_id != original_id:
                 message += f"\nNew Student ID: {new_student_id} (original ID was already taken)"
-            
-            messagebox.showinfo("Success", message)
-            
-            self.load_trash_bin()
-            self.load_sections_data()
         else:
-            conn.close()
-            messagebox.showerror("Error", "Student data not found in trash bin!")
+            message = f"{len(restored)} students restored successfully!"
+            renamed = [
+                f"{values[2]}: {restored[values[0]]} (was {values[1]})"
+                for values in entries
+                if values[0] in restored and restored[values[0]] != values[1]
+            ]
+            if renamed:
+                message += "\nNew Student IDs (original IDs were already taken):\n" + "\n".join(renamed)
+            if len(restored) < len(entries):
+                message += f"\n{len(entries) - len(restored)} were no longer in the trash bin."
+
+        messagebox.showinfo("Success", message)
+
+        self.load_trash_bin()
+        self.load_sections_data()
 
     def permanently_delete_from_trash(self):
-        """Permanently delete student from trash bin"""
+        """Permanently delete the selected students from trash bin"""
         selected = self.trash_tree.selection()
         if not selected:
             messagebox.showerror("Error", "Please select a student to delete permanently!")
             return
 
-        student_name = self.trash_tree.item(selected[0])["values"][2]
-        
+        entries = [self.trash_tree.item(item)["values"] for item in selected]
+        if len(entries) == 1:
+            target = f"'{entries[0][2]}'"
+        else:
+            target = f"{len(entries)} students"
+
         result = messagebox.askyesno(
             "Confirm Permanent Delete",
-            f"Are you sure you want to permanently delete '{student_name}'?\n" +
+            f"Are you sure you want to permanently delete {target}?\n" +
             "This action cannot be undone!"
         )
         
         if not result:
             return
-        
-        trash_id = self.trash_tree.item(selected[0])["values"][0]
-        
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute("DELETE FROM student_trash WHERE id = ?", (trash_id,))
-        conn.commit()
-        conn.close()
-        
-        messagebox.showinfo("Success", f"Student '{student_name}' permanently deleted!")
+
+        self.db.trash.delete_many([values[0] for values in entries])
+
+        if len(entries) == 1:
+            messagebox.showinfo("Success", f"Student {target} permanently deleted!")
+        else:
+            messagebox.showinfo("Success", f"{target} permanently deleted!")
         self.load_trash_bin()
 
     def empty_trash_bin(self):
         """Delete all students from trash bin permanently"""
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute("SELECT COUNT(*) FROM student_trash")
-        count = cur.fetchone()[0]
-        
+        count = self.db.trash.count()
+
         if count == 0:
-            conn.close()
             messagebox.showinfo("Info", "Trash bin is already empty!")
             return
         
@@ -504,87 +381,17 @@ class ManagementMixin:
         )
         
         if not result:
-            conn.close()
             return
-        
-        cur.execute("DELETE FROM student_trash")
-        conn.commit()
-        conn.close()
-        
+
+        count = self.db.trash.empty()
+
         messagebox.showinfo("Success", f"Trash bin emptied! {count} students permanently deleted.")
         self.load_trash_bin()
 
     def move_student_to_trash(self, student_id, student_name, subject):
         """Move student to trash bin with backup of grades and attendance"""
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        
-        # Get student data
-        cur.execute("SELECT * FROM students WHERE student_id = ?", (student_id,))
-        student = cur.fetchone()
-        
-        if student:
-            # Get grades for specific subject
-            cur.execute("""
-                SELECT subject, written_works, quizzes, activities, 
-                       performance_tasks, final_grade, status 
-                FROM grades 
-                WHERE student_id = ? AND subject = ?
-            """, (student_id, subject))
-            grades = cur.fetchall()
-            
-            # Get attendance for specific subject
-            cur.execute("""
-                SELECT date, subject, status 
-                FROM attendance 
-                WHERE student_id = ? AND subject = ?
-            """, (student_id, subject))
-            attendance = cur.fetchall()
-            
-            # Create backup strings
-            grades_backup = ""
-            for grade in grades:
-                grades_backup += f"{grade[0]}|{grade[1]}|{grade[2]}|{grade[3]}|{grade[4]}|{grade[5]}|{grade[6]}||"
-            
-            attendance_backup = ""
-            for att in attendance:
-                attendance_backup += f"{att[0]}|{att[1]}|{att[2]}||"
-            
-            # Generate unique trash ID
-            import time
-            trash_student_id = f"DELETED_{student_id}_{int(time.time())}"
-            
-            # Move to trash bin with backups
-            cur.execute("""
-                INSERT INTO student_trash 
-                (original_id, student_id, name, grade_level, section, subjects, 
-                 attendance, grades_backup, attendance_backup, deleted_from_subject,
-                 deleted_at, deleted_by) 
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                student_id,
-                trash_student_id,
-                student[1],  # name
-                student[2],  # grade_level
-                student[3],  # section
-                student[4],  # subjects
-                student[5],  # attendance
-                grades_backup if grades_backup else "No grades backup",
-                attendance_backup if attendance_backup else "No attendance backup",
-                subject,
-                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                self.current_user[1] if hasattr(self, 'current_user') else "System"
-            ))
-            
-            # Delete only from grades and attendance for this subject
-            cur.execute("DELETE FROM grades WHERE student_id = ? AND subject = ?", 
-                       (student_id, subject))
-            cur.execute("DELETE FROM attendance WHERE student_id = ? AND subject = ?", 
-                       (student_id, subject))
-            
-            conn.commit()
-        
-        conn.close()
+        deleted_by = self.current_user[1] if hasattr(self, 'current_user') else "System"
+        self.db.trash.move_student_to_trash(student_id, subject, deleted_by)
 
     def setup_subjects_tab(self, parent):
         """Create subject management interface"""
@@ -837,6 +644,10 @@ class ManagementMixin:
             fg_color="#2E8B57"
         ).pack(side="left", padx=5)
 
+        # Progress of a section being moved to the trash bin
+        self.section_progress_label = ctk.CTkLabel(button_frame, text="")
+        self.section_progress_label.pack(side="left", padx=10)
+
         self.load_sections_data()
 
     def delete_section(self):
@@ -866,39 +677,43 @@ class ManagementMixin:
         if not result:
             return
 
-        try:
-            conn = sqlite3.connect("class_records.db")
-            cur = conn.cursor()
-
-            # Get all students in section
-            cur.execute("SELECT student_id, name FROM students WHERE section = ?", (section_name,))
-            students = cur.fetchall()
+        deleted_by = self.current_user[1] if hasattr(self, 'current_user') else "System"
 
-            # Move each student to trash bin
-            for student in students:
-                student_id, student_name = student
-                # Get all subjects the student is enrolled in
-                cur.execute("SELECT DISTINCT subject FROM grades WHERE student_id = ?", (student_id,))
-                subjects = cur.fetchall()
-                for subject in subjects:
-                    self.move_student_to_trash(student_id, student_name, subject[0])
+        def show_progress(done, total):
+            if self.section_progress_label.winfo_exists():
+                self.section_progress_label.configure(
+                    text=f"Moving '{section_name}' to trash: {done}/{total} students"
+                )
 
-            # Delete section
-            cur.execute("DELETE FROM sections WHERE id = ?", (section_id,))
+        def report_progress(done, total):
+            # Called on the worker thread; hand it to Tk
+            self.scheduler.post(show_progress, done, total)
 
-            conn.commit()
-            conn.close()
+        def clear_progress():
+            if self.section_progress_label.winfo_exists():
+                self.section_progress_label.configure(text="")
 
+        def on_deleted(moved):
+            clear_progress()
             messagebox.showinfo(
                 "Success",
                 f"Section '{section_name}' deleted successfully!\n" +
-                f"{student_count} students moved to trash bin."
+                f"{moved} students moved to trash bin."
             )
-
-            self.load_sections_data()
-
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Failed to delete section: {str(e)}")
+            if self.sections_tree.winfo_exists():
+                self.load_sections_data()
+
+        def on_error(error):
+            clear_progress()
+            messagebox.showerror("Database Error", f"Failed to delete section: {str(error)}")
+
+        # Trashing every enrollment of a large section takes a while, keep Tk responsive
+        self.scheduler.submit(
+            f"delete_section:{section_id}",
+            lambda: self.db.sections.delete_section(section_id, deleted_by, progress=report_progress),
+            on_deleted,
+            on_error
+        )
 
     def setup_students_tab(self, parent):
         """Create student management interface"""
@@ -934,6 +749,7 @@ class ManagementMixin:
             height=40
         )
         self.all_students_combo.grid(row=0, column=3, padx=(0, 20), pady=5, sticky="w")
+        self.all_students_combo.bind("<KeyRelease>", self.search_all_students_combo)
 
         ctk.CTkButton(
             student_form_frame,
@@ -1004,29 +820,97 @@ class ManagementMixin:
             height=40
         ).grid(row=1, column=2, padx=10, pady=5)
 
+        # Bulk import from a registrar's spreadsheet
+        import_frame = ctk.CTkFrame(parent)
+        import_frame.pack(fill="x", pady=20, padx=10)
+
+        ctk.CTkLabel(
+            import_frame,
+            text="Import Roster",
+            font=("Arial", 18, "bold")
+        ).pack(anchor="w", pady=(10, 0), padx=10)
+
+        ctk.CTkLabel(
+            import_frame,
+            text=f"CSV or Excel file with columns: {', '.join(REQUIRED_COLUMNS)} "
+                 f"(optional: {', '.join(OPTIONAL_COLUMNS)})",
+            font=("Arial", 14),
+            text_color=("gray50", "gray70")
+        ).pack(anchor="w", padx=10)
+
+        import_button_frame = ctk.CTkFrame(import_frame, fg_color="transparent")
+        import_button_frame.pack(fill="x", padx=10, pady=10)
+
+        ctk.CTkButton(
+            import_button_frame,
+            text="Import Roster File",
+            command=self.import_roster_file,
+            fg_color="#4169E1",
+            hover_color="#2E4B8B",
+            width=200,
+            height=40
+        ).pack(side="left")
+
+        self.import_progress_label = ctk.CTkLabel(import_button_frame, text="")
+        self.import_progress_label.pack(side="left", padx=10)
+
         self.load_subject_combo()
         self.load_all_students_combo()
 
-    def load_sections_data(self):
-        """Load sections data into treeview"""
-        for item in self.sections_tree.get_children():
-            self.sections_tree.delete(item)
+    def import_roster_file(self):
+        """Create students and enrollments from a CSV or Excel roster"""
+        path = filedialog.askopenfilename(
+            title="Select Roster File",
+            filetypes=[("Roster files", "*.csv *.xlsx *.xlsm"), ("All files", "*.*")]
+        )
+        if not path:
+            return
 
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
+        def show_progress(rows):
+            if self.import_progress_label.winfo_exists():
+                self.import_progress_label.configure(text=f"Importing: {rows} rows read")
 
-        cur.execute("SELECT id, section_name, grade_level FROM sections ORDER BY grade_level, section_name")
-        sections = cur.fetchall()
+        def report_progress(rows):
+            # Called on the worker thread; hand it to Tk
+            self.scheduler.post(show_progress, rows)
 
-        for section in sections:
-            section_id, section_name, grade_level = section
+        def clear_progress():
+            if self.import_progress_label.winfo_exists():
+                self.import_progress_label.configure(text="")
 
-            cur.execute("SELECT COUNT(*) FROM students WHERE section = ?", (section_name,))
-            student_count = cur.fetchone()[0]
+        def on_imported(result):
+            clear_progress()
+            message = (
+                f"Imported {result['rows']} rows:\n"
+                f"{result['students']} new students, {result['existing']} already existing, "
+                f"{result['enrollments']} subject enrollments."
+            )
+            if result["errors"]:
+                message += f"\n\n{result['errors']} rows were skipped; see {result['error_report']}"
+            messagebox.showinfo("Import Complete", message)
+            if self.all_students_combo.winfo_exists():
+                self.load_all_students_combo()
+            if self.sections_tree.winfo_exists():
+                self.load_sections_data()
+
+        def on_error(error):
+            clear_progress()
+            messagebox.showerror("Import Error", f"Failed to import roster: {str(error)}")
+
+        self.scheduler.submit(
+            "import_roster",
+            lambda: import_roster(path, db_path=self.db.db_path, progress=report_progress, verbose=False),
+            on_imported,
+            on_error
+        )
 
-            self.sections_tree.insert("", "end", values=(section_id, section_name, grade_level, student_count))
+    def load_sections_data(self):
+        """Load sections data into treeview"""
+        for item in self.sections_tree.get_children():
+            self.sections_tree.delete(item)
 
-        conn.close()
+        for section in self.db.sections.list_sections():
+            self.sections_tree.insert("", "end", values=section)
 
     def add_new_section(self):
         """Create new section in database"""
@@ -1048,24 +932,11 @@ class ManagementMixin:
         formatted_section_name = f"Grade {grade_level} {section_name}"
 
         try:
-            conn = sqlite3.connect("class_records.db")
-            cur = conn.cursor()
-
-            # Check if section exists
-            cur.execute("SELECT id FROM sections WHERE section_name = ?", (formatted_section_name,))
-            if cur.fetchone():
+            if self.db.sections.exists(formatted_section_name):
                 messagebox.showerror("Error", f"Section '{formatted_section_name}' already exists!")
-                conn.close()
                 return
 
-            # Add new section
-            cur.execute(
-                "INSERT INTO sections (section_name, grade_level) VALUES (?, ?)",
-                (formatted_section_name, grade_level)
-            )
-
-            conn.commit()
-            conn.close()
+            self.db.sections.add_section(formatted_section_name, grade_level)
 
             messagebox.showinfo("Success", f"Section '{formatted_section_name}' added successfully!")
 
@@ -1115,6 +986,13 @@ class ManagementMixin:
             text_color=("gray50", "gray70")
         ).pack(anchor="w", pady=(5, 0))
 
+        search_entry = ctk.CTkEntry(
+            header_frame,
+            placeholder_text="Search students...",
+            width=250
+        )
+        search_entry.pack(anchor="w", pady=(10, 0))
+
         # Students treeview
         tree_frame = ctk.CTkFrame(student_window)
         tree_frame.pack(fill="both", expand=True, padx=20, pady=(0, 20))
@@ -1132,18 +1010,15 @@ class ManagementMixin:
         students_tree.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
 
-        # Load students for section
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT student_id, name, grade_level, section FROM students WHERE section = ? ORDER BY name",
-            (section_name,)
-        )
-        students = cur.fetchall()
-        conn.close()
+        # Load students for section, narrowed by the search box
+        def load_students(event=None):
+            for item in students_tree.get_children():
+                students_tree.delete(item)
+            for student in self.db.roster.search_students(search_entry.get().strip(), section=section_name):
+                students_tree.insert("", "end", values=student)
 
-        for student in students:
-            students_tree.insert("", "end", values=student)
+        search_entry.bind("<KeyRelease>", load_students)
+        load_students()
 
         # Close button
         button_frame = ctk.CTkFrame(student_window, fg_color="transparent")
@@ -1162,56 +1037,43 @@ class ManagementMixin:
         for item in self.subjects_tree.get_children():
             self.subjects_tree.delete(item)
 
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute("SELECT id, subject_name FROM subjects ORDER BY subject_name")
-        subjects = cur.fetchall()
-        conn.close()
+        subjects = self.db.subjects.list_subjects()
 
         for subject in subjects:
             self.subjects_tree.insert("", "end", values=subject)
 
     def load_subject_combo(self):
         """Load subjects into subject dropdown"""
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute("SELECT subject_name FROM subjects ORDER BY subject_name")
-        subjects = cur.fetchall()
-        conn.close()
-
-        subject_list = [subject[0] for subject in subjects]
+        subject_list = self.db.subjects.list_subject_names()
         self.student_subject_combo.configure(values=subject_list)
         if subject_list:
             self.student_subject_combo.set(subject_list[0])
 
-    def load_all_students_combo(self):
-        """Load all students into student dropdown"""
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute("SELECT student_id, name, section FROM students ORDER BY name")
-        students = cur.fetchall()
-        conn.close()
+    def load_all_students_combo(self, search=""):
+        """Load students matching search into student dropdown"""
+        students = self.db.roster.search_students(search, limit=STUDENT_COMBO_LIMIT)
 
-        student_list = [f"{student[0]} - {student[1]} ({student[2]})" for student in students]
+        student_list = [f"{student.student_id} - {student.name} ({student.section})" for student in students]
         self.all_students_combo.configure(values=student_list)
-        if student_list:
+        if student_list and not search:
             self.all_students_combo.set(student_list[0])
 
+    def search_all_students_combo(self, event=None):
+        """Narrow the student dropdown to the typed ID or name"""
+        search = self.all_students_combo.get().strip()
+        if search in self.all_students_combo.cget("values"):
+            return  # A student was picked from the list
+        self.load_all_students_combo(search)
+
     def load_assign_subject_combo(self):
         """Load subjects available for assignment to teacher"""
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-
-        cur.execute("SELECT subject_name FROM subjects ORDER BY subject_name")
-        all_subjects = [row[0] for row in cur.fetchall()]
+        all_subjects = self.db.subjects.list_subject_names()
 
-        teacher_subjects = self.current_user[3].split(",") if self.current_user[3] else []
+        teacher_subjects = set(self.db.teachers.list_subjects_for(self.current_user.teacher_id))
 
         # Filter out subjects teacher already has
         available_subjects = [subj for subj in all_subjects if subj not in teacher_subjects]
 
-        conn.close()
-
         self.assign_subject_combo.configure(values=available_subjects)
         if available_subjects:
             self.assign_subject_combo.set(available_subjects[0])
@@ -1220,10 +1082,10 @@ class ManagementMixin:
 
     def load_remove_subject_combo(self):
         """Load teacher's subjects for removal dropdown"""
-        teacher_subjects = self.current_user[3].split(",") if self.current_user[3] else []
+        teacher_subjects = self.db.teachers.list_subjects_for(self.current_user.teacher_id)
 
         self.remove_subject_combo.configure(values=teacher_subjects)
-        if teacher_subjects and teacher_subjects[0] != "":
+        if teacher_subjects:
             self.remove_subject_combo.set(teacher_subjects[0])
         else:
             self.remove_subject_combo.set("")
@@ -1232,16 +1094,7 @@ class ManagementMixin:
         """Update section dropdown based on selected grade level"""
         grade_level = self.new_student_grade_combo.get()
 
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT section_name FROM sections WHERE grade_level = ? ORDER BY section_name",
-            (grade_level,)
-        )
-        sections = cur.fetchall()
-        conn.close()
-
-        section_list = [section[0] for section in sections]
+        section_list = self.db.sections.list_names_for_grade(grade_level)
 
         if section_list:
             self.new_student_section_combo.configure(values=section_list)
@@ -1259,13 +1112,7 @@ class ManagementMixin:
             return
 
         try:
-            conn = sqlite3.connect("class_records.db")
-            cur = conn.cursor()
-
-            cur.execute("INSERT INTO subjects (subject_name) VALUES (?)", (subject_name,))
-
-            conn.commit()
-            conn.close()
+            self.db.subjects.add_subject(subject_name)
 
             messagebox.showinfo("Success", f"Subject '{subject_name}' added successfully!")
             self.new_subject_entry.delete(0, "end")
@@ -1297,16 +1144,8 @@ class ManagementMixin:
             return
 
         try:
-            conn = sqlite3.connect("class_records.db")
-            cur = conn.cursor()
-
             # Delete subject and all related data
-            cur.execute("DELETE FROM subjects WHERE id = ?", (subject_id,))
-            cur.execute("DELETE FROM grades WHERE subject = ?", (subject_name,))
-            cur.execute("DELETE FROM attendance WHERE subject = ?", (subject_name,))
-
-            conn.commit()
-            conn.close()
+            self.db.subjects.delete_subject(subject_id)
 
             messagebox.showinfo("Success", f"Subject '{subject_name}' deleted successfully!")
             self.load_subjects()
@@ -1326,35 +1165,7 @@ class ManagementMixin:
             return
 
         try:
-            conn = sqlite3.connect("class_records.db")
-            cur = conn.cursor()
-
-            current_teacher = self.current_user
-            current_subjects = current_teacher[3] or ""
-
-            if subject_name not in current_subjects.split(","):
-                if current_subjects:
-                    updated_subjects = current_subjects + "," + subject_name
-                else:
-                    updated_subjects = subject_name
-
-                # Update teacher record
-                cur.execute(
-                    "UPDATE teachers SET subjects = ? WHERE teacher_id = ?",
-                    (updated_subjects, current_teacher[0])
-                )
-
-                # Update current user session
-                self.current_user = (
-                    current_teacher[0],
-                    current_teacher[1],
-                    current_teacher[2],
-                    updated_subjects
-                )
-
-                conn.commit()
-                conn.close()
-
+            if self.db.teachers.assign_subject(self.current_user.teacher_id, subject_name):
                 messagebox.showinfo("Success", f"Subject '{subject_name}' assigned to you successfully!")
 
                 # Refresh UI elements
@@ -1376,44 +1187,16 @@ class ManagementMixin:
             return
 
         try:
-            conn = sqlite3.connect("class_records.db")
-            cur = conn.cursor()
-
-            current_teacher = self.current_user
-            current_subjects = current_teacher[3] or ""
-
-            if subject_name in current_subjects.split(","):
-                subject_list = [s for s in current_subjects.split(",") if s]
-                if subject_name in subject_list:
-                    subject_list.remove(subject_name)
-                    updated_subjects = ",".join(subject_list)
-
-                    # Update teacher record
-                    cur.execute(
-                        "UPDATE teachers SET subjects = ? WHERE teacher_id = ?",
-                        (updated_subjects, current_teacher[0])
-                    )
-
-                    # Update current user session
-                    self.current_user = (
-                        current_teacher[0],
-                        current_teacher[1],
-                        current_teacher[2],
-                        updated_subjects
-                    )
-
-                    conn.commit()
-                    conn.close()
-
-                    messagebox.showinfo(
-                        "Success",
-                        f"Subject '{subject_name}' removed from your subjects!"
-                    )
-
-                    # Refresh UI elements
-                    self.refresh_sidebar_subjects()
-                    self.load_remove_subject_combo()
-                    self.load_assign_subject_combo()
+            if self.db.teachers.remove_subject(self.current_user.teacher_id, subject_name):
+                messagebox.showinfo(
+                    "Success",
+                    f"Subject '{subject_name}' removed from your subjects!"
+                )
+
+                # Refresh UI elements
+                self.refresh_sidebar_subjects()
+                self.load_remove_subject_combo()
+                self.load_assign_subject_combo()
             else:
                 messagebox.showinfo("Info", f"Subject '{subject_name}' is not in your subjects!")
 
@@ -1436,44 +1219,17 @@ class ManagementMixin:
             messagebox.showerror("Error", "Grade level must be a number!")
             return
 
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-
         try:
-            # Generate student ID
-            cur.execute(
-                "SELECT student_id FROM students WHERE student_id LIKE 'S%' "
-                "ORDER BY CAST(SUBSTR(student_id, 2) AS INTEGER) DESC LIMIT 1"
-            )
-            result = cur.fetchone()
-
-            if result:
-                last_id = result[0]
-                last_number = int(last_id[1:])
-                new_number = last_number + 1
-                student_id = f"S{new_number:03d}"
-            else:
-                student_id = "S001"
-
             # Verify section exists
-            cur.execute("SELECT section_name FROM sections WHERE section_name = ?", (section,))
-            if not cur.fetchone():
+            if not self.db.sections.exists(section):
                 messagebox.showerror(
                     "Error",
                     f"Section '{section}' does not exist! Please add it first in the Sections tab."
                 )
-                conn.close()
                 return
 
             # Add new student
-            cur.execute(
-                "INSERT INTO students (student_id, name, grade_level, section, subjects, attendance) "
-                "VALUES (?, ?, ?, ?, ?, ?)",
-                (student_id, name, grade_level, section, "{}", "{}")
-            )
-
-            conn.commit()
-            conn.close()
+            student_id = self.db.roster.add_student(name, grade_level, section)
 
             messagebox.showinfo(
                 "Success",
@@ -1490,7 +1246,6 @@ class ManagementMixin:
 
         except sqlite3.Error as e:
             messagebox.showerror("Database Error", f"Failed to add student: {str(e)}")
-            conn.close()
 
     def add_student_to_subject(self):
         """Enroll existing student into selected subject"""
@@ -1504,15 +1259,8 @@ class ManagementMixin:
         student_id = student_selection.split(" - ")[0]
 
         # Check if student already enrolled
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT 1 FROM grades WHERE student_id = ? AND subject = ?",
-            (student_id, subject_name)
-        )
-        if cur.fetchone():
+        if self.db.grades.is_enrolled(student_id, subject_name):
             messagebox.showerror("Error", "This student is already enrolled in this subject!")
-            conn.close()
             return
 
         try:
@@ -1531,25 +1279,17 @@ class ManagementMixin:
             status = "Passing" if final_grade >= 75.0 else "Failing"
 
             # Add student to subject with generated grades
-            cur.execute("""
-                INSERT INTO grades 
-                (student_id, subject, written_works, quizzes, activities, performance_tasks, 
-                 final_grade, status, timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                student_id, subject_name, written_works, quizzes,
-                activities, performance_tasks,
-                round(final_grade, 1), status,
-                datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            ))
-
-            conn.commit()
-            conn.close()
+            self.db.grades.enroll(student_id, subject_name, {
+                "written_works": written_works,
+                "quizzes": quizzes,
+                "activities": activities,
+                "performance_tasks": performance_tasks,
+                "final_grade": round(final_grade, 1)
+            }, status)
 
             messagebox.showinfo("Success", f"Student added to '{subject_name}' successfully!")
 
             self.load_all_students_combo()
 
         except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Failed to add student to subject: {str(e)}")
-            conn.close()
\ No newline at end of file
+            messagebox.showerror("Database Error", f"Failed to add student to subject: {str(e)}")
\ No newline at end of file
@@ -1,7 +1,6 @@
 import customtkinter as ctk
 from tkinter import messagebox
 import sqlite3
-from datetime import datetime
 
 
 class UpdateTabMixin:
@@ -206,15 +205,7 @@ class UpdateTabMixin:
         student_id = selected.split(" - ")[0]
         student_name = selected.split(" - ")[1].split(" (")[0]
 
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT status FROM grades WHERE student_id = ? AND subject = ?",
-            (student_id, self.selected_subject)
-        )
-        result = cur.fetchone()
-        current_status = result[0] if result else "Unknown"
-        conn.close()
+        current_status = self.db.grades.get_status(student_id, self.selected_subject) or "Unknown"
 
         if new_status == current_status:
             messagebox.showinfo("Info", f"Student {student_name} is already marked as {current_status}")
@@ -229,29 +220,7 @@ class UpdateTabMixin:
             return
 
         try:
-            conn = sqlite3.connect("class_records.db")
-            cur = conn.cursor()
-
-            if new_status == "Dropped":
-                cur.execute("""
-                    UPDATE grades 
-                    SET status = ?,
-                        written_works = 0,
-                        quizzes = 0,
-                        activities = 0,
-                        performance_tasks = 0,
-                        final_grade = 0
-                    WHERE student_id = ? AND subject = ?
-                """, (new_status, student_id, self.selected_subject))
-            else:
-                cur.execute("""
-                    UPDATE grades 
-                    SET status = ?
-                    WHERE student_id = ? AND subject = ?
-                """, (new_status, student_id, self.selected_subject))
-
-            conn.commit()
-            conn.close()
+            self.db.grades.set_status(student_id, self.selected_subject, new_status)
 
             messagebox.showinfo(
                 "Success",
@@ -269,19 +238,9 @@ class UpdateTabMixin:
         if not self.selected_subject:
             return
 
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT DISTINCT s.student_id, s.name, s.section
-            FROM students s
-            JOIN grades g ON s.student_id = g.student_id
-            WHERE g.subject = ?
-            ORDER BY s.section, s.name
-        """, (self.selected_subject,))
-        students = cur.fetchall()
-        conn.close()
-
-        student_list = [f"{student[0]} - {student[1]} ({student[2]})" for student in students]
+        students = self.db.roster.list_enrolled(self.selected_subject)
+
+        student_list = [f"{student.student_id} - {student.name} ({student.section})" for student in students]
         self.student_combobox.configure(values=student_list)
         if student_list:
             self.student_combobox.set(student_list[0])
@@ -300,24 +259,16 @@ class UpdateTabMixin:
 
         student_id = selected.split(" - ")[0]
 
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT written_works, quizzes, activities, performance_tasks, final_grade, status 
-            FROM grades 
-            WHERE student_id = ? AND subject = ?
-        """, (student_id, self.selected_subject))
-        result = cur.fetchone()
-        conn.close()
+        result = self.db.grades.get_grades(student_id, self.selected_subject)
 
         if result:
             grades_data = {
-                "written_works": f"{result[0]:.1f}%" if result[0] is not None else "N/A",
-                "quizzes": f"{result[1]:.1f}%" if result[1] is not None else "N/A",
-                "activities": f"{result[2]:.1f}%" if result[2] is not None else "N/A",
-                "performance_tasks": f"{result[3]:.1f}%" if result[3] is not None else "N/A",
-                "final_grade": f"{result[4]:.1f}%" if result[4] is not None else "N/A",
-                "status": result[5] if result[5] else "N/A"
+                "written_works": f"{result.written_works:.1f}%" if result.written_works is not None else "N/A",
+                "quizzes": f"{result.quizzes:.1f}%" if result.quizzes is not None else "N/A",
+                "activities": f"{result.activities:.1f}%" if result.activities is not None else "N/A",
+                "performance_tasks": f"{result.performance_tasks:.1f}%" if result.performance_tasks is not None else "N/A",
+                "final_grade": f"{result.final_grade:.1f}%" if result.final_grade is not None else "N/A",
+                "status": result.status if result.status else "N/A"
             }
 
             status_color = "#2E8B57"
@@ -347,15 +298,7 @@ class UpdateTabMixin:
 
         student_id = selected.split(" - ")[0]
 
-        conn = sqlite3.connect("class_records.db")
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT status FROM grades WHERE student_id = ? AND subject = ?",
-            (student_id, self.selected_subject)
-        )
-        result = cur.fetchone()
-        current_status = result[0] if result else ""
-        conn.close()
+        current_status = self.db.grades.get_status(student_id, self.selected_subject) or ""
 
         if current_status == "Dropped":
             result = messagebox.askyesno(
@@ -392,23 +335,10 @@ class UpdateTabMixin:
         if valid_components == 4:
             final_grade = sum(grades.values()) / 4
         else:
-            conn = sqlite3.connect("class_records.db")
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT written_works, quizzes, activities, performance_tasks
-                FROM grades
-                WHERE student_id = ? AND subject = ?
-            """, (student_id, self.selected_subject))
-            current_grades = cur.fetchone()
-            conn.close()
+            current_grades = self.db.grades.get_grades(student_id, self.selected_subject)
 
             if current_grades:
-                current_grade_dict = {
-                    'written_works': current_grades[0],
-                    'quizzes': current_grades[1],
-                    'activities': current_grades[2],
-                    'performance_tasks': current_grades[3]
-                }
+                current_grade_dict = current_grades._asdict()
 
                 all_grades = {}
                 for component in ['written_works', 'quizzes', 'activities', 'performance_tasks']:
@@ -427,36 +357,7 @@ class UpdateTabMixin:
         status = "Passing" if final_grade >= 75.0 else "Failing"
 
         try:
-            conn = sqlite3.connect("class_records.db")
-            cur = conn.cursor()
-
-            update_fields = []
-            update_values = []
-
-            for component, grade in grades.items():
-                update_fields.append(f"{component} = ?")
-                update_values.append(grade)
-
-            update_fields.append("final_grade = ?")
-            update_values.append(round(final_grade, 1))
-
-            update_fields.append("status = ?")
-            update_values.append(status)
-
-            update_fields.append("timestamp = ?")
-            update_values.append(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-
-            update_values.extend([student_id, self.selected_subject])
-
-            query = f"""
-                UPDATE grades 
-                SET {', '.join(update_fields)}
-                WHERE student_id = ? AND subject = ?
-            """
-
-            cur.execute(query, update_values)
-            conn.commit()
-            conn.close()
+            self.db.grades.update_grades(student_id, self.selected_subject, grades, final_grade, status)
 
             messagebox.showinfo(
                 "Success",
@@ -0,0 +1,182 @@
+from tkinter import ttk
+
+
+DEFAULT_ROW_HEIGHT = 20
+HEADING_HEIGHT = 25
+
+# Event state bits for the Shift and Control modifiers
+SHIFT_MASK = 0x0001
+CONTROL_MASK = 0x0004
+
+
+class VirtualTable:
+    """Treeview that only creates items for the rows currently in view
+
+    The result set is kept as a plain list and scrolling re-renders the
+    window of rows at the current offset, so a 5,000 student subject costs
+    the same to draw as a 50 student one. Selection is tracked by row key so
+    it survives scrolling.
+    """
+
+    def __init__(self, parent, columns, render_row, key=lambda row: row[0], height=12):
+        self.render_row = render_row
+        self.key = key
+        self.rows = []
+        self.offset = 0
+        self.visible = height
+        self.selected = set()
+        # (key, row, values, tags) for each materialized item, by position
+        self._window = []
+
+        self.tree = ttk.Treeview(parent, columns=columns, show="headings", height=height)
+        self.scrollbar_y = ttk.Scrollbar(parent, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar_x = ttk.Scrollbar(parent, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=self.scrollbar_x.set)
+
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<Button-1>", self._on_click)
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(3))
+        self.tree.bind("<Up>", lambda event: self._on_arrow(event, -1))
+        self.tree.bind("<Down>", lambda event: self._on_arrow(event, 1))
+        self.tree.bind("<Prior>", lambda event: self.scroll(-self.visible))
+        self.tree.bind("<Next>", lambda event: self.scroll(self.visible))
+
+    def pack(self, horizontal=False):
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar_y.pack(side="right", fill="y")
+        if horizontal:
+            self.scrollbar_x.pack(side="bottom", fill="x")
+
+    def set_rows(self, rows, keep_position=True):
+        """Replace the data set
+
+        With keep_position the row at the top of the view stays there if it
+        is still present, so a refresh after an edit does not move the view;
+        otherwise the view returns to the first row. Selected keys that are
+        still present stay selected either way.
+        """
+        anchor = self._window[0][0] if keep_position and self.offset and self._window else None
+        self.rows = list(rows)
+        keys = [self.key(row) for row in self.rows]
+        self.selected &= set(keys)
+
+        if not keep_position:
+            self.offset = 0
+        elif anchor is not None:
+            try:
+                self.offset = keys.index(anchor)
+            except ValueError:
+                pass  # Top row is gone, keep the numeric offset
+        self.offset = max(0, min(self.offset, len(self.rows) - self.visible))
+        self.render()
+
+    def selected_keys(self):
+        return [self.key(row) for row in self.rows if self.key(row) in self.selected]
+
+    def selected_rows(self):
+        return [row for row in self.rows if self.key(row) in self.selected]
+
+    def scroll(self, delta):
+        self.scroll_to(self.offset + delta)
+        return "break"
+
+    def scroll_to(self, offset):
+        offset = max(0, min(offset, len(self.rows) - self.visible))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def render(self):
+        """Bring the materialized items in line with the rows at the current offset
+
+        Items are reused by position and only touched when their rendered
+        values change, so refreshing after a single-row edit updates one item
+        instead of redrawing the table.
+        """
+        window = self.rows[self.offset:self.offset + self.visible]
+        previous = self._window
+        self._window = []
+
+        for position, row in enumerate(window):
+            if position < len(previous) and previous[position][1] == row:
+                self._window.append(previous[position])
+                continue
+
+            iid = f"row{position}"
+            values, tags = self.render_row(row)
+            if position >= len(previous):
+                self.tree.insert("", "end", iid=iid, values=values, tags=tags)
+            elif previous[position][2:] != (values, tags):
+                self.tree.item(iid, values=values, tags=tags)
+            self._window.append((self.key(row), row, values, tags))
+
+        for position in range(len(window), len(previous)):
+            self.tree.delete(f"row{position}")
+
+        selection = {f"row{i}" for i, entry in enumerate(self._window) if entry[0] in self.selected}
+        if selection != set(self.tree.selection()):
+            self.tree.selection_set(sorted(selection))
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        total = len(self.rows)
+        if total <= self.visible:
+            self.scrollbar_y.set(0.0, 1.0)
+        else:
+            self.scrollbar_y.set(self.offset / total, (self.offset + self.visible) / total)
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.rows)))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            self.scroll(step * self.visible if args[2] == "pages" else step)
+
+    def _on_mousewheel(self, event):
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def _on_resize(self, event):
+        row_height = ttk.Style().lookup("Treeview", "rowheight") or DEFAULT_ROW_HEIGHT
+        visible = max(1, (event.height - HEADING_HEIGHT) // int(row_height))
+        if visible != self.visible:
+            self.visible = visible
+            self.offset = max(0, min(self.offset, len(self.rows) - self.visible))
+            self.render()
+
+    def _on_click(self, event):
+        # A plain click replaces the selection, including rows scrolled out of view
+        if not event.state & (SHIFT_MASK | CONTROL_MASK):
+            self.selected.clear()
+
+    def _on_arrow(self, event, delta):
+        """Scroll instead of stopping when the keyboard focus reaches the window edge"""
+        focus = self.tree.focus()
+        if not focus or not self.tree.exists(focus):
+            return None
+
+        position = self.tree.index(focus)
+        if not event.state & SHIFT_MASK:
+            self.selected.clear()
+        if 0 <= position + delta < len(self._window):
+            return None  # Treeview moves the focus itself
+
+        self.scroll(delta)
+        iid = f"row{position}"
+        if self.tree.exists(iid):
+            self.selected.add(self._window[position][0])
+            self.tree.focus(iid)
+            self.tree.selection_set([
+                f"row{i}" for i, entry in enumerate(self._window) if entry[0] in self.selected
+            ])
+        return "break"
+
+    def _on_select(self, event=None):
+        chosen = set(self.tree.selection())
+        for position, entry in enumerate(self._window):
+            if f"row{position}" in chosen:
+                self.selected.add(entry[0])
+            else:
+                self.selected.discard(entry[0])
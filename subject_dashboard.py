@@ -189,9 +189,8 @@ class SubjectDashboard:
             messagebox.showerror("Error", "Please select students to mark!")
             return
         date_str = self.attendance_date.get()
-        for item in selected:
-            student_id = self.attendance_tree.item(item)["values"][0]
-            self.backend.update_attendance(student_id, self.subject, date_str, status)
+        student_ids = [self.attendance_tree.item(item)["values"][0] for item in selected]
+        self.backend.mark_attendance(student_ids, self.subject, date_str, status)
         messagebox.showinfo("Success", f"Marked {len(selected)} students as {'Present' if status == 'P' else 'Absent'}")
         self.load_attendance_data()
         self.refresh_dashboard_stats()